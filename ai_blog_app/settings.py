@@ -12,20 +12,28 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 from pathlib import Path
+import json
 import os
+import sys
+import tempfile
 import dj_database_url
-from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-# Load environment variables from .env file during local development
-load_dotenv()
+# Load environment variables from .env file during local development. Deployments
+# have no .env, so they skip importing python-dotenv and searching for the file.
+if (BASE_DIR / '.env').exists():
+    from dotenv import load_dotenv
+    load_dotenv(BASE_DIR / '.env')
 
 # --- Core Security Settings ---
 
 # SECRET_KEY is loaded from an environment variable. Render will generate this for you.
 SECRET_KEY = os.environ.get('SECRET_KEY')
+# The test suite signs sessions too; let it run from a checkout without one.
+if not SECRET_KEY and sys.argv[1:2] == ['test']:
+    SECRET_KEY = 'django-insecure-test-only-key'
 
 # DEBUG is True for local development, but will be False in production on Render.
 # Render sets the 'RENDER' environment variable to 'True'.
@@ -54,7 +62,12 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     # WhiteNoise Middleware should be placed directly after the security middleware.
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # The async-capable subclass keeps the middleware chain async under ASGI.
+    'ai_blog_app.middleware.AsyncWhiteNoiseMiddleware',
+    # Placed early so session and auth queries are included in the per-request counts.
+    'blog_generator.middleware.MetricsMiddleware',
+    # Before sessions and auth, so their reads can be routed to the read replica.
+    'blog_generator.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -91,10 +104,60 @@ WSGI_APPLICATION = 'ai_blog_app.wsgi.application'
 DATABASES = {
     'default': dj_database_url.config(
         default='sqlite:///' + os.path.join(BASE_DIR, 'db.sqlite3'),
-        conn_max_age=600
+        conn_max_age=600,
+        conn_health_checks=True,
     )
 }
 
+# Optional read replica. Safe reads (GET requests from clients that haven't written
+# in the last BLOG_REPLICA_PIN_SECONDS) are routed to it by
+# blog_generator.routers.PrimaryReplicaRouter; writes always go to the primary.
+# To try it locally, copy db.sqlite3 and point REPLICA_DATABASE_URL at the copy.
+REPLICA_DATABASE_URL = os.environ.get('REPLICA_DATABASE_URL')
+if REPLICA_DATABASE_URL:
+    DATABASES['replica'] = dj_database_url.parse(
+        REPLICA_DATABASE_URL, conn_max_age=600, conn_health_checks=True,
+    )
+    # Tests run against the primary only.
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['blog_generator.routers.PrimaryReplicaRouter']
+BLOG_REPLICA_PIN_SECONDS = int(os.environ.get('BLOG_REPLICA_PIN_SECONDS', '15'))
+
+# On PostgreSQL, each process keeps a psycopg connection pool instead of one
+# persistent connection per thread, so the generation worker threads and the
+# request threads share a bounded set of connections.
+BLOG_DB_POOL = os.environ.get('BLOG_DB_POOL', 'True') == 'True'
+BLOG_DB_POOL_MIN_SIZE = int(os.environ.get('BLOG_DB_POOL_MIN_SIZE', '2'))
+BLOG_DB_POOL_MAX_SIZE = int(os.environ.get('BLOG_DB_POOL_MAX_SIZE', '10'))
+# Seconds a request waits for a free connection before failing.
+BLOG_DB_POOL_TIMEOUT = float(os.environ.get('BLOG_DB_POOL_TIMEOUT', '10'))
+# Idle connections above min_size are closed after this many seconds, and every
+# connection is replaced after BLOG_DB_POOL_MAX_LIFETIME.
+BLOG_DB_POOL_MAX_IDLE = float(os.environ.get('BLOG_DB_POOL_MAX_IDLE', '300'))
+BLOG_DB_POOL_MAX_LIFETIME = float(os.environ.get('BLOG_DB_POOL_MAX_LIFETIME', '1800'))
+
+for database in DATABASES.values():
+    if database['ENGINE'] == 'django.db.backends.sqlite3':
+        # Take the write lock when a transaction starts, so concurrent writers (e.g. the
+        # generation worker threads) wait for each other instead of failing with
+        # "database is locked".
+        database['OPTIONS'] = {'transaction_mode': 'IMMEDIATE', 'timeout': 20}
+        # The shared in-memory test database locks whole tables and fails instead of
+        # waiting, which breaks tests that write from pool threads; use a file.
+        database.setdefault('TEST', {}).setdefault('NAME', os.path.join(tempfile.gettempdir(), 'ai_blog_test.sqlite3'))
+    elif database['ENGINE'] == 'django.db.backends.postgresql' and BLOG_DB_POOL:
+        # Django's pool requires CONN_MAX_AGE=0; CONN_HEALTH_CHECKS makes it check
+        # connections as they are taken from the pool.
+        database['CONN_MAX_AGE'] = 0
+        database.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': BLOG_DB_POOL_MIN_SIZE,
+            'max_size': BLOG_DB_POOL_MAX_SIZE,
+            'timeout': BLOG_DB_POOL_TIMEOUT,
+            'max_idle': BLOG_DB_POOL_MAX_IDLE,
+            'max_lifetime': BLOG_DB_POOL_MAX_LIFETIME,
+        }
+
 
 # --- Password Validation ---
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -121,10 +184,19 @@ USE_TZ = True
 # http://whitenoise.evans.io/en/stable/django.html
 
 STATIC_URL = '/static/'
+# The site's stylesheet and scripts.
+STATICFILES_DIRS = [BASE_DIR / 'static']
 # This is where Django will collect all static files during the build.
-STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
-# This setting makes WhiteNoise more efficient at serving files.
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+STATIC_ROOT = os.environ.get('STATIC_ROOT', os.path.join(BASE_DIR, 'staticfiles'))
+# collectstatic writes content-hashed copies of each file (app.3f2c9a1b4d5e.css)
+# plus gzip and Brotli versions, which WhiteNoise serves to clients that accept
+# them. Hashed names are served with a far-future "immutable" Cache-Control, so
+# repeat page loads only fetch the HTML. STATICFILES_STORAGE was removed in
+# Django 5.1 and no longer has any effect.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+}
 
 
 # --- Media Files (User Uploads) ---
@@ -140,6 +212,185 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 LOGIN_URL = 'login'
 
 # API Keys loaded from environment variables
+GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
 YOUTUBE_COOKIES_FILE = os.getenv('YOUTUBE_COOKIES')
 YOUTUBE_API_KEY = os.getenv('YOUTUBE_API_KEY')
-
+ASSEMBLYAI_API_KEY = os.environ.get('ASSEMBLYAI_API_KEY')
+
+
+# --- Sessions and Authentication ---
+# BLOG_SESSION_STORE selects where sessions live:
+#   'cached_db' (default): in the database, read through a per-process cache so
+#     most pages need no session query. A logged-out session is still accepted by
+#     other processes for up to BLOG_SESSION_CACHE_SECONDS (see sessions.py).
+#   'signed_cookies': in a signed cookie, so pages never query for the session.
+#     Logging out clears the cookie, but a copied cookie stays valid until it
+#     expires; rotating SECRET_KEY is the only way to revoke sessions. Opt-in.
+#   'db': one session query per request.
+# Switching stores logs everyone out once.
+SESSION_ENGINES = {
+    'cached_db': 'blog_generator.sessions',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+    'db': 'django.contrib.sessions.backends.db',
+}
+SESSION_ENGINE = SESSION_ENGINES[os.environ.get('BLOG_SESSION_STORE', 'cached_db')]
+BLOG_SESSION_CACHE_SECONDS = int(os.environ.get('BLOG_SESSION_CACHE_SECONDS', 60))
+# Logged-in users are cached per process for BLOG_USER_CACHE_SECONDS (0 disables
+# the cache). Changes made in another process, such as deactivating an account,
+# apply once the entry expires.
+AUTHENTICATION_BACKENDS = ['blog_generator.auth.CachedModelBackend']
+BLOG_USER_CACHE_SIZE = int(os.environ.get('BLOG_USER_CACHE_SIZE', 10000))
+BLOG_USER_CACHE_SECONDS = float(os.environ.get('BLOG_USER_CACHE_SECONDS', 60))
+
+
+# --- Text Generation Backend ---
+# 'gemini' (default), 'stub' for the offline deterministic model used in load tests
+# and benchmarks, or a dotted path to an LLMBackend subclass. BLOG_LLM_OPTIONS is a
+# JSON object of keyword arguments for the backend, e.g.
+# BLOG_LLM_BACKEND=stub BLOG_LLM_OPTIONS='{"latency": 2, "latency_distribution": "lognormal"}'
+BLOG_LLM_BACKEND = os.environ.get('BLOG_LLM_BACKEND', 'gemini')
+BLOG_LLM_OPTIONS = json.loads(os.environ.get('BLOG_LLM_OPTIONS', '{}'))
+
+# --- Model Call Resilience ---
+# Every model call gets BLOG_LLM_TIMEOUT seconds per attempt and up to
+# BLOG_LLM_MAX_ATTEMPTS attempts on retryable errors (429/5xx/timeouts), waiting a
+# random 0..min(BLOG_LLM_BACKOFF_MAX, BLOG_LLM_BACKOFF_BASE * 2^n) seconds between
+# them, all within BLOG_LLM_DEADLINE seconds. With BLOG_LLM_HEDGE an attempt still
+# running after the recent p95 latency gets a second, identical call (roughly
+# 5-15% more upstream calls). After BLOG_LLM_BREAKER_FAILURES consecutive
+# failures calls fail fast for BLOG_LLM_BREAKER_RESET seconds.
+BLOG_LLM_TIMEOUT = float(os.environ.get('BLOG_LLM_TIMEOUT', 90))
+BLOG_LLM_MAX_ATTEMPTS = int(os.environ.get('BLOG_LLM_MAX_ATTEMPTS', 3))
+BLOG_LLM_BACKOFF_BASE = float(os.environ.get('BLOG_LLM_BACKOFF_BASE', 1.0))
+BLOG_LLM_BACKOFF_MAX = float(os.environ.get('BLOG_LLM_BACKOFF_MAX', 20))
+BLOG_LLM_DEADLINE = float(os.environ.get('BLOG_LLM_DEADLINE', 180))
+BLOG_LLM_HEDGE = os.environ.get('BLOG_LLM_HEDGE', 'False') == 'True'
+BLOG_LLM_BREAKER_FAILURES = int(os.environ.get('BLOG_LLM_BREAKER_FAILURES', 5))
+BLOG_LLM_BREAKER_RESET = float(os.environ.get('BLOG_LLM_BREAKER_RESET', 30))
+BLOG_LLM_CALL_THREADS = int(os.environ.get('BLOG_LLM_CALL_THREADS', 32))
+
+# --- Background Generation Jobs ---
+# Tuning for the `run_generation_worker` management command.
+BLOG_JOB_CONCURRENCY = int(os.environ.get('BLOG_JOB_CONCURRENCY', 4))
+BLOG_JOB_MAX_ATTEMPTS = int(os.environ.get('BLOG_JOB_MAX_ATTEMPTS', 3))
+# Base delay in seconds before a failed job is retried; doubles on every attempt.
+BLOG_JOB_RETRY_BACKOFF = float(os.environ.get('BLOG_JOB_RETRY_BACKOFF', 10))
+# A running job whose worker has not sent a heartbeat for this long is requeued.
+BLOG_JOB_LEASE_SECONDS = int(os.environ.get('BLOG_JOB_LEASE_SECONDS', 120))
+BLOG_JOB_POLL_INTERVAL = float(os.environ.get('BLOG_JOB_POLL_INTERVAL', 1.0))
+
+# --- Generation Cache ---
+# Articles are cached by a hash of the normalized transcript, prompt version and model.
+BLOG_CACHE_ENABLED = os.environ.get('BLOG_CACHE_ENABLED', 'True') == 'True'
+BLOG_CACHE_TTL = int(os.environ.get('BLOG_CACHE_TTL', 60 * 60 * 24 * 30))
+# Size limits for the database table and the per-process LRU layer in front of it.
+BLOG_CACHE_MAX_ENTRIES = int(os.environ.get('BLOG_CACHE_MAX_ENTRIES', 10000))
+BLOG_CACHE_MEMORY_ENTRIES = int(os.environ.get('BLOG_CACHE_MEMORY_ENTRIES', 256))
+# Cache hits are counted in each process and written to the table this often.
+BLOG_CACHE_HIT_FLUSH_SECONDS = float(os.environ.get('BLOG_CACHE_HIT_FLUSH_SECONDS', 30))
+
+# --- Transcript Preprocessing ---
+# Strip timestamps, caption markers, fillers and repeated caption lines before
+# the transcript is sent to the model.
+BLOG_PREPROCESS_ENABLED = os.environ.get('BLOG_PREPROCESS_ENABLED', 'True') == 'True'
+# When set, extractive compression trims the cleaned transcript to about this
+# many tokens. 0 keeps everything.
+BLOG_TRANSCRIPT_TOKEN_BUDGET = int(os.environ.get('BLOG_TRANSCRIPT_TOKEN_BUDGET', 0))
+
+# --- Long Transcripts ---
+# Transcripts longer than this are summarized chunk by chunk (map) before the
+# article is written from the combined notes (reduce).
+BLOG_LONG_TRANSCRIPT_CHARS = int(os.environ.get('BLOG_LONG_TRANSCRIPT_CHARS', 60000))
+BLOG_CHUNK_TOKENS = int(os.environ.get('BLOG_CHUNK_TOKENS', 4000))
+# Maximum number of chunk summaries requested from the model at the same time.
+# Every one beyond the first takes a free admission slot (see BLOG_MAX_IN_FLIGHT).
+BLOG_CHUNK_WORKERS = int(os.environ.get('BLOG_CHUNK_WORKERS', 8))
+
+# --- Sectioned Generation ---
+# Default generation mode when a request doesn't pick one: 'single' writes the
+# article in one model call; 'sectioned' asks for a title and an outline of up to
+# BLOG_MAX_SECTIONS sections, then writes BLOG_SECTION_WORKERS sections at a time.
+# Sectioned articles arrive several times faster, but every section prompt carries
+# the transcript again, so input tokens grow with the number of sections.
+BLOG_GENERATION_MODE = os.environ.get('BLOG_GENERATION_MODE', 'single')
+BLOG_MAX_SECTIONS = int(os.environ.get('BLOG_MAX_SECTIONS', 8))
+# Defaults to writing every section at once. Every section call beyond the first
+# takes a free admission slot (see BLOG_MAX_IN_FLIGHT), so under load sections
+# are written fewer at a time.
+BLOG_SECTION_WORKERS = int(os.environ.get('BLOG_SECTION_WORKERS', BLOG_MAX_SECTIONS))
+
+# --- Media Transcription ---
+# Uploaded audio/video is saved under MEDIA_ROOT/uploads by the web process and
+# read back by the generation worker, so media jobs need MEDIA_ROOT on storage
+# both can reach (the same host or a shared volume) and a configured transcriber
+# on the worker. Deployments without that set BLOG_MEDIA_ENABLED=False, which
+# removes the upload option. Files are cut at pauses into segments of about BLOG_SEGMENT_TARGET_SECONDS
+# (never more than BLOG_SEGMENT_MAX_SECONDS) and transcribed BLOG_TRANSCRIPTION_WORKERS
+# segments at a time. BLOG_TRANSCRIBER is 'assemblyai' (default), 'stub' for the
+# offline transcriber, or a dotted path to a Transcriber subclass.
+BLOG_MEDIA_ENABLED = os.environ.get('BLOG_MEDIA_ENABLED', 'True') == 'True'
+BLOG_TRANSCRIBER = os.environ.get('BLOG_TRANSCRIBER', 'assemblyai')
+BLOG_TRANSCRIBER_OPTIONS = json.loads(os.environ.get('BLOG_TRANSCRIBER_OPTIONS', '{}'))
+BLOG_TRANSCRIPTION_WORKERS = int(os.environ.get('BLOG_TRANSCRIPTION_WORKERS', '4'))
+BLOG_FFMPEG_PATH = os.environ.get('BLOG_FFMPEG_PATH', 'ffmpeg')
+BLOG_SEGMENT_TARGET_SECONDS = float(os.environ.get('BLOG_SEGMENT_TARGET_SECONDS', '300'))
+BLOG_SEGMENT_MAX_SECONDS = float(os.environ.get('BLOG_SEGMENT_MAX_SECONDS', '420'))
+BLOG_SILENCE_NOISE_DB = int(os.environ.get('BLOG_SILENCE_NOISE_DB', '-30'))
+BLOG_SILENCE_MIN_SECONDS = float(os.environ.get('BLOG_SILENCE_MIN_SECONDS', '0.5'))
+BLOG_MEDIA_MAX_UPLOAD_MB = int(os.environ.get('BLOG_MEDIA_MAX_UPLOAD_MB', '500'))
+
+# --- Near-Duplicate Detection ---
+# What generate_blog does when a transcript closely matches one of the user's posts:
+# 'offer' answers 409 with a link to it, 'reuse' returns it, 'ignore' generates anyway.
+# Requests can override this with "on_duplicate".
+BLOG_DUPLICATE_ACTION = os.environ.get('BLOG_DUPLICATE_ACTION', 'offer')
+# Also match other users' posts and, when the action is 'reuse', save a copy of
+# their article for the requesting user. Off by default: it hands one user's
+# article to another.
+BLOG_DUPLICATE_ACROSS_USERS = os.environ.get('BLOG_DUPLICATE_ACROSS_USERS', 'False') == 'True'
+# Estimated Jaccard similarity of the transcripts' 5-word shingles.
+BLOG_DUPLICATE_THRESHOLD = float(os.environ.get('BLOG_DUPLICATE_THRESHOLD', 0.8))
+BLOG_DUPLICATE_MAX_CANDIDATES = int(os.environ.get('BLOG_DUPLICATE_MAX_CANDIDATES', 20))
+
+# --- Batch Generation ---
+# Used by the generate-blog/batch/ endpoint and the bulk_generate command.
+BLOG_BATCH_CONCURRENCY = int(os.environ.get('BLOG_BATCH_CONCURRENCY', 4))
+# Articles are saved with one bulk insert per chunk.
+BLOG_BATCH_CHUNK_SIZE = int(os.environ.get('BLOG_BATCH_CHUNK_SIZE', 25))
+# Per-request limit of the HTTP endpoint; the management command has none.
+BLOG_BATCH_MAX_RECORDS = int(os.environ.get('BLOG_BATCH_MAX_RECORDS', 500))
+
+# --- Blog List ---
+BLOG_LIST_PAGE_SIZE = int(os.environ.get('BLOG_LIST_PAGE_SIZE', 20))
+
+# --- Archive Export ---
+# Posts fetched per database round trip while streaming an export.
+BLOG_EXPORT_CHUNK_SIZE = int(os.environ.get('BLOG_EXPORT_CHUNK_SIZE', 500))
+
+# --- User Stats ---
+# Days of activity shown on the blog list and returned by stats.json.
+BLOG_STATS_RECENT_DAYS = int(os.environ.get('BLOG_STATS_RECENT_DAYS', 14))
+
+# --- Admission Control ---
+# Limits applied in front of every generation. State lives in the database so it
+# is shared by all gunicorn workers.
+BLOG_ADMISSION_ENABLED = os.environ.get('BLOG_ADMISSION_ENABLED', 'True') == 'True'
+# Per-user token bucket: sustained generations per minute and burst size.
+BLOG_RATE_LIMIT_PER_MINUTE = float(os.environ.get('BLOG_RATE_LIMIT_PER_MINUTE', 4))
+BLOG_RATE_LIMIT_BURST = int(os.environ.get('BLOG_RATE_LIMIT_BURST', 3))
+# Global number of concurrent model calls; size it to the Gemini quota. A
+# generation holds one slot, and its parallel chunk summaries and sections take
+# one more each while slots are free.
+BLOG_MAX_IN_FLIGHT = int(os.environ.get('BLOG_MAX_IN_FLIGHT', 10))
+# Requests that find all slots busy wait in a bounded queue for at most BLOG_ADMISSION_MAX_WAIT seconds.
+BLOG_ADMISSION_QUEUE_SIZE = int(os.environ.get('BLOG_ADMISSION_QUEUE_SIZE', 20))
+BLOG_ADMISSION_MAX_WAIT = float(os.environ.get('BLOG_ADMISSION_MAX_WAIT', 30))
+BLOG_ADMISSION_SLOT_LEASE = int(os.environ.get('BLOG_ADMISSION_SLOT_LEASE', 600))
+
+# --- Metrics ---
+# Each process writes its metrics here; /metrics merges all of them so the numbers
+# cover every gunicorn worker. Use a directory shared by the workers of one host.
+BLOG_METRICS_DIR = os.environ.get('BLOG_METRICS_DIR', os.path.join(tempfile.gettempdir(), 'ai_blog_metrics'))
+BLOG_METRICS_FLUSH_INTERVAL = float(os.environ.get('BLOG_METRICS_FLUSH_INTERVAL', 5))
+# Bearer token for Prometheus scrapes. Without one, /metrics is restricted to staff users.
+BLOG_METRICS_TOKEN = os.environ.get('BLOG_METRICS_TOKEN')
@@ -1,5 +1,33 @@
+from django import forms
 from django.contrib import admin
-from .models import BlogPost
+from .models import BlogPost, GenerationCacheEntry, GenerationJob
+
+
+class BlogPostForm(forms.ModelForm):
+    # The body is stored compressed; edit it as text through the model property.
+    generated_content = forms.CharField(widget=forms.Textarea)
+
+    class Meta:
+        model = BlogPost
+        fields = '__all__'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.initial.setdefault('generated_content', self.instance.generated_content)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if 'generated_content' in cleaned_data:
+            self.instance.generated_content = cleaned_data['generated_content']
+        return cleaned_data
+
+
+class BlogPostAdmin(admin.ModelAdmin):
+    form = BlogPostForm
+
 
 # Register your models here.
-admin.site.register(BlogPost)
\ No newline at end of file
+admin.site.register(BlogPost, BlogPostAdmin)
+admin.site.register(GenerationJob)
+admin.site.register(GenerationCacheEntry)
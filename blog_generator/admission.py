@@ -0,0 +1,274 @@
+import asyncio
+import logging
+import math
+import time
+from contextlib import asynccontextmanager, contextmanager
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import metrics
+from .models import GenerationSlot, RateLimitBucket
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Key of the PostgreSQL advisory lock that serializes slot bookkeeping.
+ADMISSION_LOCK_ID = 7_240_001
+POLL_INTERVAL = 0.25
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a generation request is turned away; views answer with 429.
+    """
+    def __init__(self, reason, retry_after):
+        super().__init__(f"Generation request rejected ({reason}).")
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+# Per-process counters; queue depth and in-flight gauges are read from the database.
+decisions = metrics.counter(
+    'admission_decisions_total', 'Generation admission outcomes.', ('result',))
+REJECTION_REASONS = ('rate_limited', 'queue_full', 'timeout')
+
+def live_slot_counts():
+    live = GenerationSlot.objects.filter(expires_at__gt=timezone.now())
+    return (
+        live.filter(state=GenerationSlot.STATE_ACTIVE).count(),
+        live.filter(state=GenerationSlot.STATE_WAITING).count(),
+    )
+
+@metrics.register_collector
+def collect():
+    in_flight, queue_depth = live_slot_counts()
+    return {
+        'admission_in_flight': ('Generations currently holding a slot.', in_flight),
+        'admission_queue_depth': ('Generations waiting for a slot.', queue_depth),
+    }
+
+def reject(reason, retry_after):
+    decisions.inc(result=reason)
+    logger.warning(f"Admission rejected a generation request: {reason}.")
+    raise AdmissionRejected(reason, retry_after)
+
+
+# --- Per-User Token Bucket ---
+
+def take_token(user):
+    """
+    Spends one token from the user's bucket, refilling it for the time elapsed since
+    the last request. Raises AdmissionRejected when the bucket is empty.
+    """
+    if not settings.BLOG_ADMISSION_ENABLED:
+        return
+    rate = settings.BLOG_RATE_LIMIT_PER_MINUTE / 60
+    burst = settings.BLOG_RATE_LIMIT_BURST
+    now = timezone.now()
+    with transaction.atomic():
+        bucket, _ = RateLimitBucket.objects.select_for_update().get_or_create(
+            user=user, defaults={'tokens': burst, 'updated_at': now}
+        )
+        elapsed = (now - bucket.updated_at).total_seconds()
+        tokens = min(burst, bucket.tokens + max(0.0, elapsed) * rate)
+        if tokens < 1:
+            RateLimitBucket.objects.filter(pk=bucket.pk).update(tokens=tokens, updated_at=now)
+        else:
+            RateLimitBucket.objects.filter(pk=bucket.pk).update(tokens=tokens - 1, updated_at=now)
+            return
+    reject('rate_limited', (1 - tokens) / rate)
+
+
+# --- Global In-Flight Semaphore ---
+
+def lock_slots():
+    """
+    Serializes slot bookkeeping across processes. SQLite already runs each
+    transaction with the write lock held (see DATABASES OPTIONS).
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [ADMISSION_LOCK_ID])
+
+def try_acquire(user, waiting_slot=None):
+    """
+    One admission attempt. Returns an ACTIVE slot if one is free, otherwise the
+    caller's WAITING slot (created on the first attempt). Raises AdmissionRejected
+    when the wait queue is full.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        lock_slots()
+        GenerationSlot.objects.filter(expires_at__lte=now).delete()
+        active = GenerationSlot.objects.filter(state=GenerationSlot.STATE_ACTIVE).count()
+        free = settings.BLOG_MAX_IN_FLIGHT - active
+
+        if free > 0:
+            # FIFO: a newcomer only jumps in if nobody is waiting for the free slots.
+            ahead = GenerationSlot.objects.filter(state=GenerationSlot.STATE_WAITING)
+            if waiting_slot is not None:
+                ahead = ahead.filter(created_at__lt=waiting_slot.created_at)
+            if ahead.count() < free:
+                lease = now + timedelta(seconds=settings.BLOG_ADMISSION_SLOT_LEASE)
+                if waiting_slot is None:
+                    return GenerationSlot.objects.create(user=user, state=GenerationSlot.STATE_ACTIVE, expires_at=lease)
+                GenerationSlot.objects.filter(pk=waiting_slot.pk).update(state=GenerationSlot.STATE_ACTIVE, expires_at=lease)
+                waiting_slot.state = GenerationSlot.STATE_ACTIVE
+                return waiting_slot
+
+        if waiting_slot is not None:
+            return waiting_slot
+        if GenerationSlot.objects.filter(state=GenerationSlot.STATE_WAITING).count() >= settings.BLOG_ADMISSION_QUEUE_SIZE:
+            reject('queue_full', settings.BLOG_ADMISSION_MAX_WAIT)
+        expires_at = now + timedelta(seconds=settings.BLOG_ADMISSION_MAX_WAIT + 60)
+        return GenerationSlot.objects.create(user=user, state=GenerationSlot.STATE_WAITING, expires_at=expires_at)
+
+def release(slot):
+    GenerationSlot.objects.filter(pk=slot.pk).delete()
+
+def release_all(slots):
+    GenerationSlot.objects.filter(pk__in=[slot.pk for slot in slots]).delete()
+
+def acquire(user):
+    """
+    Blocks until a global in-flight slot is free, waiting in the bounded queue for at
+    most BLOG_ADMISSION_MAX_WAIT seconds.
+    """
+    deadline = time.monotonic() + settings.BLOG_ADMISSION_MAX_WAIT
+    slot = try_acquire(user)
+    while slot.state != GenerationSlot.STATE_ACTIVE:
+        if time.monotonic() >= deadline:
+            release(slot)
+            reject('timeout', settings.BLOG_ADMISSION_MAX_WAIT)
+        time.sleep(POLL_INTERVAL)
+        slot = try_acquire(user, slot)
+    decisions.inc(result='admitted')
+    return slot
+
+async def aacquire(user):
+    """
+    Async counterpart of acquire(); waits on the event loop instead of a thread.
+    """
+    deadline = time.monotonic() + settings.BLOG_ADMISSION_MAX_WAIT
+    slot = await sync_to_async(try_acquire)(user)
+    while slot.state != GenerationSlot.STATE_ACTIVE:
+        if time.monotonic() >= deadline:
+            await sync_to_async(release)(slot)
+            reject('timeout', settings.BLOG_ADMISSION_MAX_WAIT)
+        await asyncio.sleep(POLL_INTERVAL)
+        slot = await sync_to_async(try_acquire)(user, slot)
+    decisions.inc(result='admitted')
+    return slot
+
+
+# --- Fan-Out ---
+# A generation holds one slot, but summarizing the chunks of a long transcript
+# and writing the sections of a sectioned article make several model calls at
+# once. Every extra concurrent call takes a slot of its own, so
+# BLOG_MAX_IN_FLIGHT bounds model calls rather than generations.
+
+def take_free_slots(user_id, count):
+    """
+    Takes up to `count` of the slots that are free right now. Never waits: a
+    generation already holding a slot that queued for more could wait on another
+    doing the same. Takes none while requests are queued, as they come first.
+    """
+    if count <= 0:
+        return []
+    now = timezone.now()
+    with transaction.atomic():
+        lock_slots()
+        GenerationSlot.objects.filter(expires_at__lte=now).delete()
+        if GenerationSlot.objects.filter(state=GenerationSlot.STATE_WAITING).exists():
+            return []
+        active = GenerationSlot.objects.filter(state=GenerationSlot.STATE_ACTIVE).count()
+        count = min(count, settings.BLOG_MAX_IN_FLIGHT - active)
+        if count <= 0:
+            return []
+        lease = now + timedelta(seconds=settings.BLOG_ADMISSION_SLOT_LEASE)
+        return GenerationSlot.objects.bulk_create([
+            GenerationSlot(user_id=user_id, state=GenerationSlot.STATE_ACTIVE, expires_at=lease)
+            for _ in range(count)
+        ])
+
+@contextmanager
+def fan_out(slot, calls):
+    """
+    Yields how many of `calls` model calls a generation holding `slot` may make at
+    the same time: one on its own slot plus one per free slot, held until the block
+    ends. Callers without a slot (admission control off) get all of them.
+    """
+    if slot is None:
+        yield calls
+        return
+    extra = take_free_slots(slot.user_id, calls - 1)
+    try:
+        yield 1 + len(extra)
+    finally:
+        if extra:
+            release_all(extra)
+
+@asynccontextmanager
+async def afan_out(slot, calls):
+    """
+    Async counterpart of fan_out().
+    """
+    if slot is None:
+        yield calls
+        return
+    extra = await sync_to_async(take_free_slots)(slot.user_id, calls - 1)
+    try:
+        yield 1 + len(extra)
+    finally:
+        if extra:
+            await sync_to_async(release_all)(extra)
+
+
+# --- Entry Points ---
+
+def admit(user, rate_limit=True):
+    """
+    Runs the admission checks for one generation and returns the acquired slot, which
+    the caller must release(). Returns None when admission control is disabled.
+    """
+    if rate_limit:
+        take_token(user)
+    if not settings.BLOG_ADMISSION_ENABLED:
+        return None
+    return acquire(user)
+
+@contextmanager
+def generation_slot(user, rate_limit=True):
+    slot = admit(user, rate_limit)
+    try:
+        yield slot
+    finally:
+        if slot is not None:
+            release(slot)
+
+@asynccontextmanager
+async def ageneration_slot(user, rate_limit=True):
+    if rate_limit:
+        await sync_to_async(take_token)(user)
+    slot = await aacquire(user) if settings.BLOG_ADMISSION_ENABLED else None
+    try:
+        yield slot
+    finally:
+        if slot is not None:
+            await sync_to_async(release)(slot)
+
+def get_stats():
+    """
+    Rejection counters for this process plus the shared queue depth and in-flight count.
+    """
+    stats = {'admitted': decisions.value(result='admitted')}
+    for reason in REJECTION_REASONS:
+        stats[f'rejected_{reason}'] = decisions.value(result=reason)
+    stats['in_flight'], stats['queue_depth'] = live_slot_counts()
+    stats['max_in_flight'] = settings.BLOG_MAX_IN_FLIGHT
+    stats['queue_size'] = settings.BLOG_ADMISSION_QUEUE_SIZE
+    return stats
@@ -4,3 +4,27 @@ from django.apps import AppConfig
 class BlogGeneratorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog_generator'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.contrib.auth import get_user_model
+        from django.db.models.signals import post_delete, post_save
+        from . import auth, search, stats
+        from .metrics import count_query
+        from .models import BlogPost
+
+        # Keep the full-text index in step with article writes.
+        post_save.connect(search.index_post, sender=BlogPost, dispatch_uid='blogpost_search_index')
+        post_delete.connect(search.remove_post, sender=BlogPost, dispatch_uid='blogpost_search_remove')
+        # Per-user stats are added to where posts are created (generation.save_post/save_posts).
+        post_delete.connect(stats.remove_post, sender=BlogPost, dispatch_uid='blogpost_stats_remove')
+
+        # Drop cached auth users as soon as they change in this process.
+        post_save.connect(auth.evict_user, sender=get_user_model(), dispatch_uid='user_cache_evict_save')
+        post_delete.connect(auth.evict_user, sender=get_user_model(), dispatch_uid='user_cache_evict_delete')
+
+        def install_query_counter(sender, connection, **kwargs):
+            if count_query not in connection.execute_wrappers:
+                connection.execute_wrappers.append(count_query)
+
+        connection_created.connect(install_query_counter, weak=False)
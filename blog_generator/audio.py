@@ -0,0 +1,100 @@
+import logging
+import re
+import subprocess
+
+from django.conf import settings
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# ffmpeg helpers for splitting long recordings at pauses, so the pieces can be
+# transcribed in parallel without cutting words in half. Only the ffmpeg binary is
+# needed (build.sh installs it); durations are read from its banner.
+
+DURATION_PATTERN = re.compile(r'Duration:\s*(\d+):(\d{2}):(\d{2}(?:\.\d+)?)')
+SILENCE_START_PATTERN = re.compile(r'silence_start:\s*(-?\d+(?:\.\d+)?)')
+SILENCE_END_PATTERN = re.compile(r'silence_end:\s*(\d+(?:\.\d+)?)')
+
+
+class AudioError(Exception):
+    """
+    ffmpeg is missing or could not read the file.
+    """
+
+
+def run_ffmpeg(args, timeout=None):
+    """
+    Runs ffmpeg and returns its stderr, where it writes the banner and filter logs.
+    """
+    command = [settings.BLOG_FFMPEG_PATH, '-hide_banner', '-nostdin', *args]
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    except OSError as e:
+        raise AudioError(f"Could not run ffmpeg at '{settings.BLOG_FFMPEG_PATH}': {e}")
+    except subprocess.TimeoutExpired:
+        raise AudioError("ffmpeg timed out.")
+    return completed.returncode, completed.stderr
+
+def probe_duration(path):
+    """
+    Duration of a media file in seconds.
+    """
+    # ffmpeg exits non-zero when given no output; the banner is all we need.
+    _, log = run_ffmpeg(['-i', str(path)], timeout=60)
+    match = DURATION_PATTERN.search(log)
+    if not match:
+        raise AudioError(f"Could not read the duration of {path}: {log.strip()[-200:]}")
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+def detect_silences(path):
+    """
+    Returns [(start, end)] of the pauses ffmpeg's silencedetect filter finds.
+    """
+    returncode, log = run_ffmpeg([
+        '-nostats', '-i', str(path), '-vn',
+        '-af', f'silencedetect=noise={settings.BLOG_SILENCE_NOISE_DB}dB:d={settings.BLOG_SILENCE_MIN_SECONDS}',
+        '-f', 'null', '-',
+    ])
+    if returncode != 0:
+        raise AudioError(f"Silence detection failed for {path}: {log.strip()[-200:]}")
+    silences, start = [], None
+    for line in log.splitlines():
+        if (match := SILENCE_START_PATTERN.search(line)):
+            start = max(0.0, float(match.group(1)))
+        elif (match := SILENCE_END_PATTERN.search(line)) and start is not None:
+            silences.append((start, float(match.group(1))))
+            start = None
+    return silences
+
+def plan_segments(duration, silences, target_seconds, max_seconds):
+    """
+    Splits [0, duration] into segments of about target_seconds, cutting in the
+    middle of a pause. A segment that reaches max_seconds without a pause is cut
+    there.
+    """
+    cut_points = [(start + end) / 2 for start, end in silences]
+    segments, position = [], 0.0
+    while duration - position > max_seconds:
+        window = [c for c in cut_points if position + target_seconds <= c <= position + max_seconds]
+        if not window:
+            # No pause late enough; take the last one past the halfway mark, if any.
+            window = [c for c in cut_points if position + target_seconds / 2 <= c < position + target_seconds][-1:]
+        cut = window[0] if window else position + max_seconds
+        segments.append((position, cut))
+        position = cut
+    segments.append((position, duration))
+    return segments
+
+def extract_segment(path, start, end, destination):
+    """
+    Writes [start, end) of the audio track as 16 kHz mono FLAC, which speech
+    recognizers accept and which is far smaller than WAV.
+    """
+    returncode, log = run_ffmpeg([
+        '-y', '-ss', f'{start:.3f}', '-t', f'{end - start:.3f}', '-i', str(path),
+        '-vn', '-ac', '1', '-ar', '16000', '-c:a', 'flac', str(destination),
+    ])
+    if returncode != 0:
+        raise AudioError(f"Could not extract {start:.1f}-{end:.1f}s of {path}: {log.strip()[-200:]}")
+    return destination
@@ -0,0 +1,82 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+
+from . import metrics
+
+# AuthenticationMiddleware loads request.user through the backend's get_user() on
+# every request that touches it, which is one query per page behind login_required.
+# CachedModelBackend keeps recently seen users in a per-process LRU. Saving or
+# deleting a user evicts it in the saving process (see apps.py); other processes
+# pick the change up once the entry expires after BLOG_USER_CACHE_SECONDS.
+
+lookups = metrics.counter('user_cache_lookups_total', 'Auth user lookups by cache result.', ('result',))
+
+
+class UserCache:
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at < time.monotonic():
+                del self.entries[user_id]
+                return None
+            self.entries.move_to_end(user_id)
+        # Each request gets its own copy, so per-request state such as permission
+        # caches never leaks between requests.
+        return copy.copy(user)
+
+    def set(self, user_id, user):
+        with self.lock:
+            self.entries[user_id] = (time.monotonic() + self.ttl, copy.copy(user))
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def evict(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache(settings.BLOG_USER_CACHE_SIZE, settings.BLOG_USER_CACHE_SECONDS)
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend whose get_user() is served from the per-process user cache.
+    """
+    def get_user(self, user_id):
+        if settings.BLOG_USER_CACHE_SECONDS <= 0:
+            return super().get_user(user_id)
+        user = user_cache.get(user_id)
+        if user is not None:
+            lookups.inc(result='hit')
+            return user
+        lookups.inc(result='miss')
+        user = super().get_user(user_id)
+        if user is not None:
+            user_cache.set(user.pk, user)
+        return user
+
+
+def evict_user(sender, instance, **kwargs):
+    """
+    post_save/post_delete receiver for the user model.
+    """
+    user_cache.evict(instance.pk)
@@ -0,0 +1,235 @@
+import hashlib
+import json
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+from django.db import IntegrityError, close_old_connections
+
+from . import admission, generation, generation_cache, metrics
+from .models import BlogPost
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+batch_records = metrics.counter('batch_records_total', 'Batch import records by outcome.', ('status',))
+
+
+@dataclass
+class BatchRecord:
+    line: int
+    key: str
+    title: str
+    transcript: str
+    link: str
+
+
+# --- Input ---
+
+def record_key(data):
+    """
+    Stable identity of an input record: its "key" field if given, otherwise its
+    content. Reruns of the same file produce the same keys.
+    """
+    if data.get('key'):
+        material = f"key\0{data['key']}"
+    else:
+        material = '\0'.join((data.get('title') or '', data.get('link') or '', generation_cache.normalize_transcript(data['transcript'])))
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+def parse_records(lines):
+    """
+    Yields a BatchRecord or a failed result for every non-blank JSONL line.
+    """
+    for number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+            if not isinstance(data, dict) or not isinstance(data.get('transcript'), str) or not data['transcript'].strip():
+                raise ValueError("Each record needs a non-empty \"transcript\".")
+        except ValueError as e:
+            yield failed(number, None, str(e))
+            continue
+        yield BatchRecord(
+            line=number,
+            key=record_key(data),
+            title=data.get('title') or '',
+            transcript=data['transcript'],
+            link=data.get('link') or 'N/A',
+        )
+
+def limit_records(items, max_records):
+    for count, item in enumerate(items):
+        if count >= max_records:
+            line = item.line if isinstance(item, BatchRecord) else item['line']
+            yield failed(line, None, f"Batches are limited to {max_records} records.")
+            return
+        yield item
+
+def new_records(user, items, window):
+    """
+    Passes through records that have not been imported yet, checking a window of
+    keys per query. Already imported records (and repeats within the input) are
+    yielded as skipped results.
+    """
+    seen = set()
+
+    def check(batch):
+        keys = [item.key for item in batch if isinstance(item, BatchRecord)]
+        existing = dict(BlogPost.objects.filter(user=user, import_key__in=keys).values_list('import_key', 'pk'))
+        for item in batch:
+            if not isinstance(item, BatchRecord):
+                yield item
+            elif item.key in existing:
+                yield result(item, 'skipped', blog_id=existing[item.key], reason='already imported')
+            elif item.key in seen:
+                yield result(item, 'skipped', reason='repeated in input')
+            else:
+                seen.add(item.key)
+                yield item
+
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= window:
+            yield from check(batch)
+            batch = []
+    yield from check(batch)
+
+
+# --- Results ---
+
+def result(record, status, **fields):
+    batch_records.inc(status=status)
+    return {'line': record.line, 'key': record.key, 'status': status, **fields}
+
+def failed(line, key, error, **fields):
+    batch_records.inc(status='failed')
+    return {'line': line, 'key': key, 'status': 'failed', 'error': error, **fields}
+
+
+# --- Execution ---
+
+def generate_record(user, record, mode=None):
+    """
+    Runs in a pool thread. Holds a global in-flight slot like any other generation.
+    """
+    try:
+        with admission.generation_slot(user, rate_limit=False) as slot:
+            return generation.generate_article(record.transcript, record.title, mode, slot)
+    finally:
+        close_old_connections()
+
+def save_chunk(user, chunk):
+    """
+    Bulk-inserts generated articles and yields their results. If a concurrent run
+    imported some of the same keys meanwhile, falls back to one insert per record.
+    """
+    if not chunk:
+        return
+    posts = [
+        generation.build_post(user, title, record.link, content, record.transcript, import_key=record.key)
+        for record, (title, content) in chunk
+    ]
+    try:
+        created = generation.save_posts(posts)
+    except IntegrityError:
+        for (record, _), blog_post in zip(chunk, posts):
+            try:
+                generation.save_posts([blog_post])
+            except IntegrityError:
+                yield result(record, 'skipped', reason='already imported')
+            else:
+                yield result(record, 'created', blog_id=blog_post.pk, title=blog_post.youtube_title)
+        return
+    for (record, _), blog_post in zip(chunk, created):
+        yield result(record, 'created', blog_id=blog_post.pk, title=blog_post.youtube_title)
+
+def run_batch(user, lines, concurrency=4, chunk_size=25, max_records=None, mode=None, rate_limit=False, prepaid=0):
+    """
+    Generates an article for every JSONL record in `lines` and yields one result
+    dict per record as it completes, followed by a summary dict.
+
+    Input is read lazily and at most `concurrency` generations run at once.
+    Finished articles are saved with bulk_create every `chunk_size` records.
+    Failures are reported per record and do not stop the batch. Records already
+    imported by an earlier run are skipped, so an interrupted file can be rerun.
+    `mode` is the generation mode of every article.
+
+    With rate_limit, every record generated costs a token from the user's bucket,
+    the first `prepaid` ones excepted (the caller took them already). Once the
+    bucket is empty the batch stops reading input and the summary carries
+    "retry_after"; rerunning the file after that picks up where it stopped.
+    """
+    totals = {'created': 0, 'skipped': 0, 'failed': 0}
+    rejection = None
+
+    def tally(item):
+        totals[item['status']] += 1
+        return item
+
+    items = parse_records(lines)
+    if max_records is not None:
+        items = limit_records(items, max_records)
+    records = new_records(user, items, window=chunk_size)
+
+    in_flight = {}
+    finished = []
+    exhausted = False
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='batch') as pool:
+        try:
+            while True:
+                while not exhausted and len(in_flight) < concurrency:
+                    item = next(records, None)
+                    if item is None:
+                        exhausted = True
+                    elif isinstance(item, BatchRecord):
+                        try:
+                            if rate_limit and prepaid <= 0:
+                                admission.take_token(user)
+                        except admission.AdmissionRejected as e:
+                            rejection = e
+                            exhausted = True
+                            yield tally(failed(item.line, item.key, str(e), retry_after=e.retry_after))
+                            continue
+                        prepaid -= 1
+                        in_flight[pool.submit(generate_record, user, item, mode)] = item
+                    else:
+                        yield tally(item)
+                if not in_flight:
+                    # Input ran out while finished articles waited for a full chunk.
+                    chunk, finished = finished, []
+                    for item in save_chunk(user, chunk):
+                        yield tally(item)
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record = in_flight.pop(future)
+                    try:
+                        finished.append((record, future.result()))
+                    except Exception as e:
+                        logger.error(f"Batch record on line {record.line} failed: {e}")
+                        yield tally(failed(record.line, record.key, str(e)))
+
+                if len(finished) >= chunk_size or (exhausted and not in_flight):
+                    chunk, finished = finished, []
+                    for item in save_chunk(user, chunk):
+                        yield tally(item)
+        finally:
+            # The consumer went away (e.g. the client disconnected). Keep the articles
+            # already paid for so a rerun skips them.
+            for future, record in in_flight.items():
+                if not future.exception():
+                    finished.append((record, future.result()))
+            if finished:
+                list(save_chunk(user, finished))
+                logger.warning(f"Batch interrupted; saved {len(finished)} finished article(s).")
+
+    summary = {'status': 'summary', **totals}
+    if rejection is not None:
+        summary['retry_after'] = rejection.retry_after
+    yield summary
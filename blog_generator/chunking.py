@@ -0,0 +1,53 @@
+import re
+
+# Rough size of a Gemini token for English text; good enough for budgeting chunks.
+CHARS_PER_TOKEN = 4
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def estimate_tokens(text):
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+def split_sentences(text):
+    for sentence in SENTENCE_END.split(text.strip()):
+        sentence = ' '.join(sentence.split())
+        if sentence:
+            yield sentence
+
+def split_oversized(sentence, max_tokens):
+    """
+    Auto-generated captions often have no punctuation at all, so a single
+    "sentence" can exceed the budget. Those are split on word boundaries.
+    """
+    if estimate_tokens(sentence) <= max_tokens:
+        yield sentence
+        return
+    # Measured in characters like estimate_tokens(); a token count per word would
+    # round most words down and overshoot the budget.
+    piece, length = [], 0
+    for word in sentence.split(' '):
+        new_length = length + len(word) + (1 if piece else 0)
+        if piece and new_length // CHARS_PER_TOKEN > max_tokens:
+            yield ' '.join(piece)
+            piece, new_length = [], len(word)
+        piece.append(word)
+        length = new_length
+    if piece:
+        yield ' '.join(piece)
+
+def chunk_transcript(transcript, max_tokens):
+    """
+    Greedily packs whole sentences into chunks of at most `max_tokens` estimated tokens.
+    """
+    chunks, current, current_tokens = [], [], 0
+    for sentence in split_sentences(transcript):
+        for piece in split_oversized(sentence, max_tokens):
+            tokens = estimate_tokens(piece)
+            if current and current_tokens + tokens > max_tokens:
+                chunks.append(' '.join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += tokens
+    if current:
+        chunks.append(' '.join(current))
+    return chunks
@@ -0,0 +1,47 @@
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Compressed storage for article bodies. The first byte of a stored value says how
+# the rest is encoded, so the codec can change without rewriting old rows and
+# values written with Brotli remain readable wherever Brotli is installed.
+
+STORED = 0
+ZLIB = 1
+BROTLI = 2
+
+# Articles are written once and read many times; quality 9 compresses within a
+# few percent of 11 at a tenth of the cost. Decompression speed barely varies.
+BROTLI_QUALITY = 9
+ZLIB_LEVEL = 6
+# Below this many bytes the header and codec framing outweigh the savings.
+MIN_COMPRESS_BYTES = 64
+
+
+def compress(text):
+    data = text.encode('utf-8')
+    if len(data) < MIN_COMPRESS_BYTES:
+        return bytes([STORED]) + data
+    if brotli is not None:
+        packed = bytes([BROTLI]) + brotli.compress(data, mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY)
+    else:
+        packed = bytes([ZLIB]) + zlib.compress(data, ZLIB_LEVEL)
+    return packed if len(packed) < len(data) + 1 else bytes([STORED]) + data
+
+def decompress(value):
+    value = bytes(value)
+    if not value:
+        return ''
+    codec, payload = value[0], value[1:]
+    if codec == STORED:
+        return payload.decode('utf-8')
+    if codec == ZLIB:
+        return zlib.decompress(payload).decode('utf-8')
+    if codec == BROTLI:
+        if brotli is None:
+            raise RuntimeError("This content is Brotli-compressed but the brotli package is not installed.")
+        return brotli.decompress(payload).decode('utf-8')
+    raise ValueError(f"Unknown content codec {codec}.")
@@ -0,0 +1,156 @@
+import base64
+import io
+import json
+import zipfile
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils.text import slugify
+
+from . import metrics
+from .models import BlogPost
+
+# Streams a user's articles out as JSONL (one post per line) or as a ZIP of
+# markdown files. Posts are read in id order through iterator(chunk_size), so only
+# one chunk of rows and one compressed entry are held at a time, whatever the size
+# of the archive. The ZIP is written to an unseekable buffer, which makes zipfile
+# use data descriptors instead of seeking back. It still has to remember each
+# entry for the central directory written at the end, about 1 KB per post.
+#
+# Each export is cut off at the newest post that existed when it started, and
+# returns a cursor for that post. Passing it back as `since` exports only the
+# posts created afterwards.
+
+EXPORT_FORMATS = ('zip', 'jsonl')
+CONTENT_TYPES = {'zip': 'application/zip', 'jsonl': 'application/x-ndjson'}
+
+exported_posts = metrics.counter('exported_posts_total', 'Posts written to archive exports, by format.', ('format',))
+
+
+def encode_since(pk):
+    return base64.urlsafe_b64encode(f"export|{pk}".encode()).decode().rstrip('=')
+
+def decode_since(cursor):
+    """
+    Returns the post id a `since` cursor points at; raises ValueError if it is malformed.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        prefix, pk = base64.urlsafe_b64decode(padded.encode()).decode().split('|', 1)
+        if prefix != 'export':
+            raise ValueError("not an export cursor")
+        return int(pk)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+class Export:
+    """
+    One export of `user`'s posts after the `since` cursor. `next_since` is known
+    before streaming starts, so it can go in a response header.
+    """
+    def __init__(self, user, export_format, since=None, chunk_size=None):
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format '{export_format}'.")
+        self.user = user
+        self.format = export_format
+        self.chunk_size = chunk_size or settings.BLOG_EXPORT_CHUNK_SIZE
+        self.after = decode_since(since) if since else 0
+        posts = BlogPost.objects.filter(user=user, pk__gt=self.after)
+        self.until = posts.aggregate(last=Max('pk'))['last']
+        self.next_since = encode_since(self.until or self.after)
+
+    @property
+    def content_type(self):
+        return CONTENT_TYPES[self.format]
+
+    @property
+    def filename(self):
+        return f"{self.user.username}-articles.{self.format}"
+
+    def posts(self):
+        if self.until is None:
+            return
+        yield from (
+            BlogPost.objects.filter(user=self.user, pk__gt=self.after, pk__lte=self.until)
+            .only('id', 'youtube_title', 'youtube_link', 'created_at', 'content_compressed', 'content_legacy')
+            .order_by('pk')
+            .iterator(chunk_size=self.chunk_size)
+        )
+
+    def chunks(self):
+        """
+        Yields the export as bytes.
+        """
+        if self.format == 'jsonl':
+            return self.jsonl_chunks()
+        return self.zip_chunks()
+
+    def jsonl_chunks(self):
+        for post in self.posts():
+            exported_posts.inc(format='jsonl')
+            yield (json.dumps(post_record(post)) + '\n').encode('utf-8')
+
+    def zip_chunks(self):
+        buffer = StreamBuffer()
+        with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for post in self.posts():
+                info = zipfile.ZipInfo(markdown_filename(post), date_time=post.created_at.timetuple()[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED
+                archive.writestr(info, post_markdown(post))
+                exported_posts.inc(format='zip')
+                yield buffer.drain()
+            archive.writestr('export.json', json.dumps({'username': self.user.username, 'next_since': self.next_since}))
+        yield buffer.drain()
+
+
+class StreamBuffer(io.RawIOBase):
+    """
+    Write-only, unseekable sink that hands out what has been written so far.
+    """
+    def __init__(self):
+        self.pending = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.pending.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self.pending)
+        self.pending.clear()
+        return data
+
+
+# --- Post Formatting ---
+
+def post_record(post):
+    return {
+        'id': post.pk,
+        'title': post.youtube_title,
+        'link': post.youtube_link,
+        'created_at': post.created_at.isoformat(),
+        'content': post.generated_content,
+    }
+
+def markdown_filename(post):
+    slug = slugify(post.youtube_title)[:60] or 'article'
+    return f"articles/{post.created_at:%Y-%m-%d}-{slug}-{post.pk}.md"
+
+def post_markdown(post):
+    """
+    The article as markdown with YAML front matter. JSON strings are valid YAML,
+    which takes care of quoting titles.
+    """
+    front_matter = [
+        '---',
+        f"title: {json.dumps(post.youtube_title, ensure_ascii=False)}",
+        f"created_at: {post.created_at.isoformat()}",
+        f"id: {post.pk}",
+    ]
+    if post.youtube_link and post.youtube_link != 'N/A':
+        front_matter.append(f"source: {json.dumps(post.youtube_link, ensure_ascii=False)}")
+    front_matter.append('---')
+    return '\n'.join(front_matter) + f"\n\n# {post.youtube_title}\n\n{post.generated_content}\n"
@@ -0,0 +1,524 @@
+import asyncio
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+
+from . import admission, chunking, generation_cache, llm, metrics, preprocess, search, similarity, stats
+from .models import BlogPost, TranscriptBand
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Bump whenever the prompt templates change so cached articles are not reused.
+PROMPT_VERSION = '1'
+CONTENT_DELIMITER = '---CONTENT---'
+FALLBACK_TITLE = "A Blog Post About Your Video"
+# BlogPost.youtube_title is a CharField(max_length=300); if no delimiter shows up
+# within this many streamed characters the model ignored the instructions.
+MAX_STREAMED_TITLE_LENGTH = 300
+# 'single' writes the article in one model call. 'sectioned' asks for a title and
+# outline first, then writes the sections concurrently and joins them in order,
+# so latency follows the longest section instead of the whole article.
+GENERATION_MODES = ('single', 'sectioned')
+# Fewer usable outline lines than this and sectioned generation falls back to a
+# single call.
+MIN_OUTLINE_SECTIONS = 2
+OUTLINE_LINE = re.compile(r'^\s*(?:\d+[.)]|[-*])\s+(.+?)\s*$')
+
+sectioned_outlines = metrics.counter(
+    'sectioned_outlines_total', 'Outlines requested by sectioned generation, by result.', ('result',)
+)
+
+# --- Prompt Helpers ---
+
+def build_combined_prompt(transcript):
+    """
+    Builds a single prompt asking for both the title and the article,
+    separated by a unique delimiter.
+    """
+    return (
+        f"Based on the following transcript, perform two tasks:\n"
+        f"1. Generate a concise and compelling blog post title (no more than 10 words, no quotes).\n"
+        f"2. Write a comprehensive and well-structured blog article.\n\n"
+        f"Separate the title and the article with the special delimiter '{CONTENT_DELIMITER}'.\n\n"
+        f"Transcript: {transcript}\n\n"
+        f"Title and Article:"
+    )
+
+def build_chunk_prompt(chunk, index, total):
+    """
+    Map step for long transcripts: condense one chunk into dense notes.
+    """
+    return (
+        f"The following is part {index} of {total} of a long video transcript.\n"
+        f"Summarize it as concise notes that keep every key point, fact, example and conclusion. "
+        f"Do not add an introduction or a title.\n\n"
+        f"Transcript part: {chunk}\n\n"
+        f"Notes:"
+    )
+
+def build_reduce_prompt(notes):
+    """
+    Reduce step for long transcripts: write the title and article from the chunk notes.
+    """
+    joined_notes = "\n\n".join(f"Part {i}:\n{note}" for i, note in enumerate(notes, start=1))
+    return (
+        f"The following notes summarize a long video transcript, in order. Based on them, perform two tasks:\n"
+        f"1. Generate a concise and compelling blog post title (no more than 10 words, no quotes).\n"
+        f"2. Write a comprehensive and well-structured blog article covering the whole video.\n\n"
+        f"Separate the title and the article with the special delimiter '{CONTENT_DELIMITER}'.\n\n"
+        f"Notes:\n{joined_notes}\n\n"
+        f"Title and Article:"
+    )
+
+def build_outline_prompt(source, max_sections):
+    """
+    First call of sectioned generation: the title and a numbered section outline,
+    separated by the same delimiter as the full article.
+    """
+    return (
+        f"Based on the following material from a video, plan a blog article. Perform two tasks:\n"
+        f"1. Generate a concise and compelling blog post title (no more than 10 words, no quotes).\n"
+        f"2. Outline a comprehensive, well-structured article as 3 to {max_sections} sections, one per line, "
+        f"formatted as '<number>. <section heading> | <one sentence on what the section covers>'. "
+        f"The first section introduces the topic and the last one concludes.\n\n"
+        f"Separate the title and the outline with the special delimiter '{CONTENT_DELIMITER}'.\n\n"
+        f"{source}\n\n"
+        f"Title and Outline:"
+    )
+
+def build_section_prompt(source, title, outline, index):
+    """
+    Writes the body of one outline section. The whole outline is included so the
+    sections, written independently, don't repeat each other.
+    """
+    planned = "\n".join(f"{i}. {section.heading} | {section.summary}" for i, section in enumerate(outline, start=1))
+    section = outline[index - 1]
+    return (
+        f"You are writing one section of a blog article titled \"{title}\". The article is planned as:\n"
+        f"{planned}\n\n"
+        f"Write only section {index}, \"{section.heading}\" ({section.summary}). "
+        f"Do not repeat the heading and do not cover material planned for other sections. "
+        f"Use paragraphs, and lists where they help.\n\n"
+        f"{source}\n\n"
+        f"Section text:"
+    )
+
+def split_generated_text(full_text, title=None):
+    """
+    Splits the model output into (title, content).
+    A title provided by the user always wins over the generated one.
+    """
+    if CONTENT_DELIMITER in full_text:
+        metrics.generation_responses.inc(delimiter='found')
+        generated_title, generated_content = full_text.split(CONTENT_DELIMITER, 1)
+        final_title = title if title else generated_title.strip()
+        final_content = generated_content.strip()
+    else:
+        # Fallback in case the model doesn't follow instructions perfectly.
+        logger.warning(f"Delimiter '{CONTENT_DELIMITER}' not found in AI response. Using fallback.")
+        metrics.generation_responses.inc(delimiter='missing')
+        final_title = title if title else FALLBACK_TITLE
+        final_content = full_text
+    return final_title, final_content
+
+
+class DelimiterSplitter:
+    """
+    Incrementally splits a streamed model response into title and content.
+
+    Chunks are fed as they arrive; feed() returns a list of (part, text) events,
+    where part is 'title' or 'content'. Everything before the delimiter is buffered
+    and searched as a whole, so a delimiter split across chunks is still found.
+    """
+    def __init__(self):
+        self.in_content = False
+        self.buffer = ''
+        self.title = ''
+        self.content = []
+        self.found_delimiter = False
+
+    def feed(self, chunk):
+        if self.in_content:
+            return self._emit_content(chunk)
+
+        self.buffer += chunk
+        if CONTENT_DELIMITER in self.buffer:
+            title, rest = self.buffer.split(CONTENT_DELIMITER, 1)
+            self.buffer = ''
+            self.in_content = True
+            self.found_delimiter = True
+            self.title = title.strip()
+            return [('title', self.title)] + self._emit_content(rest)
+
+        if len(self.buffer) > MAX_STREAMED_TITLE_LENGTH:
+            # Fallback in case the model doesn't follow instructions perfectly.
+            logger.warning(f"Delimiter '{CONTENT_DELIMITER}' not found in streamed AI response. Using fallback.")
+            text, self.buffer = self.buffer, ''
+            self.in_content = True
+            return self._emit_content(text)
+        return []
+
+    def finish(self):
+        """
+        Flushes whatever is still buffered once the stream has ended.
+        """
+        text, self.buffer = self.buffer, ''
+        if not self.in_content:
+            if text.strip():
+                logger.warning(f"Delimiter '{CONTENT_DELIMITER}' not found in streamed AI response. Using fallback.")
+            self.in_content = True
+        metrics.generation_responses.inc(delimiter='found' if self.found_delimiter else 'missing')
+        return self._emit_content(text)
+
+    def result(self, title=None):
+        """
+        Returns the final (title, content), mirroring split_generated_text().
+        """
+        final_title = title if title else (self.title if self.found_delimiter else FALLBACK_TITLE)
+        return final_title, ''.join(self.content).strip()
+
+    def _emit_content(self, text):
+        if not self.content:
+            text = text.lstrip()
+        if not text:
+            return []
+        self.content.append(text)
+        return [('content', text)]
+
+
+@dataclass
+class OutlineSection:
+    heading: str
+    summary: str
+
+
+def parse_outline(text, max_sections):
+    """
+    Reads "<number>. heading | summary" lines from an outline, ignoring anything else.
+    """
+    sections = []
+    for line in text.splitlines():
+        match = OUTLINE_LINE.match(line)
+        if not match:
+            continue
+        heading, _, summary = match.group(1).partition('|')
+        heading = heading.strip().strip('#*').strip()
+        if heading:
+            sections.append(OutlineSection(heading, summary.strip()))
+    return sections[:max_sections]
+
+def clean_section(text, heading):
+    """
+    Strips a repeated heading from the start of a generated section.
+    """
+    text = text.strip()
+    first_line, _, rest = text.partition('\n')
+    if first_line.lstrip('#* ').rstrip('* ').strip().lower() == heading.lower():
+        text = rest.strip()
+    return text
+
+def format_section(section, body):
+    return f"## {section.heading}\n\n{body}"
+
+
+# --- Generation Pipeline ---
+
+def is_long_transcript(transcript):
+    return len(transcript) > settings.BLOG_LONG_TRANSCRIPT_CHARS
+
+def prepare_transcript(transcript):
+    """
+    Cleans (and optionally compresses) the transcript before it goes into a prompt.
+    """
+    prepared = preprocess.prepare(transcript)
+    preprocess.record(prepared)
+    if prepared.tokens_after < prepared.tokens_before:
+        logger.info(f"Preprocessing cut the transcript from ~{prepared.tokens_before} to ~{prepared.tokens_after} tokens.")
+    return prepared.text
+
+def summarize_chunks(transcript, slot=None):
+    """
+    Map step for long transcripts: splits the prepared transcript into
+    sentence-aligned chunks and summarizes them in parallel, as many at a time as
+    BLOG_CHUNK_WORKERS and the free admission slots allow (see admission.fan_out).
+    """
+    chunks = chunking.chunk_transcript(transcript, settings.BLOG_CHUNK_TOKENS)
+    logger.info(f"Long transcript ({len(transcript)} chars): summarizing {len(chunks)} chunks in parallel...")
+
+    backend = llm.get_backend()
+
+    def summarize(numbered_chunk):
+        index, chunk = numbered_chunk
+        return backend.generate(build_chunk_prompt(chunk, index, len(chunks))).strip()
+
+    with admission.fan_out(slot, min(settings.BLOG_CHUNK_WORKERS, len(chunks))) as workers, \
+            ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(summarize, enumerate(chunks, start=1)))
+
+async def asummarize_chunks(transcript, slot=None):
+    """
+    Async counterpart of summarize_chunks(); chunk summaries are bounded by a semaphore.
+    """
+    chunks = chunking.chunk_transcript(transcript, settings.BLOG_CHUNK_TOKENS)
+    logger.info(f"Long transcript ({len(transcript)} chars): summarizing {len(chunks)} chunks in parallel...")
+    backend = llm.get_backend()
+
+    async def summarize(semaphore, index, chunk):
+        async with semaphore:
+            notes = await backend.agenerate(build_chunk_prompt(chunk, index, len(chunks)))
+            return notes.strip()
+
+    async with admission.afan_out(slot, min(settings.BLOG_CHUNK_WORKERS, len(chunks))) as workers:
+        semaphore = asyncio.Semaphore(workers)
+        return await asyncio.gather(*(summarize(semaphore, index, chunk) for index, chunk in enumerate(chunks, start=1)))
+
+def build_prompt(transcript, slot=None):
+    """
+    Returns the prompt for the final generation call. Long transcripts are first
+    split into sentence-aligned chunks that are summarized in parallel.
+    `slot` is the caller's admission slot.
+    """
+    transcript = prepare_transcript(transcript)
+    if not is_long_transcript(transcript):
+        return build_combined_prompt(transcript)
+    return build_reduce_prompt(summarize_chunks(transcript, slot))
+
+async def abuild_prompt(transcript, slot=None):
+    """
+    Async counterpart of build_prompt().
+    """
+    transcript = prepare_transcript(transcript)
+    if not is_long_transcript(transcript):
+        return build_combined_prompt(transcript)
+    return build_reduce_prompt(await asummarize_chunks(transcript, slot))
+
+def format_notes(notes):
+    joined_notes = "\n\n".join(f"Part {i}:\n{note}" for i, note in enumerate(notes, start=1))
+    return f"Notes summarizing a long video transcript, in order:\n{joined_notes}"
+
+def sectioned_source(transcript, slot=None):
+    """
+    Returns (source, fallback_prompt) for sectioned generation: the material every
+    outline and section prompt is based on, and the single-call prompt used if the
+    outline can't be parsed.
+    """
+    transcript = prepare_transcript(transcript)
+    if not is_long_transcript(transcript):
+        return f"Transcript: {transcript}", build_combined_prompt(transcript)
+    notes = summarize_chunks(transcript, slot)
+    return format_notes(notes), build_reduce_prompt(notes)
+
+async def asectioned_source(transcript, slot=None):
+    """
+    Async counterpart of sectioned_source().
+    """
+    transcript = prepare_transcript(transcript)
+    if not is_long_transcript(transcript):
+        return f"Transcript: {transcript}", build_combined_prompt(transcript)
+    notes = await asummarize_chunks(transcript, slot)
+    return format_notes(notes), build_reduce_prompt(notes)
+
+def outline_result(outline_text):
+    """
+    Returns (title, sections), or (title, []) if the model's outline is unusable.
+    """
+    title, outline = split_generated_text(outline_text)
+    sections = parse_outline(outline, settings.BLOG_MAX_SECTIONS)
+    if len(sections) < MIN_OUTLINE_SECTIONS:
+        logger.warning(f"Outline had {len(sections)} usable section(s). Falling back to single-call generation.")
+        sectioned_outlines.inc(result='fallback')
+        return title, []
+    sectioned_outlines.inc(result='parsed')
+    return title, sections
+
+def stream_sectioned(transcript, slot=None):
+    """
+    Sectioned generation. Yields text in the same "title, delimiter, article" shape
+    as a single model response: the title once the outline is back, then each
+    section in order as soon as it and the ones before it are written. Sections are
+    generated as many at a time as BLOG_SECTION_WORKERS and the free admission
+    slots allow (see admission.fan_out).
+    """
+    backend = llm.get_backend()
+    source, fallback_prompt = sectioned_source(transcript, slot)
+    outline_text = backend.generate(build_outline_prompt(source, settings.BLOG_MAX_SECTIONS))
+    title, sections = outline_result(outline_text.strip())
+    if not sections:
+        yield from backend.stream(fallback_prompt)
+        return
+
+    def write_section(index):
+        text = backend.generate(build_section_prompt(source, title, sections, index))
+        return clean_section(text, sections[index - 1].heading)
+
+    yield f"{title}\n{CONTENT_DELIMITER}\n"
+    with admission.fan_out(slot, min(settings.BLOG_SECTION_WORKERS, len(sections))) as workers, \
+            ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(write_section, index) for index in range(1, len(sections) + 1)]
+        try:
+            for index, (section, future) in enumerate(zip(sections, futures)):
+                yield ("\n\n" if index else "") + format_section(section, future.result())
+        finally:
+            # The consumer stopped or a section failed; don't pay for the rest.
+            for future in futures:
+                future.cancel()
+
+async def agenerate_sectioned(transcript, slot=None):
+    """
+    Async counterpart of stream_sectioned(), returning the whole response text.
+    """
+    backend = llm.get_backend()
+    source, fallback_prompt = await asectioned_source(transcript, slot)
+    outline_text = await backend.agenerate(build_outline_prompt(source, settings.BLOG_MAX_SECTIONS))
+    title, sections = outline_result(outline_text.strip())
+    if not sections:
+        return await backend.agenerate(fallback_prompt)
+
+    async def write_section(semaphore, index):
+        async with semaphore:
+            text = await backend.agenerate(build_section_prompt(source, title, sections, index))
+        return format_section(sections[index - 1], clean_section(text, sections[index - 1].heading))
+
+    async with admission.afan_out(slot, min(settings.BLOG_SECTION_WORKERS, len(sections))) as workers:
+        semaphore = asyncio.Semaphore(workers)
+        bodies = await asyncio.gather(*(write_section(semaphore, index) for index in range(1, len(sections) + 1)))
+    return f"{title}\n{CONTENT_DELIMITER}\n" + "\n\n".join(bodies)
+
+def resolve_mode(mode=None):
+    """
+    The generation mode to use: `mode` if given, otherwise BLOG_GENERATION_MODE.
+    """
+    mode = mode or settings.BLOG_GENERATION_MODE
+    if mode not in GENERATION_MODES:
+        raise ValueError(f"Unknown generation mode '{mode}'.")
+    return mode
+
+def prompt_version(mode='single'):
+    """
+    PROMPT_VERSION plus the preprocessing settings, which also shape the prompt.
+    Sectioned articles are cached separately from single-call ones.
+    """
+    version = f"{PROMPT_VERSION}:{preprocess.config_tag()}"
+    return version if mode == 'single' else f"{version}:{mode}"
+
+def cache_key(transcript, mode='single'):
+    return generation_cache.make_key(transcript, llm.get_backend().model_name, prompt_version(mode))
+
+def cache_article(transcript, generated_title, content, mode='single'):
+    """
+    Stores a generated article so identical transcripts skip the model next time.
+    """
+    model_name = llm.get_backend().model_name
+    generation_cache.store(cache_key(transcript, mode), generated_title, content, model_name, prompt_version(mode))
+
+def generate_article(transcript, title=None, mode=None, slot=None):
+    """
+    Generates the title and article for a transcript, or serves them from the
+    generation cache. The 'single' mode makes one blocking API call; 'sectioned'
+    makes an outline call and then one call per section. `slot` is the admission
+    slot the caller holds, which bounds how many calls run at once.
+    """
+    mode = resolve_mode(mode)
+    cached = generation_cache.lookup(cache_key(transcript, mode))
+    if cached is not None:
+        generated_title, content = cached
+        return title or generated_title, content
+
+    if mode == 'sectioned':
+        full_text = ''.join(stream_sectioned(transcript, slot))
+    else:
+        full_text = llm.get_backend().generate(build_prompt(transcript, slot))
+    generated_title, content = split_generated_text(full_text.strip())
+    cache_article(transcript, generated_title, content, mode)
+    return title or generated_title, content
+
+def stream_article(transcript, mode=None, slot=None):
+    """
+    Yields the raw text of the model response chunk by chunk as it is generated.
+    In sectioned mode each chunk is a whole section.
+    """
+    if resolve_mode(mode) == 'sectioned':
+        yield from stream_sectioned(transcript, slot)
+    else:
+        yield from llm.get_backend().stream(build_prompt(transcript, slot))
+
+async def agenerate_article(transcript, title=None, mode=None, slot=None):
+    """
+    Async counterpart of generate_article(). Uses the backend's async client so the
+    event loop is free to serve other requests during the round trip.
+    """
+    mode = resolve_mode(mode)
+    cached = await sync_to_async(generation_cache.lookup)(cache_key(transcript, mode))
+    if cached is not None:
+        generated_title, content = cached
+        return title or generated_title, content
+
+    if mode == 'sectioned':
+        full_text = await agenerate_sectioned(transcript, slot)
+    else:
+        full_text = await llm.get_backend().agenerate(await abuild_prompt(transcript, slot))
+    generated_title, content = split_generated_text(full_text.strip())
+    await sync_to_async(cache_article)(transcript, generated_title, content, mode)
+    return title or generated_title, content
+
+def save_post(user, title, link, content, transcript=None):
+    """
+    Persists a generated article for the given user. With the source transcript,
+    its similarity signature is stored too so later near-duplicates can reuse the post.
+    """
+    packed = similarity.signature(transcript) if transcript else None
+    with metrics.db_write_duration.time(operation='create_blogpost'), transaction.atomic():
+        blog_post = BlogPost.objects.create(
+            user=user,
+            youtube_title=title,
+            youtube_link=link,
+            generated_content=content,
+            transcript_signature=packed,
+        )
+        if packed is not None:
+            TranscriptBand.objects.bulk_create(similarity.band_rows(blog_post, packed))
+        stats.record_posts([blog_post])
+    return blog_post
+
+def build_post(user, title, link, content, transcript=None, import_key=None):
+    """
+    An unsaved BlogPost with its derived fields filled in, for save_posts().
+    """
+    blog_post = BlogPost(
+        user=user,
+        youtube_title=title,
+        youtube_link=link,
+        generated_content=content,
+        transcript_signature=similarity.signature(transcript) if transcript else None,
+        import_key=import_key,
+    )
+    blog_post.refresh_derived_fields()
+    return blog_post
+
+def save_posts(posts):
+    """
+    Inserts posts from build_post() in one bulk_create. bulk_create skips save() and
+    post_save, so the similarity bands, search entries and user stats are written here.
+    """
+    with metrics.db_write_duration.time(operation='bulk_create_blogposts'), transaction.atomic():
+        created = BlogPost.objects.bulk_create(posts)
+        TranscriptBand.objects.bulk_create([
+            band
+            for blog_post in created if blog_post.transcript_signature is not None
+            for band in similarity.band_rows(blog_post, blog_post.transcript_signature)
+        ])
+        search.index_posts(created)
+        stats.record_posts(created)
+    return created
+
+async def asave_post(user, title, link, content, transcript=None):
+    """
+    Async counterpart of save_post().
+    """
+    return await sync_to_async(save_post)(user, title, link, content, transcript)
@@ -0,0 +1,209 @@
+import hashlib
+import logging
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from . import metrics
+from .models import GenerationCacheEntry
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """
+    Small thread-safe in-process LRU with per-entry TTL.
+    """
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.entries.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + (ttl or self.ttl), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+memory_cache = LRUCache(settings.BLOG_CACHE_MEMORY_ENTRIES, settings.BLOG_CACHE_TTL)
+
+# Per-process counters; GenerationCacheEntry.hits holds the totals across processes.
+lookups = metrics.counter(
+    'generation_cache_lookups_total', 'Generation cache lookups by result.', ('result',))
+stores = metrics.counter('generation_cache_stores_total', 'Articles written to the generation cache.')
+evictions = metrics.counter('generation_cache_evictions_total', 'Generation cache entries evicted.')
+
+@metrics.register_collector
+def collect():
+    flush_hits()
+    return {
+        'generation_cache_entries': ('Entries in the generation cache table.', GenerationCacheEntry.objects.count()),
+        'generation_cache_model_calls_saved': (
+            'All-time cache hits, i.e. model calls avoided.',
+            GenerationCacheEntry.objects.aggregate(total=Sum('hits'))['total'] or 0,
+        ),
+    }
+
+
+# --- Keys ---
+
+def normalize_transcript(transcript):
+    """
+    Normalizes a transcript so cosmetic differences (unicode forms, case,
+    whitespace) map to the same cache key.
+    """
+    text = unicodedata.normalize('NFKC', transcript).casefold()
+    return ' '.join(text.split())
+
+def make_key(transcript, model_name, prompt_version):
+    digest = hashlib.sha256()
+    for part in (prompt_version, model_name, normalize_transcript(transcript)):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+# --- Hit Counting ---
+# Hits are tallied in the process and written to GenerationCacheEntry together
+# every BLOG_CACHE_HIT_FLUSH_SECONDS, so a hit served from memory touches no rows
+# and concurrent hits on a popular key don't queue on its row lock. The hits of
+# the last interval are lost if the process dies; they only feed reporting and
+# the LRU order, which can afford that.
+
+pending_hits = {}
+pending_lock = threading.Lock()
+last_hit_flush = time.monotonic()
+
+def record_hit(key):
+    with pending_lock:
+        count, _ = pending_hits.get(key, (0, None))
+        pending_hits[key] = (count + 1, timezone.now())
+        due = time.monotonic() - last_hit_flush >= settings.BLOG_CACHE_HIT_FLUSH_SECONDS
+    if due:
+        flush_hits()
+
+def flush_hits():
+    """
+    Writes the hits tallied since the last flush, one UPDATE per key.
+    """
+    global last_hit_flush
+    with pending_lock:
+        hits = dict(pending_hits)
+        pending_hits.clear()
+        last_hit_flush = time.monotonic()
+    # Sorted, so two processes flushing the same keys lock them in the same order.
+    for key in sorted(hits):
+        count, used_at = hits[key]
+        GenerationCacheEntry.objects.filter(key=key).update(
+            hits=F('hits') + count, last_used_at=Greatest('last_used_at', Value(used_at)),
+        )
+
+
+# --- Lookup and Storage ---
+
+def lookup(key):
+    """
+    Returns the cached (title, content) for a key, or None on a miss.
+    """
+    if not settings.BLOG_CACHE_ENABLED:
+        return None
+
+    cached = memory_cache.get(key)
+    if cached is not None:
+        lookups.inc(result='memory_hit')
+        record_hit(key)
+        return cached
+
+    entry = GenerationCacheEntry.objects.filter(key=key, expires_at__gt=timezone.now()).only(
+        'title', 'content', 'expires_at'
+    ).first()
+    if entry is None:
+        lookups.inc(result='miss')
+        return None
+
+    lookups.inc(result='db_hit')
+    record_hit(key)
+    remaining = (entry.expires_at - timezone.now()).total_seconds()
+    memory_cache.set(key, (entry.title, entry.content), ttl=remaining)
+    return entry.title, entry.content
+
+def store(key, title, content, model_name, prompt_version):
+    """
+    Caches a freshly generated article and evicts entries beyond the size limit.
+    """
+    if not settings.BLOG_CACHE_ENABLED:
+        return
+
+    now = timezone.now()
+    GenerationCacheEntry.objects.update_or_create(key=key, defaults={
+        'model_name': model_name,
+        'prompt_version': prompt_version,
+        'title': title,
+        'content': content,
+        'last_used_at': now,
+        'expires_at': now + timedelta(seconds=settings.BLOG_CACHE_TTL),
+    })
+    memory_cache.set(key, (title, content))
+    stores.inc()
+    evict()
+
+def evict():
+    """
+    Drops expired entries, then the least recently used ones above BLOG_CACHE_MAX_ENTRIES.
+    """
+    flush_hits()
+    evicted, _ = GenerationCacheEntry.objects.filter(expires_at__lte=timezone.now()).delete()
+    overflow = GenerationCacheEntry.objects.count() - settings.BLOG_CACHE_MAX_ENTRIES
+    if overflow > 0:
+        oldest = GenerationCacheEntry.objects.order_by('last_used_at').values_list('pk', flat=True)[:overflow]
+        deleted, _ = GenerationCacheEntry.objects.filter(pk__in=list(oldest)).delete()
+        evicted += deleted
+    if evicted:
+        evictions.inc(evicted)
+        logger.info(f"Evicted {evicted} generation cache entries.")
+
+def get_stats():
+    """
+    Hit-rate counters for this process plus the all-time hits recorded in the database,
+    i.e. the number of model calls the cache has saved.
+    """
+    flush_hits()
+    stats = {
+        'memory_hits': lookups.value(result='memory_hit'),
+        'db_hits': lookups.value(result='db_hit'),
+        'misses': lookups.value(result='miss'),
+        'stores': stores.value(),
+        'evictions': evictions.value(),
+    }
+    total = stats['memory_hits'] + stats['db_hits'] + stats['misses']
+    stats['hit_rate'] = round((stats['memory_hits'] + stats['db_hits']) / total, 4) if total else 0.0
+    stats['entries'] = GenerationCacheEntry.objects.count()
+    stats['model_calls_saved'] = GenerationCacheEntry.objects.aggregate(total=Sum('hits'))['total'] or 0
+    return stats
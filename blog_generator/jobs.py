@@ -0,0 +1,234 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import admission, audio, generation, llm, metrics, transcription
+from .models import GenerationJob
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+job_outcomes = metrics.counter('generation_jobs_total', 'Finished job attempts by outcome.', ('outcome',))
+
+# Errors another attempt can't fix: the media file is missing, unreadable or
+# silent, or transcription is not configured. The job fails on the first one.
+PERMANENT_ERRORS = (transcription.TranscriptionError, audio.AudioError)
+
+
+class JobLost(Exception):
+    """
+    The job was taken from this worker (its lease expired and it was requeued)
+    while the worker was still running it.
+    """
+
+
+# --- Queue Operations ---
+
+def enqueue(user, transcript, title='', link='N/A', media_path='', mode=None):
+    """
+    Creates a queued generation job. The worker process picks it up. Jobs for a
+    media file (relative to MEDIA_ROOT) pass an empty transcript; the worker
+    transcribes the file first.
+    """
+    return GenerationJob.objects.create(
+        user=user,
+        transcript=transcript,
+        media_path=media_path,
+        generation_mode=generation.resolve_mode(mode),
+        youtube_title=title or '',
+        youtube_link=link,
+        progress='Waiting for a worker',
+    )
+
+def claim_next(worker_id):
+    """
+    Atomically moves the oldest runnable job to RUNNING and returns it, or None.
+    On PostgreSQL concurrent workers skip each other's locked rows; on SQLite the
+    conditional UPDATE below is what prevents a job from being claimed twice.
+    """
+    while True:
+        with transaction.atomic():
+            job = (
+                GenerationJob.objects
+                .select_for_update(skip_locked=True)
+                .filter(status=GenerationJob.STATUS_QUEUED, run_after__lte=timezone.now())
+                .order_by('run_after', 'id')
+                .first()
+            )
+            if job is None:
+                return None
+            claimed = GenerationJob.objects.filter(pk=job.pk, status=GenerationJob.STATUS_QUEUED).update(
+                status=GenerationJob.STATUS_RUNNING,
+                locked_by=worker_id,
+                heartbeat_at=timezone.now(),
+                attempts=F('attempts') + 1,
+                progress='Claimed by worker',
+                updated_at=timezone.now(),
+            )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+def owned_by(job, worker_id):
+    """
+    The job, as long as it is still RUNNING on this worker. Every write a worker
+    makes goes through this, so a worker whose lease expired can't overwrite the
+    job after another worker has claimed it.
+    """
+    return GenerationJob.objects.filter(pk=job.pk, locked_by=worker_id, status=GenerationJob.STATUS_RUNNING)
+
+def heartbeat(job_ids, worker_id):
+    """
+    Extends the lease of jobs that are still being worked on by this worker.
+    """
+    if job_ids:
+        GenerationJob.objects.filter(
+            pk__in=job_ids, locked_by=worker_id, status=GenerationJob.STATUS_RUNNING,
+        ).update(heartbeat_at=timezone.now())
+
+def recover_stale_jobs(worker_id=None):
+    """
+    Requeues RUNNING jobs whose worker died. Jobs held by `worker_id` are recovered
+    immediately (the worker is restarting), others once their lease has expired.
+    Returns the number of requeued jobs.
+    """
+    lease_expired = timezone.now() - timedelta(seconds=settings.BLOG_JOB_LEASE_SECONDS)
+    stale = Q(heartbeat_at__lt=lease_expired) | Q(heartbeat_at__isnull=True)
+    if worker_id:
+        stale |= Q(locked_by=worker_id)
+    running = GenerationJob.objects.filter(status=GenerationJob.STATUS_RUNNING)
+
+    failed = running.filter(stale, attempts__gte=settings.BLOG_JOB_MAX_ATTEMPTS).update(
+        status=GenerationJob.STATUS_FAILED,
+        locked_by='',
+        progress='Failed',
+        error='Worker stopped while processing the job.',
+        updated_at=timezone.now(),
+    )
+    requeued = running.filter(stale).update(
+        status=GenerationJob.STATUS_QUEUED,
+        locked_by='',
+        progress='Requeued after a worker restart',
+        run_after=timezone.now(),
+        updated_at=timezone.now(),
+    )
+    if requeued or failed:
+        logger.warning(f"Recovered {requeued} stale job(s), gave up on {failed}.")
+    return requeued
+
+
+# --- Job Execution ---
+
+def set_progress(job, worker_id, progress):
+    if not owned_by(job, worker_id).update(progress=progress, updated_at=timezone.now()):
+        raise JobLost()
+
+def transcribe_job_media(job, worker_id):
+    """
+    Fills in the transcript of a media job. It is saved right away so a retry
+    after a failed generation doesn't transcribe the file again.
+    """
+    def on_progress(done, total):
+        set_progress(job, worker_id, f'Transcribing audio ({done} of {total} segments)')
+
+    set_progress(job, worker_id, 'Preparing audio')
+    path = transcription.resolve_media(job.media_path)
+    job.transcript = transcription.transcribe_media(path, on_progress)
+    if not job.transcript.strip():
+        raise transcription.TranscriptionError("No speech was found in the media file.")
+    if not owned_by(job, worker_id).update(transcript=job.transcript, updated_at=timezone.now()):
+        raise JobLost()
+
+def run_job(job, worker_id):
+    """
+    Runs the generation pipeline for a job claimed by `worker_id` and records the
+    outcome. Failed attempts are retried with exponential backoff until
+    BLOG_JOB_MAX_ATTEMPTS, except PERMANENT_ERRORS, which fail the job at once. If
+    the job stops being this worker's, the result is dropped.
+    """
+    owned = owned_by(job, worker_id)
+    try:
+        if llm.get_backend() is None:
+            raise RuntimeError("AI model is not configured.")
+        if job.media_path and not job.transcript:
+            transcribe_job_media(job, worker_id)
+
+        set_progress(job, worker_id, 'Waiting for a generation slot')
+        # The user was rate limited when the job was queued; only the global
+        # in-flight limit applies here.
+        with admission.generation_slot(job.user, rate_limit=False) as slot:
+            set_progress(job, worker_id, 'Generating article')
+            final_title, final_content = generation.generate_article(
+                job.transcript, job.youtube_title, job.generation_mode, slot,
+            )
+
+        set_progress(job, worker_id, 'Saving article')
+        with metrics.db_write_duration.time(operation='complete_job'), transaction.atomic():
+            blog_post = generation.save_post(job.user, final_title, job.youtube_link, final_content, job.transcript)
+            completed = owned.update(
+                status=GenerationJob.STATUS_SUCCEEDED,
+                progress='Done',
+                blog_post=blog_post,
+                error='',
+                locked_by='',
+                updated_at=timezone.now(),
+            )
+            if not completed:
+                # Another worker has the job now; roll the post back so it isn't
+                # created twice.
+                raise JobLost()
+        job_outcomes.inc(outcome='succeeded')
+        if job.media_path:
+            transcription.discard_upload(job.media_path)
+        logger.info(f"Job {job.pk} finished, created blog post {blog_post.pk}.")
+
+    except JobLost:
+        job_outcomes.inc(outcome='lost')
+        logger.warning(f"Job {job.pk} is no longer held by worker '{worker_id}'; dropped its result.")
+
+    except (admission.AdmissionRejected, llm.CircuitOpenError) as e:
+        # Upstream capacity is exhausted or upstream is down; try again later
+        # without using up an attempt.
+        job_outcomes.inc(outcome='deferred')
+        owned.update(
+            status=GenerationJob.STATUS_QUEUED,
+            progress=(
+                'Waiting for a generation slot' if isinstance(e, admission.AdmissionRejected)
+                else 'Waiting for the AI model to recover'
+            ),
+            run_after=timezone.now() + timedelta(seconds=e.retry_after),
+            attempts=F('attempts') - 1,
+            locked_by='',
+            updated_at=timezone.now(),
+        )
+
+    except Exception as e:
+        logger.error(f"Error running generation job {job.pk} (attempt {job.attempts}): {e}")
+        retry = job.attempts < settings.BLOG_JOB_MAX_ATTEMPTS and not isinstance(e, PERMANENT_ERRORS)
+        job_outcomes.inc(outcome='retried' if retry else 'failed')
+        if retry:
+            delay = settings.BLOG_JOB_RETRY_BACKOFF * (2 ** (job.attempts - 1))
+            owned.update(
+                status=GenerationJob.STATUS_QUEUED,
+                progress=f'Retrying (attempt {job.attempts + 1} of {settings.BLOG_JOB_MAX_ATTEMPTS})',
+                run_after=timezone.now() + timedelta(seconds=delay),
+                error=str(e),
+                locked_by='',
+                updated_at=timezone.now(),
+            )
+        elif owned.update(
+            status=GenerationJob.STATUS_FAILED,
+            progress='Failed',
+            error=str(e),
+            locked_by='',
+            updated_at=timezone.now(),
+        ):
+            if job.media_path:
+                transcription.discard_upload(job.media_path)
+    finally:
+        # Worker threads own their DB connections; don't leak them between jobs.
+        close_old_connections()
@@ -0,0 +1,720 @@
+import asyncio
+import hashlib
+import importlib
+import logging
+import math
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from . import metrics
+from .chunking import CHARS_PER_TOKEN, estimate_tokens
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+BACKENDS = {
+    'gemini': 'blog_generator.llm.GeminiBackend',
+    'stub': 'blog_generator.llm.StubBackend',
+}
+
+
+class BackendError(Exception):
+    """
+    A model call failed.
+    """
+
+
+class RetryableBackendError(BackendError):
+    """
+    A transient failure (rate limiting, overload, timeout) that may succeed if retried.
+    """
+
+
+class LLMBackend:
+    """
+    Interface every text generation backend implements.
+    Backends return plain text; parsing the title/content delimiter is left to the caller.
+    """
+    model_name = ''
+
+    def generate(self, prompt):
+        raise NotImplementedError
+
+    def stream(self, prompt):
+        """
+        Yields the response text chunk by chunk.
+        """
+        yield self.generate(prompt)
+
+    async def agenerate(self, prompt):
+        return await asyncio.to_thread(self.generate, prompt)
+
+    def ensure_available(self):
+        """
+        Raises CircuitOpenError if calls would currently be refused.
+        """
+
+
+# --- Gemini ---
+# google-generativeai pulls in gRPC and protobuf, most of a second of imports. It
+# is imported when a GeminiBackend is first built, not when this module loads, so
+# management commands and processes using another backend never pay for it.
+# Under gunicorn --preload, gunicorn.conf.py imports it once in the master instead.
+
+GEMINI_MODULES = ('google.generativeai', 'google.api_core.exceptions')
+
+def translate_google_error(error):
+    from google.api_core import exceptions as google_exceptions
+    retryable = (
+        google_exceptions.TooManyRequests,
+        google_exceptions.ResourceExhausted,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.InternalServerError,
+        google_exceptions.DeadlineExceeded,
+    )
+    if isinstance(error, retryable):
+        return RetryableBackendError(str(error))
+    return BackendError(str(error))
+
+
+class GeminiBackend(LLMBackend):
+    def __init__(self, model_name='gemini-2.5-flash', api_key=None):
+        api_key = api_key or settings.GEMINI_API_KEY
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY environment variable not set.")
+        import google.generativeai as genai
+        from google.api_core import exceptions as google_exceptions
+
+        genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+        self.api_error = google_exceptions.GoogleAPICallError
+        # The client-side timeout ends calls that ResilientBackend stopped waiting for.
+        self.request_options = {'timeout': settings.BLOG_LLM_TIMEOUT}
+
+    def generate(self, prompt):
+        try:
+            return self.model.generate_content(prompt, request_options=self.request_options).text
+        except self.api_error as e:
+            raise translate_google_error(e) from e
+
+    def stream(self, prompt):
+        try:
+            for chunk in self.model.generate_content(prompt, stream=True, request_options=self.request_options):
+                if chunk.text:
+                    yield chunk.text
+        except self.api_error as e:
+            raise translate_google_error(e) from e
+
+    async def agenerate(self, prompt):
+        try:
+            response = await self.model.generate_content_async(prompt, request_options=self.request_options)
+            return response.text
+        except self.api_error as e:
+            raise translate_google_error(e) from e
+
+
+# --- Local Stub ---
+
+STUB_VOCABULARY = (
+    "model data system users performance request latency cache article video transcript "
+    "developer application server database query design pattern result example team "
+    "feature code test deploy scale simple fast reliable practical important clear"
+).split()
+
+
+class StubBackend(LLMBackend):
+    """
+    Offline, deterministic stand-in for Gemini used for load tests and benchmarks.
+
+    Output text depends only on the prompt. Latency is `latency` seconds per call,
+    drawn from a 'fixed', 'uniform' (latency +/- spread) or 'lognormal' (median
+    latency, sigma spread) distribution, plus optional per-token costs for reading
+    the prompt (prefill_rate) and producing the answer (decode_rate), both in
+    tokens per second. A fraction `error_rate` of calls fail with a
+    RetryableBackendError.
+
+    Outline prompts from sectioned generation get a title and `outline_sections`
+    outline lines; section prompts get an equal share of `article_tokens`, so both
+    modes produce articles of about the same length.
+    """
+    model_name = 'stub'
+
+    def __init__(self, latency=1.0, latency_distribution='fixed', latency_spread=0.5,
+                 prefill_rate=None, decode_rate=None, article_tokens=1500, notes_tokens=250,
+                 outline_sections=6, error_rate=0.0, stream_chunk_chars=32, seed=None):
+        if latency_distribution not in ('fixed', 'uniform', 'lognormal'):
+            raise ValueError(f"Unknown latency distribution '{latency_distribution}'.")
+        self.latency = latency
+        self.latency_distribution = latency_distribution
+        self.latency_spread = latency_spread
+        self.prefill_rate = prefill_rate
+        self.decode_rate = decode_rate
+        self.article_tokens = article_tokens
+        self.notes_tokens = notes_tokens
+        self.outline_sections = outline_sections
+        self.error_rate = error_rate
+        self.stream_chunk_chars = stream_chunk_chars
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+
+    # Timing
+
+    def sample_latency(self):
+        with self.rng_lock:
+            if self.latency_distribution == 'uniform':
+                low = self.latency * (1 - self.latency_spread)
+                return max(0.0, self.rng.uniform(low, self.latency * (1 + self.latency_spread)))
+            if self.latency_distribution == 'lognormal' and self.latency > 0:
+                return self.rng.lognormvariate(math.log(self.latency), self.latency_spread)
+            return self.latency
+
+    def first_token_delay(self, prompt):
+        delay = self.sample_latency()
+        if self.prefill_rate:
+            delay += estimate_tokens(prompt) / self.prefill_rate
+        return delay
+
+    def decode_delay(self, text):
+        return estimate_tokens(text) / self.decode_rate if self.decode_rate else 0.0
+
+    def maybe_fail(self):
+        with self.rng_lock:
+            failed = self.error_rate and self.rng.random() < self.error_rate
+        if failed:
+            raise RetryableBackendError("Injected stub failure (simulated 429/503 from upstream).")
+
+    # Output
+
+    def is_article_prompt(self, prompt):
+        return '---CONTENT---' in prompt
+
+    def is_outline_prompt(self, prompt):
+        return prompt.endswith('Title and Outline:')
+
+    def is_section_prompt(self, prompt):
+        return prompt.endswith('Section text:')
+
+    def reply(self, prompt):
+        rng = random.Random(hashlib.sha256(prompt.encode('utf-8')).digest())
+
+        def sentence():
+            words = [rng.choice(STUB_VOCABULARY) for _ in range(rng.randint(8, 18))]
+            return ' '.join(words).capitalize() + '.'
+
+        def text_of(tokens):
+            sentences, size = [], 0
+            while size < tokens * CHARS_PER_TOKEN:
+                sentences.append(sentence())
+                size += len(sentences[-1]) + 1
+            return sentences
+
+        def title_of():
+            return ' '.join(rng.choice(STUB_VOCABULARY) for _ in range(6)).title()
+
+        if self.is_outline_prompt(prompt):
+            title = title_of()
+            outline = (
+                f"{number}. {' '.join(rng.choice(STUB_VOCABULARY) for _ in range(3)).title()} | {sentence()}"
+                for number in range(1, self.outline_sections + 1)
+            )
+            return f"{title}\n---CONTENT---\n" + '\n'.join(outline)
+        if self.is_section_prompt(prompt):
+            sentences = text_of(self.article_tokens // max(1, self.outline_sections))
+            return '\n\n'.join(' '.join(sentences[start:start + 12]) for start in range(0, len(sentences), 12))
+        if not self.is_article_prompt(prompt):
+            return '\n'.join(f"- {s}" for s in text_of(self.notes_tokens))
+
+        title = title_of()
+        sentences = text_of(self.article_tokens)
+        sections = []
+        for number, start in enumerate(range(0, len(sentences), 12), start=1):
+            paragraph = ' '.join(sentences[start:start + 12])
+            sections.append(f"## Section {number}\n\n{paragraph}")
+        return f"{title}\n---CONTENT---\n" + '\n\n'.join(sections)
+
+    # LLMBackend
+
+    def generate(self, prompt):
+        self.maybe_fail()
+        text = self.reply(prompt)
+        time.sleep(self.first_token_delay(prompt) + self.decode_delay(text))
+        return text
+
+    def stream(self, prompt):
+        self.maybe_fail()
+        text = self.reply(prompt)
+        time.sleep(self.first_token_delay(prompt))
+        for start in range(0, len(text), self.stream_chunk_chars):
+            chunk = text[start:start + self.stream_chunk_chars]
+            time.sleep(self.decode_delay(chunk))
+            yield chunk
+
+    async def agenerate(self, prompt):
+        self.maybe_fail()
+        text = self.reply(prompt)
+        await asyncio.sleep(self.first_token_delay(prompt) + self.decode_delay(text))
+        return text
+
+
+# --- Instrumentation ---
+
+class InstrumentedBackend(LLMBackend):
+    """
+    Wraps a backend and records latency, prompt/response sizes and errors per call.
+    """
+    def __init__(self, backend):
+        self.backend = backend
+        self.model_name = backend.model_name
+
+    def record_error(self, call, error):
+        metrics.llm_errors.inc(backend=self.model_name, call=call, error=type(error).__name__)
+
+    def generate(self, prompt):
+        metrics.llm_prompt_chars.observe(len(prompt), backend=self.model_name)
+        try:
+            with metrics.llm_request_duration.time(backend=self.model_name, call='generate'):
+                text = self.backend.generate(prompt)
+        except Exception as e:
+            self.record_error('generate', e)
+            raise
+        metrics.llm_response_chars.observe(len(text), backend=self.model_name)
+        return text
+
+    def stream(self, prompt):
+        metrics.llm_prompt_chars.observe(len(prompt), backend=self.model_name)
+        size = 0
+        try:
+            with metrics.llm_request_duration.time(backend=self.model_name, call='stream'):
+                for chunk in self.backend.stream(prompt):
+                    size += len(chunk)
+                    yield chunk
+        except Exception as e:
+            self.record_error('stream', e)
+            raise
+        metrics.llm_response_chars.observe(size, backend=self.model_name)
+
+    async def agenerate(self, prompt):
+        metrics.llm_prompt_chars.observe(len(prompt), backend=self.model_name)
+        try:
+            with metrics.llm_request_duration.time(backend=self.model_name, call='agenerate'):
+                text = await self.backend.agenerate(prompt)
+        except Exception as e:
+            self.record_error('agenerate', e)
+            raise
+        metrics.llm_response_chars.observe(len(text), backend=self.model_name)
+        return text
+
+
+# --- Resilience ---
+# Wraps every backend so one slow or failing upstream call can't hang a request:
+# each attempt has a timeout, retryable failures are retried with exponential
+# backoff and full jitter within an overall deadline, an attempt still running
+# after the recent p95 latency can be hedged with a second identical call, and a
+# circuit breaker fails fast while upstream keeps failing. Breaker state is per
+# process.
+
+llm_retries = metrics.counter('llm_retries_total', 'Model call attempts that were retried.', ('backend', 'error'))
+llm_hedges = metrics.counter('llm_hedged_requests_total', 'Hedged model calls fired, and won by the hedge.', ('backend', 'outcome'))
+llm_short_circuits = metrics.counter('llm_short_circuits_total', 'Model calls refused by the open circuit breaker.', ('backend',))
+llm_circuit_state = metrics.gauge('llm_circuit_state', 'Processes whose circuit breaker is in each state.', ('backend', 'state'))
+llm_call_duration = metrics.histogram(
+    'llm_call_duration_seconds', 'Model call latency including retries and hedging.', ('backend', 'outcome'))
+
+_call_pool = None
+_call_pool_lock = threading.Lock()
+
+def call_pool():
+    """
+    Threads that run blocking model calls so the caller can stop waiting on them.
+    A call that times out keeps its thread until the client library gives up.
+    """
+    global _call_pool
+    if _call_pool is None:
+        with _call_pool_lock:
+            if _call_pool is None:
+                _call_pool = ThreadPoolExecutor(max_workers=settings.BLOG_LLM_CALL_THREADS, thread_name_prefix='llm-call')
+    return _call_pool
+
+
+class CallTimeout(RetryableBackendError):
+    """
+    A model call attempt took longer than its timeout.
+    """
+
+
+class CircuitOpenError(RetryableBackendError):
+    """
+    Upstream has been failing; calls are refused until the breaker lets a probe through.
+    """
+    def __init__(self, retry_after):
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(f"Model calls are suspended for {self.retry_after}s after repeated upstream failures.")
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive retryable failures. After
+    `reset_timeout` seconds one probe call is let through (half-open); its success
+    closes the breaker and its failure opens it again.
+    """
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, name, failure_threshold, reset_timeout):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.state = None
+        self.transition(self.CLOSED)
+
+    def transition(self, state):
+        # Caller holds the lock (or is __init__).
+        if state == self.state:
+            return
+        if self.state is not None:
+            logger.warning(f"Circuit breaker for {self.name}: {self.state} -> {state}.")
+        self.state = state
+        for name in (self.CLOSED, self.OPEN, self.HALF_OPEN):
+            llm_circuit_state.set(int(name == state), backend=self.name, state=name)
+
+    def retry_after(self):
+        return self.opened_at + self.reset_timeout - time.monotonic()
+
+    def check(self):
+        """
+        Raises CircuitOpenError if a call would be refused right now.
+        """
+        with self.lock:
+            if self.state == self.OPEN and self.retry_after() > 0:
+                raise CircuitOpenError(self.retry_after())
+            if self.state == self.HALF_OPEN and self.probe_in_flight:
+                raise CircuitOpenError(self.reset_timeout)
+
+    def before_call(self):
+        with self.lock:
+            if self.state == self.OPEN:
+                if self.retry_after() > 0:
+                    llm_short_circuits.inc(backend=self.name)
+                    raise CircuitOpenError(self.retry_after())
+                self.transition(self.HALF_OPEN)
+            if self.state == self.HALF_OPEN:
+                if self.probe_in_flight:
+                    llm_short_circuits.inc(backend=self.name)
+                    raise CircuitOpenError(self.reset_timeout)
+                self.probe_in_flight = True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.probe_in_flight = False
+            self.transition(self.CLOSED)
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self.transition(self.OPEN)
+
+
+class LatencyTracker:
+    """
+    Recent successful call latencies, kept separately for prompts of similar size
+    (within a factor of two) since prompt size dominates model latency.
+    """
+    def __init__(self, window=200, min_samples=20):
+        self.min_samples = min_samples
+        self.samples = defaultdict(lambda: deque(maxlen=window))
+        self.lock = threading.Lock()
+
+    def add(self, prompt, seconds):
+        with self.lock:
+            self.samples[len(prompt).bit_length()].append(seconds)
+
+    def percentile(self, prompt, fraction=0.95):
+        with self.lock:
+            samples = sorted(self.samples[len(prompt).bit_length()])
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+class ResilientBackend(LLMBackend):
+    """
+    Adds timeouts, retries with backoff, hedging and a circuit breaker to a backend.
+    Settings provide the defaults (see "Model Call Resilience" in settings.py).
+    Streams are retried only until their first chunk arrives and are never hedged.
+    """
+    def __init__(self, backend, timeout=None, max_attempts=None, backoff_base=None, backoff_max=None,
+                 deadline=None, hedge=None, breaker_failures=None, breaker_reset=None):
+        def option(value, setting):
+            return getattr(settings, setting) if value is None else value
+
+        self.backend = backend
+        self.model_name = backend.model_name
+        self.timeout = option(timeout, 'BLOG_LLM_TIMEOUT')
+        self.max_attempts = max(1, option(max_attempts, 'BLOG_LLM_MAX_ATTEMPTS'))
+        self.backoff_base = option(backoff_base, 'BLOG_LLM_BACKOFF_BASE')
+        self.backoff_max = option(backoff_max, 'BLOG_LLM_BACKOFF_MAX')
+        self.deadline = option(deadline, 'BLOG_LLM_DEADLINE')
+        self.hedge = option(hedge, 'BLOG_LLM_HEDGE')
+        self.breaker = CircuitBreaker(
+            self.model_name,
+            option(breaker_failures, 'BLOG_LLM_BREAKER_FAILURES'),
+            option(breaker_reset, 'BLOG_LLM_BREAKER_RESET'),
+        )
+        self.latencies = LatencyTracker()
+
+    def ensure_available(self):
+        self.breaker.check()
+
+    # Retry policy
+
+    def attempt_timeout(self, deadline):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise CallTimeout(f"Model call deadline of {self.deadline}s exceeded.")
+        return min(self.timeout, remaining)
+
+    def retry_delay(self, attempt, error, deadline):
+        """
+        Records a failed attempt and returns how long to wait before the next one,
+        or re-raises if the error is final.
+        """
+        if not isinstance(error, RetryableBackendError):
+            # Upstream answered; the request itself is at fault.
+            self.breaker.record_success()
+            raise error
+        self.breaker.record_failure()
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+        if attempt >= self.max_attempts or time.monotonic() + delay >= deadline:
+            raise error
+        llm_retries.inc(backend=self.model_name, error=type(error).__name__)
+        logger.warning(f"Model call attempt {attempt} failed ({error}); retrying in {delay:.2f}s.")
+        return delay
+
+    def hedge_delay(self, prompt):
+        return self.latencies.percentile(prompt) if self.hedge else None
+
+    def finished(self, started, outcome):
+        llm_call_duration.observe(time.monotonic() - started, backend=self.model_name, outcome=outcome)
+
+    # Single attempts
+
+    def attempt(self, prompt, timeout):
+        """
+        One attempt at generate(), hedged once it outlasts the recent p95 latency.
+        Returns the first successful result; fails if every call fails or time runs out.
+        """
+        pool = call_pool()
+        started = time.monotonic()
+        hedge_at = self.hedge_delay(prompt)
+        submitted = {pool.submit(self.backend.generate, prompt): started}
+        pending, hedge, error = set(submitted), None, None
+        try:
+            while pending:
+                elapsed = time.monotonic() - started
+                wait_for = timeout - elapsed
+                if hedge is None and hedge_at is not None:
+                    wait_for = min(wait_for, hedge_at - elapsed)
+                done, pending = wait(pending, timeout=max(0.0, wait_for), return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        text = future.result()
+                    except Exception as e:
+                        error = e
+                        continue
+                    self.latencies.add(prompt, time.monotonic() - submitted[future])
+                    if future is hedge:
+                        llm_hedges.inc(backend=self.model_name, outcome='won')
+                    return text
+                elapsed = time.monotonic() - started
+                if pending and elapsed >= timeout:
+                    raise CallTimeout(f"Model call timed out after {timeout:.1f}s.")
+                if pending and hedge is None and hedge_at is not None and elapsed >= hedge_at:
+                    hedge = pool.submit(self.backend.generate, prompt)
+                    submitted[hedge] = time.monotonic()
+                    pending.add(hedge)
+                    llm_hedges.inc(backend=self.model_name, outcome='fired')
+            raise error
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def aattempt(self, prompt, timeout):
+        """
+        Async counterpart of attempt().
+        """
+        started = time.monotonic()
+        hedge_at = self.hedge_delay(prompt)
+        first = asyncio.ensure_future(self.backend.agenerate(prompt))
+        submitted = {first: started}
+        pending, hedge, error = {first}, None, None
+        try:
+            while pending:
+                elapsed = time.monotonic() - started
+                wait_for = timeout - elapsed
+                if hedge is None and hedge_at is not None:
+                    wait_for = min(wait_for, hedge_at - elapsed)
+                done, pending = await asyncio.wait(pending, timeout=max(0.0, wait_for), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    self.latencies.add(prompt, time.monotonic() - submitted[task])
+                    if task is hedge:
+                        llm_hedges.inc(backend=self.model_name, outcome='won')
+                    return task.result()
+                elapsed = time.monotonic() - started
+                if pending and elapsed >= timeout:
+                    raise CallTimeout(f"Model call timed out after {timeout:.1f}s.")
+                if pending and hedge is None and hedge_at is not None and elapsed >= hedge_at:
+                    hedge = asyncio.ensure_future(self.backend.agenerate(prompt))
+                    submitted[hedge] = time.monotonic()
+                    pending.add(hedge)
+                    llm_hedges.inc(backend=self.model_name, outcome='fired')
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def next_chunk(self, iterator, timeout):
+        try:
+            return call_pool().submit(next, iterator, None).result(timeout=timeout)
+        except FutureTimeout:
+            raise CallTimeout(f"No response from the model for {timeout:.1f}s.")
+
+    # LLMBackend
+
+    def generate(self, prompt):
+        started = time.monotonic()
+        deadline = started + self.deadline
+        try:
+            for attempt in range(1, self.max_attempts + 1):
+                self.breaker.before_call()
+                try:
+                    text = self.attempt(prompt, self.attempt_timeout(deadline))
+                except Exception as e:
+                    time.sleep(self.retry_delay(attempt, e, deadline))
+                    continue
+                self.breaker.record_success()
+                self.finished(started, 'ok')
+                return text
+        except Exception as e:
+            self.finished(started, type(e).__name__)
+            raise
+
+    def stream(self, prompt):
+        started = time.monotonic()
+        deadline = started + self.deadline
+        try:
+            for attempt in range(1, self.max_attempts + 1):
+                self.breaker.before_call()
+                try:
+                    iterator = iter(self.backend.stream(prompt))
+                    chunk = self.next_chunk(iterator, self.attempt_timeout(deadline))
+                except Exception as e:
+                    time.sleep(self.retry_delay(attempt, e, deadline))
+                    continue
+                self.breaker.record_success()
+                # Once text has been sent on there is no retrying; only bound the gaps.
+                while chunk is not None:
+                    yield chunk
+                    chunk = self.next_chunk(iterator, self.timeout)
+                self.finished(started, 'ok')
+                return
+        except Exception as e:
+            self.finished(started, type(e).__name__)
+            raise
+
+    async def agenerate(self, prompt):
+        started = time.monotonic()
+        deadline = started + self.deadline
+        try:
+            for attempt in range(1, self.max_attempts + 1):
+                self.breaker.before_call()
+                try:
+                    text = await self.aattempt(prompt, self.attempt_timeout(deadline))
+                except Exception as e:
+                    await asyncio.sleep(self.retry_delay(attempt, e, deadline))
+                    continue
+                self.breaker.record_success()
+                self.finished(started, 'ok')
+                return text
+        except Exception as e:
+            self.finished(started, type(e).__name__)
+            raise
+
+
+# --- Backend Selection ---
+
+_backend = None
+_backend_loaded = False
+_backend_lock = threading.Lock()
+
+def wrap_backend(backend):
+    """
+    Adds per-call metrics and the resilience policy to a backend. Metrics are
+    recorded per upstream attempt, inside the retries.
+    """
+    if isinstance(backend, ResilientBackend):
+        return backend
+    if not isinstance(backend, InstrumentedBackend):
+        backend = InstrumentedBackend(backend)
+    return ResilientBackend(backend)
+
+def load_backend():
+    """
+    Instantiates the backend named by settings.BLOG_LLM_BACKEND with BLOG_LLM_OPTIONS.
+    Returns None if it cannot be configured, so views can report the problem.
+    """
+    path = BACKENDS.get(settings.BLOG_LLM_BACKEND, settings.BLOG_LLM_BACKEND)
+    try:
+        return wrap_backend(import_string(path)(**settings.BLOG_LLM_OPTIONS))
+    except Exception as e:
+        logger.error(f"Failed to configure Generative AI: {e}")
+        return None
+
+def preload():
+    """
+    Imports the configured backend's client library without creating a client, so
+    workers forked by gunicorn --preload share it copy-on-write. Clients hold
+    network channels that must not cross a fork; they are still built per process.
+    """
+    if settings.BLOG_LLM_BACKEND == 'gemini':
+        for module in GEMINI_MODULES:
+            importlib.import_module(module)
+
+def get_backend():
+    global _backend, _backend_loaded
+    if not _backend_loaded:
+        with _backend_lock:
+            if not _backend_loaded:
+                _backend = load_backend()
+                _backend_loaded = True
+    return _backend
+
+def use_backend(backend):
+    """
+    Replaces the active backend (e.g. with a StubBackend in benchmarks) and returns
+    the previous one so it can be restored.
+    """
+    global _backend, _backend_loaded
+    if backend is not None:
+        backend = wrap_backend(backend)
+    with _backend_lock:
+        previous = _backend if _backend_loaded else None
+        _backend, _backend_loaded = backend, True
+    return previous
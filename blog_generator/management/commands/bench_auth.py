@@ -0,0 +1,79 @@
+import os
+import statistics
+import tempfile
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment,
+)
+from django.urls import reverse
+
+from blog_generator.auth import user_cache
+from blog_generator.models import BlogPost
+
+VARIANTS = (
+    ('db sessions', 'django.contrib.sessions.backends.db', 'django.contrib.auth.backends.ModelBackend'),
+    ('cached_db', 'blog_generator.sessions', 'blog_generator.auth.CachedModelBackend'),
+    ('signed cookies', 'django.contrib.sessions.backends.signed_cookies', 'blog_generator.auth.CachedModelBackend'),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures authenticated page loads per second and queries per request for each "
+        "session store, with and without the cached auth backend, on a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Page loads per variant.')
+        parser.add_argument('--posts', type=int, default=20, help='Posts shown on the page.')
+        parser.add_argument('--page', default='blog-list', help='URL name of the page to load.')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        test_db = os.path.join(tempfile.mkdtemp(), 'bench_auth.sqlite3')
+        settings.DATABASES['default'].setdefault('TEST', {})['NAME'] = test_db
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            user = User.objects.create_user(username='auth-bench')
+            BlogPost.objects.bulk_create(
+                BlogPost(user=user, youtube_title=f'Post {i}', youtube_link='N/A', generated_content='Body.')
+                for i in range(options['posts'])
+            )
+            url = reverse(options['page'])
+            self.stdout.write(f"GET {url}, {options['requests']} requests per variant")
+            self.stdout.write(f"{'variant':>15} {'req/s':>8} {'p50':>8} {'p95':>8} {'queries/req':>12}")
+            for label, engine, backend in VARIANTS:
+                with override_settings(SESSION_ENGINE=engine, AUTHENTICATION_BACKENDS=[backend]):
+                    cache.clear()
+                    user_cache.clear()
+                    self.run_variant(label, Client(), user, url, options['requests'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def run_variant(self, label, client, user, url, requests):
+        client.force_login(user)
+        client.get(url)  # warm up
+        timings, queries = [], 0
+        started = time.perf_counter()
+        for _ in range(requests):
+            with CaptureQueriesContext(connection) as captured:
+                request_started = time.perf_counter()
+                response = client.get(url)
+                timings.append(time.perf_counter() - request_started)
+            if response.status_code != 200:
+                raise RuntimeError(f"{label}: {url} returned {response.status_code}.")
+            queries += len(captured)
+        elapsed = time.perf_counter() - started
+        timings.sort()
+        self.stdout.write(
+            f"{label:>15} {requests / elapsed:>8.0f} {statistics.median(timings) * 1000:>6.2f}ms "
+            f"{timings[int(len(timings) * 0.95)] * 1000:>6.2f}ms {queries / requests:>12.1f}"
+        )
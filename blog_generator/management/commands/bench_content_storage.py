@@ -0,0 +1,132 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from blog_generator import compression
+from blog_generator.management.commands.bench_search import synthetic_vocabulary
+from blog_generator.models import BlogPost, markdown
+
+BATCH_SIZE = 1000
+
+
+def synthetic_article(rng, vocabulary, cumulative, chars):
+    """
+    Markdown shaped like a generated article: headed sections of Zipf-distributed words.
+    """
+    sections, size = [], 0
+    while size < chars:
+        sentences = [
+            ' '.join(rng.choices(vocabulary, cum_weights=cumulative, k=rng.randint(8, 20))).capitalize() + '.'
+            for _ in range(rng.randint(4, 8))
+        ]
+        heading = ' '.join(rng.choices(vocabulary, cum_weights=cumulative, k=3)).title()
+        sections.append(f"## {heading}\n\n" + ' '.join(sentences))
+        size += len(sections[-1]) + 2
+    return '\n\n'.join(sections)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares stored row size and read latency of posts whose body and rendered HTML "
+        "are kept as plain text (pre-compression rows) and compressed. Runs in a "
+        "transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=5000, help='Posts per layout.')
+        parser.add_argument('--content-chars', type=int, default=6000, help='Approximate article size.')
+        parser.add_argument('--reads', type=int, default=1000, help='Single-post reads to time per layout.')
+        parser.add_argument('--existing', action='store_true', help="Use the bodies of existing posts instead of synthetic text.")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        if options['existing']:
+            bodies = [post.generated_content for post in BlogPost.objects.all()[:1000]]
+            if not bodies:
+                self.stderr.write("There are no existing posts.")
+                return
+        else:
+            vocabulary = synthetic_vocabulary(20_000, rng)
+            cumulative, total = [], 0.0
+            for rank in range(1, len(vocabulary) + 1):
+                total += 1 / rank
+                cumulative.append(total)
+            bodies = [synthetic_article(rng, vocabulary, cumulative, options['content_chars']) for _ in range(200)]
+        rendered = [(body, markdown(body)) for body in bodies]
+        self.stdout.write(f"Database: {connection.vendor}")
+
+        with transaction.atomic():
+            layouts = {}
+            for label in ('plain', 'compressed'):
+                user = User.objects.create_user(username=f'storage-bench-{label}-{rng.getrandbits(32):x}')
+                layouts[label] = (user, self.populate(user, label, rendered, options['posts'], rng))
+
+            # "read" fetches a post the way blog_details does (rendered HTML, no
+            # markdown); "scan 1k" reads the markdown of 1000 posts.
+            self.stdout.write(f"{'layout':>11} {'row bytes':>12} {'per post':>9} {'read p50':>9} {'read p95':>9} {'scan 1k':>8}")
+            for label, (user, ids) in layouts.items():
+                stored = self.stored_bytes(user)
+                reads = [self.time_read(rng.choice(ids)) for _ in range(options['reads'])]
+                scan = self.time_scan(user)
+                self.stdout.write(
+                    f"{label:>11} {stored:>12,} {stored // len(ids):>9,} "
+                    f"{statistics.median(reads) * 1000:>7.2f}ms {percentile(reads, 0.95) * 1000:>7.2f}ms "
+                    f"{scan * 1000:>6.0f}ms"
+                )
+            transaction.set_rollback(True)
+
+    def populate(self, user, layout, rendered, count, rng):
+        ids = []
+        for start in range(0, count, BATCH_SIZE):
+            posts = []
+            for _ in range(min(BATCH_SIZE, count - start)):
+                body, html = rng.choice(rendered)
+                post = BlogPost(user=user, youtube_title='Benchmark', youtube_link='N/A', excerpt=body[:80])
+                if layout == 'plain':
+                    post.content_legacy = body
+                    post.html_legacy = html
+                else:
+                    post.content_compressed = compression.compress(body)
+                    post.html_compressed = compression.compress(html)
+                posts.append(post)
+            ids.extend(post.pk for post in BlogPost.objects.bulk_create(posts))
+        return ids
+
+    def stored_bytes(self, user):
+        """
+        Total size of the users' rows, every column included.
+        """
+        table = connection.ops.quote_name(BlogPost._meta.db_table)
+        if connection.vendor == 'postgresql':
+            # pg_column_size counts TOAST compression, so PostgreSQL's own pglz
+            # compression of large text values is part of the baseline.
+            size = f"pg_column_size({table}.*)"
+        else:
+            size = ' + '.join(
+                f"COALESCE(LENGTH({connection.ops.quote_name(field.column)}), 0)"
+                for field in BlogPost._meta.concrete_fields
+            )
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COALESCE(SUM({size}), 0) FROM {table} WHERE user_id = %s", [user.pk])
+            return cursor.fetchone()[0]
+
+    def time_read(self, pk):
+        started = time.perf_counter()
+        BlogPost.objects.defer('content_compressed', 'content_legacy').get(pk=pk).content_html
+        return time.perf_counter() - started
+
+    def time_scan(self, user):
+        started = time.perf_counter()
+        for post in BlogPost.objects.filter(user=user).order_by('pk')[:1000]:
+            post.generated_content
+        return time.perf_counter() - started
@@ -0,0 +1,64 @@
+import random
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog_generator import chunking, generation, llm
+
+WORDS = (
+    "today we are going to look at how the model works and why it matters for the way "
+    "you build software so let me show you the code first then we will talk about performance"
+).split()
+
+
+def synthetic_transcript(chars, seed=0):
+    rng = random.Random(seed)
+    sentences, size = [], 0
+    while size < chars:
+        sentence = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 25))).capitalize() + '.'
+        sentences.append(sentence)
+        size += len(sentence) + 1
+    return ' '.join(sentences)[:chars]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares wall-clock time of single-shot and map-reduce (chunked) generation on "
+        "synthetic transcripts, using a stub model with per-token latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='50000,100000,250000,500000', help='Comma-separated transcript sizes in characters.')
+        parser.add_argument('--prefill-rate', type=float, default=5000, help='Stub prompt processing speed, tokens/s.')
+        parser.add_argument('--decode-rate', type=float, default=150, help='Stub output speed, tokens/s.')
+        parser.add_argument('--latency', type=float, default=0.3, help='Stub fixed per-call overhead, seconds.')
+
+    def handle(self, *args, **options):
+        original = (settings.BLOG_LONG_TRANSCRIPT_CHARS, settings.BLOG_CACHE_ENABLED)
+        original_backend = llm.use_backend(llm.StubBackend(
+            latency=options['latency'],
+            prefill_rate=options['prefill_rate'],
+            decode_rate=options['decode_rate'],
+        ))
+        settings.BLOG_CACHE_ENABLED = False
+        try:
+            self.stdout.write(f"{'chars':>8} {'chunks':>7} {'single-shot':>12} {'chunked':>9} {'speedup':>8}")
+            for size in [int(s) for s in options['sizes'].split(',')]:
+                transcript = synthetic_transcript(size)
+                chunks = len(chunking.chunk_transcript(transcript, settings.BLOG_CHUNK_TOKENS))
+
+                settings.BLOG_LONG_TRANSCRIPT_CHARS = size + 1
+                single = self.time_generation(transcript)
+                settings.BLOG_LONG_TRANSCRIPT_CHARS = 0
+                chunked = self.time_generation(transcript)
+
+                self.stdout.write(f"{size:>8} {chunks:>7} {single:>11.2f}s {chunked:>8.2f}s {single / chunked:>7.2f}x")
+        finally:
+            settings.BLOG_LONG_TRANSCRIPT_CHARS, settings.BLOG_CACHE_ENABLED = original
+            llm.use_backend(original_backend)
+
+    def time_generation(self, transcript):
+        started = time.perf_counter()
+        generation.generate_article(transcript)
+        return time.perf_counter() - started
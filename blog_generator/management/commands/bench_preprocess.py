@@ -0,0 +1,97 @@
+import random
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog_generator import generation, llm, preprocess
+from blog_generator.management.commands.bench_long_transcripts import synthetic_transcript
+
+FILLERS = ('um', 'uh', 'so um', 'uh')
+
+
+def noisy_captions(chars, seed=0):
+    """
+    A transcript shaped like a pasted YouTube caption export: numbered SRT cues with
+    timestamps, rolling captions that repeat the end of the previous line, fillers,
+    stutters and sound markers. `chars` is the size of the spoken text underneath.
+    """
+    rng = random.Random(seed)
+    words = synthetic_transcript(chars, seed).split()
+    cues, previous, position, second = [], [], 0, 0
+    while position < len(words):
+        line = words[position:position + rng.randint(6, 10)]
+        position += len(line)
+        if rng.random() < 0.15:
+            line.insert(rng.randrange(len(line)), rng.choice(FILLERS))
+        if rng.random() < 0.05:
+            line.insert(0, line[0])
+        # Rolling captions repeat a few words of the previous cue.
+        text = ' '.join(previous[-rng.randint(2, 4):] + line) if previous else ' '.join(line)
+        previous = line
+        start, second = second, second + rng.randint(2, 4)
+        cues.append(
+            f"{len(cues) + 1}\n00:{start // 60:02d}:{start % 60:02d},000 --> 00:{second // 60:02d}:{second % 60:02d},000\n{text}"
+        )
+        if rng.random() < 0.03:
+            cues.append(f"{len(cues) + 1}\n00:{second // 60:02d}:{second % 60:02d},000 --> 00:{second // 60:02d}:{second % 60:02d},500\n[Music]")
+    return '\n\n'.join(cues)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures how transcript preprocessing changes prompt size, generation latency "
+        "and input cost, on synthetic caption exports and a stub model with per-token latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10000,30000,60000', help='Comma-separated spoken-text sizes in characters.')
+        parser.add_argument('--budget', type=int, default=2000, help='Token budget for the compressed variant.')
+        parser.add_argument('--prefill-rate', type=float, default=5000, help='Stub prompt processing speed, tokens/s.')
+        parser.add_argument('--decode-rate', type=float, default=150, help='Stub output speed, tokens/s.')
+        parser.add_argument('--latency', type=float, default=0.3, help='Stub fixed per-call overhead, seconds.')
+        parser.add_argument('--input-price', type=float, default=0.30, help='Model input price in USD per million tokens.')
+
+    def handle(self, *args, **options):
+        original = (
+            settings.BLOG_CACHE_ENABLED, settings.BLOG_PREPROCESS_ENABLED,
+            settings.BLOG_TRANSCRIPT_TOKEN_BUDGET, settings.BLOG_LONG_TRANSCRIPT_CHARS,
+        )
+        self.backend = llm.StubBackend(
+            latency=options['latency'],
+            prefill_rate=options['prefill_rate'],
+            decode_rate=options['decode_rate'],
+        )
+        original_backend = llm.use_backend(self.backend)
+        settings.BLOG_CACHE_ENABLED = False
+        # Compare single-call generation; chunking is benchmarked by bench_long_transcripts.
+        settings.BLOG_LONG_TRANSCRIPT_CHARS = 10 ** 9
+        variants = [('raw', False, 0), ('cleaned', True, 0), (f"budget {options['budget']}", True, options['budget'])]
+        try:
+            self.stdout.write(
+                f"{'size':>7} {'variant':>12} {'tokens':>8} {'saved':>6} {'prep':>8} {'generate':>9} {'input $/1k':>11}"
+            )
+            for size in [int(s) for s in options['sizes'].split(',')]:
+                transcript = noisy_captions(size)
+                raw_tokens = None
+                for label, enabled, budget in variants:
+                    settings.BLOG_PREPROCESS_ENABLED, settings.BLOG_TRANSCRIPT_TOKEN_BUDGET = enabled, budget
+                    started = time.perf_counter()
+                    prepared = preprocess.prepare(transcript)
+                    prep_time = time.perf_counter() - started
+                    raw_tokens = raw_tokens or prepared.tokens_after
+
+                    started = time.perf_counter()
+                    generation.generate_article(transcript)
+                    total = time.perf_counter() - started
+
+                    cost = prepared.tokens_after * options['input_price'] / 1_000_000 * 1000
+                    saved = 1 - prepared.tokens_after / raw_tokens
+                    self.stdout.write(
+                        f"{size:>7} {label:>12} {prepared.tokens_after:>8} {saved:>6.0%} "
+                        f"{prep_time * 1000:>6.1f}ms {total:>8.2f}s {cost:>11.3f}"
+                    )
+        finally:
+            (settings.BLOG_CACHE_ENABLED, settings.BLOG_PREPROCESS_ENABLED,
+             settings.BLOG_TRANSCRIPT_TOKEN_BUDGET, settings.BLOG_LONG_TRANSCRIPT_CHARS) = original
+            llm.use_backend(original_backend)
@@ -0,0 +1,110 @@
+import itertools
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from blog_generator import llm
+
+
+class CountingStub(llm.StubBackend):
+    """
+    StubBackend that counts upstream calls, including hedges and abandoned attempts.
+    """
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.calls = itertools.count()
+
+    def generate(self, prompt):
+        next(self.calls)
+        return super().generate(prompt)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares model call latency and failure rates with and without retries, "
+        "hedging and the circuit breaker, against a stub with a lognormal latency tail "
+        "and injected failures."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=400, help='Calls per variant.')
+        parser.add_argument('--concurrency', type=int, default=16, help='Calls in flight at once.')
+        parser.add_argument('--latency', type=float, default=0.2, help='Stub median latency, seconds.')
+        parser.add_argument('--spread', type=float, default=0.8, help='Stub lognormal sigma.')
+        parser.add_argument('--error-rate', type=float, default=0.05, help='Stub share of failing calls.')
+        parser.add_argument('--timeout', type=float, default=1.5, help='Per-attempt timeout, seconds.')
+
+    def run_variant(self, backend, calls, concurrency, prompts):
+        latencies, failures = [], 0
+        lock = threading.Lock()
+
+        def call(index):
+            nonlocal failures
+            started = time.perf_counter()
+            try:
+                backend.generate(prompts[index % len(prompts)])
+            except llm.BackendError:
+                with lock:
+                    failures += 1
+                return
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(call, range(calls)))
+        return latencies, failures, time.perf_counter() - started
+
+    def handle(self, *args, **options):
+        stub_options = {
+            'latency': options['latency'], 'latency_distribution': 'lognormal',
+            'latency_spread': options['spread'], 'error_rate': options['error_rate'], 'seed': 1,
+        }
+        prompts = [f"Summarize transcript {i}." for i in range(50)]
+        no_breaker = {'breaker_failures': 10 ** 9, 'deadline': 3600}
+        variants = [
+            ('bare', {'max_attempts': 1, 'timeout': 3600, 'hedge': False, **no_breaker}),
+            ('retry', {'max_attempts': 3, 'timeout': options['timeout'], 'backoff_base': 0.05,
+                       'backoff_max': 0.5, 'hedge': False, **no_breaker}),
+            ('retry+hedge', {'max_attempts': 3, 'timeout': options['timeout'], 'backoff_base': 0.05,
+                             'backoff_max': 0.5, 'hedge': True, **no_breaker}),
+        ]
+
+        self.stdout.write(
+            f"{'variant':>12} {'ok':>6} {'failed':>7} {'p50':>7} {'p95':>7} {'p99':>7} {'max':>7} {'upstream':>9}"
+        )
+        for label, resilience in variants:
+            stub = CountingStub(**stub_options)
+            backend = llm.ResilientBackend(stub, **resilience)
+            # Let the latency tracker see enough calls to estimate p95 before measuring.
+            self.run_variant(backend, 100, options['concurrency'], prompts)
+            stub.calls = itertools.count()
+            latencies, failures, _ = self.run_variant(backend, options['calls'], options['concurrency'], prompts)
+            upstream = next(stub.calls) / options['calls']
+            self.stdout.write(
+                f"{label:>12} {len(latencies):>6} {failures:>7} {statistics.median(latencies):>6.2f}s "
+                f"{percentile(latencies, 0.95):>6.2f}s {percentile(latencies, 0.99):>6.2f}s "
+                f"{max(latencies):>6.2f}s {upstream:>8.2f}x"
+            )
+
+        # Upstream down: without a breaker every call pays for all its retries.
+        self.stdout.write("\nUpstream failing every call:")
+        for label, failures_to_open in (('no breaker', 10 ** 9), ('breaker', 5)):
+            stub = CountingStub(**{**stub_options, 'error_rate': 1.0})
+            backend = llm.ResilientBackend(
+                stub, max_attempts=3, timeout=options['timeout'], backoff_base=0.05, backoff_max=0.5,
+                hedge=False, breaker_failures=failures_to_open, breaker_reset=60, deadline=3600,
+            )
+            _, failures, elapsed = self.run_variant(backend, options['calls'], options['concurrency'], prompts)
+            self.stdout.write(
+                f"{label:>12}: {failures} failed in {elapsed:.2f}s, "
+                f"{next(stub.calls)} upstream calls"
+            )
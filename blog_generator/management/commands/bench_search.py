@@ -0,0 +1,96 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from blog_generator import search
+from blog_generator.models import BlogPost, make_excerpt
+
+BATCH_SIZE = 2000
+SYLLABLES = "ba be bi bo bu da de di do ka ke ki ko la le li lo ma me mi mo na ne ni no ra re ri ro sa se si so ta te ti to va ve vi vo".split()
+
+
+def synthetic_vocabulary(size, rng):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks ranked full-text search against a scan of the article bodies over synthetic posts. "
+        "Everything runs in a transaction that is rolled back, so no data is kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100_000, help='Posts to create for the benchmark user.')
+        parser.add_argument('--content-chars', type=int, default=2000, help='Approximate article size.')
+        parser.add_argument('--vocabulary', type=int, default=20_000, help='Distinct words in the synthetic articles.')
+        parser.add_argument('--queries', type=int, default=200, help='Indexed searches to time.')
+        parser.add_argument('--scan-queries', type=int, default=10, help='Body scans to time (slow).')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = synthetic_vocabulary(options['vocabulary'], rng)
+        # Zipf-like word frequencies, as in natural text.
+        weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+        self.stdout.write(f"Database: {connection.vendor}")
+
+        with transaction.atomic():
+            user = User.objects.create_user(username=f'search-bench-{rng.getrandbits(32):x}')
+            started = time.perf_counter()
+            self.populate(user, options, vocabulary, weights, rng)
+            self.stdout.write(f"Created and indexed {options['posts']} posts in {time.perf_counter() - started:.1f}s")
+
+            # Mid-frequency words: common enough to match many posts, rare enough to be selective.
+            candidates = vocabulary[50:2000]
+            queries = [' '.join(rng.sample(candidates, rng.randint(1, 2))) for _ in range(options['queries'])]
+
+            self.report('full-text index', [self.time_indexed(user, q) for q in queries])
+            self.report('body scan', [self.time_scan(user, q) for q in queries[:options['scan_queries']]])
+            transaction.set_rollback(True)
+
+    def populate(self, user, options, vocabulary, weights, rng):
+        words_per_post = max(1, options['content_chars'] // 7)
+        cumulative = []
+        total = 0.0
+        for weight in weights:
+            total += weight
+            cumulative.append(total)
+
+        for start in range(0, options['posts'], BATCH_SIZE):
+            posts = []
+            for _ in range(min(BATCH_SIZE, options['posts'] - start)):
+                content = ' '.join(rng.choices(vocabulary, cum_weights=cumulative, k=words_per_post))
+                posts.append(BlogPost(
+                    user=user,
+                    youtube_title=' '.join(rng.choices(vocabulary, cum_weights=cumulative, k=6)).title(),
+                    youtube_link='N/A',
+                    generated_content=content,
+                    excerpt=make_excerpt(content),
+                ))
+            # bulk_create skips save() and post_save, so index explicitly.
+            search.index_posts(BlogPost.objects.bulk_create(posts))
+
+    def time_indexed(self, user, query):
+        started = time.perf_counter()
+        search.search_posts(user, query, page=1, page_size=20)
+        return time.perf_counter() - started
+
+    def time_scan(self, user, query):
+        started = time.perf_counter()
+        search.scan_posts(user, search.parse_query(query), 20)
+        return time.perf_counter() - started
+
+    def report(self, label, timings):
+        timings = sorted(timings)
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f"{label:>16}: {len(timings)} queries, "
+            f"p50={statistics.median(timings) * 1000:.1f}ms p95={p95 * 1000:.1f}ms"
+        )
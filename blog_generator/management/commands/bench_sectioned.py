@@ -0,0 +1,109 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog_generator import generation, llm
+from blog_generator.management.commands.bench_long_transcripts import synthetic_transcript
+
+
+class CountingStub(llm.StubBackend):
+    """
+    Stub that also counts calls and prompt/output tokens.
+    """
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.lock = threading.Lock()
+        self.calls = self.input_tokens = self.output_tokens = 0
+
+    def reply(self, prompt):
+        text = super().reply(prompt)
+        with self.lock:
+            self.calls += 1
+            self.input_tokens += llm.estimate_tokens(prompt)
+            self.output_tokens += llm.estimate_tokens(text)
+        return text
+
+    def reset(self):
+        with self.lock:
+            self.calls = self.input_tokens = self.output_tokens = 0
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares end-to-end latency and time to first content of single-call and "
+        "sectioned generation, using a stub model with per-token latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--transcript-chars', type=int, default=20000, help='Synthetic transcript size.')
+        parser.add_argument('--article-tokens', type=int, default=2700, help='Article length (about 2,000 words).')
+        parser.add_argument('--sections', type=int, default=6, help='Sections in the stub outline.')
+        parser.add_argument('--workers', default='1,2,4,8', help='Comma-separated BLOG_SECTION_WORKERS values to try.')
+        parser.add_argument('--prefill-rate', type=float, default=5000, help='Stub prompt processing speed, tokens/s.')
+        parser.add_argument('--decode-rate', type=float, default=150, help='Stub output speed, tokens/s.')
+        parser.add_argument('--latency', type=float, default=0.3, help='Stub fixed per-call overhead, seconds.')
+        parser.add_argument('--runs', type=int, default=3, help='Runs per row; the median is reported.')
+
+    def handle(self, *args, **options):
+        stub = CountingStub(
+            latency=options['latency'],
+            prefill_rate=options['prefill_rate'],
+            decode_rate=options['decode_rate'],
+            article_tokens=options['article_tokens'],
+            outline_sections=options['sections'],
+        )
+        original = (settings.BLOG_CACHE_ENABLED, settings.BLOG_SECTION_WORKERS)
+        original_backend = llm.use_backend(stub)
+        settings.BLOG_CACHE_ENABLED = False
+        transcript = synthetic_transcript(options['transcript_chars'])
+        try:
+            self.stdout.write(
+                f"{options['transcript_chars']:,}-char transcript, {options['article_tokens']} output tokens, "
+                f"{options['sections']} sections, decode {options['decode_rate']:g} tokens/s"
+            )
+            self.stdout.write(
+                f"{'mode':>14} {'total':>8} {'first text':>11} {'speedup':>8} "
+                f"{'calls':>6} {'in tokens':>10} {'out tokens':>11}"
+            )
+            baseline = self.run_row('single', 'single', transcript, stub, options['runs'], None)
+            for workers in [int(w) for w in options['workers'].split(',')]:
+                settings.BLOG_SECTION_WORKERS = workers
+                self.run_row(f'sectioned x{workers}', 'sectioned', transcript, stub, options['runs'], baseline)
+        finally:
+            settings.BLOG_CACHE_ENABLED, settings.BLOG_SECTION_WORKERS = original
+            llm.use_backend(original_backend)
+
+    def run_row(self, label, mode, transcript, stub, runs, baseline):
+        totals, firsts = [], []
+        for _ in range(runs):
+            stub.reset()
+            total, first = self.time_stream(transcript, mode)
+            totals.append(total)
+            firsts.append(first)
+        total, first = sorted(totals)[runs // 2], sorted(firsts)[runs // 2]
+        speedup = f"{baseline / total:>7.2f}x" if baseline else f"{'':>8}"
+        self.stdout.write(
+            f"{label:>14} {total:>7.2f}s {first:>10.2f}s {speedup} "
+            f"{stub.calls:>6} {stub.input_tokens:>10,} {stub.output_tokens:>11,}"
+        )
+        return total
+
+    def time_stream(self, transcript, mode):
+        """
+        Streams one article the way generate_blog does and returns (total seconds,
+        seconds until the first article text).
+        """
+        started = time.perf_counter()
+        splitter = generation.DelimiterSplitter()
+        first = None
+        for chunk in generation.stream_article(transcript, mode):
+            if any(part == 'content' for part, _ in splitter.feed(chunk)) and first is None:
+                first = time.perf_counter() - started
+        splitter.finish()
+        title, content = splitter.result()
+        if not content:
+            raise RuntimeError(f"{mode} generation produced no content.")
+        total = time.perf_counter() - started
+        return total, first if first is not None else total
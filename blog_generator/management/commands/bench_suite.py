@@ -0,0 +1,609 @@
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import django
+import httpx
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.utils import get_random_secret_key
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from blog_generator import generation, llm
+from blog_generator.management.commands.bench_content_storage import synthetic_article
+from blog_generator.management.commands.bench_long_transcripts import synthetic_transcript
+from blog_generator.management.commands.bench_search import synthetic_vocabulary
+from blog_generator.models import BlogPost
+
+# End-to-end benchmark of the main request paths. A throwaway SQLite database is
+# seeded with one user per size in --sizes, then every scenario is driven over HTTP
+# against real servers started from this checkout: gunicorn (WSGI, gthread workers)
+# and uvicorn (ASGI). The model is the stub backend, so generation timings cover the
+# request path only.
+#
+# Queries per request are counted in this process with the test client, since they
+# don't depend on the server. Peak RSS is the sum of the high-water marks of every
+# server process, reset before each scenario (Linux only; null elsewhere).
+#
+# Results are written as JSON. With --baseline they are compared against an earlier
+# results file and the command fails when a scenario regressed by more than
+# --threshold, so it can gate CI.
+
+SERVERS = ('wsgi', 'asgi')
+SCENARIOS = ('blog_list', 'blog_details', 'generate_blog', 'login', 'signup')
+PASSWORD = 'bench-suite-password'
+TEMPLATE_POSTS = 50
+SEED_BATCH = 2000
+# Metrics compared against the baseline, and whether a higher value is worse.
+COMPARED = (('p50_ms', True), ('p95_ms', True), ('throughput_rps', False), ('peak_rss_mb', True))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def row_key(row):
+    return row['server'], row['scenario'], row['posts']
+
+def clone_post(template, user, title):
+    """
+    A copy of a build_post() template, so seeding doesn't render every body.
+    """
+    post = BlogPost(**{
+        field.attname: getattr(template, field.attname)
+        for field in BlogPost._meta.concrete_fields if not field.primary_key
+    })
+    post.user = user
+    post.youtube_title = title
+    return post
+
+
+# --- HTTP Sessions ---
+
+class HttpSession:
+    """
+    A browser-like client of a running server: keeps cookies and sends the CSRF
+    cookie back as X-CSRFToken.
+    """
+    def __init__(self, base_url):
+        self.http = httpx.Client(base_url=base_url, timeout=120)
+        self.get(reverse('login'))  # sets the csrftoken cookie
+
+    def get(self, path):
+        response = self.http.get(path)
+        return response.status_code, response.text
+
+    def post_form(self, path, data):
+        response = self.http.post(path, data=data, headers=self.csrf_headers())
+        return response.status_code, response.text
+
+    def post_json(self, path, payload):
+        response = self.http.post(path, json=payload, headers=self.csrf_headers())
+        return response.status_code, response.text
+
+    def csrf_headers(self):
+        return {'X-CSRFToken': self.http.cookies.get('csrftoken', '')}
+
+    def log_out(self):
+        self.http.cookies.delete(settings.SESSION_COOKIE_NAME)
+
+    def close(self):
+        self.http.close()
+
+
+class ClientSession:
+    """
+    The same interface over the Django test client, for counting queries in-process.
+    """
+    def __init__(self):
+        self.client = Client()
+
+    def get(self, path):
+        return self.read(self.client.get(path))
+
+    def post_form(self, path, data):
+        return self.read(self.client.post(path, data))
+
+    def post_json(self, path, payload):
+        return self.read(self.client.post(path, json.dumps(payload), content_type='application/json'))
+
+    def read(self, response):
+        if response.streaming:
+            return response.status_code, b''.join(response.streaming_content).decode()
+        return response.status_code, response.content.decode()
+
+    def log_out(self):
+        self.client.cookies.pop(settings.SESSION_COOKIE_NAME, None)
+
+    def close(self):
+        pass
+
+
+def log_in(session, username):
+    status, _ = session.post_form(reverse('login'), {'username': username, 'password': PASSWORD})
+    if status != 302:
+        raise CommandError(f"Logging in as {username} returned {status}.")
+
+
+# --- Servers ---
+
+class Server:
+    """
+    A gunicorn or uvicorn process tree serving this project on a free local port.
+    """
+    def __init__(self, kind, env, workers, threads):
+        self.kind = kind
+        port = free_port()
+        self.url = f'http://127.0.0.1:{port}'
+        if kind == 'wsgi':
+            command = [
+                sys.executable, '-m', 'gunicorn', 'ai_blog_app.wsgi:application',
+                '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--threads', str(threads),
+                '--log-level', 'warning',
+            ]
+        else:
+            command = [
+                sys.executable, '-m', 'uvicorn', 'ai_blog_app.asgi:application',
+                '--host', '127.0.0.1', '--port', str(port), '--workers', str(workers),
+                '--log-level', 'warning', '--no-access-log',
+            ]
+        self.log = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(command, cwd=settings.BASE_DIR, env=env, stdout=self.log, stderr=subprocess.STDOUT)
+
+    def wait_ready(self, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise CommandError(f"The {self.kind} server exited:\n{self.output()}")
+            try:
+                if httpx.get(self.url + reverse('login'), timeout=5).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            time.sleep(0.2)
+        raise CommandError(f"The {self.kind} server did not start in {timeout}s:\n{self.output()}")
+
+    def output(self):
+        self.log.seek(0)
+        return self.log.read().decode(errors='replace')[-4000:]
+
+    def pids(self):
+        """
+        The server's process and all its descendants, read from /proc.
+        """
+        parents = {}
+        for entry in os.listdir('/proc'):
+            if entry.isdigit():
+                try:
+                    with open(f'/proc/{entry}/stat') as f:
+                        # The command name is in parentheses and may contain spaces.
+                        parents[int(entry)] = int(f.read().rsplit(')', 1)[1].split()[1])
+                except (OSError, IndexError, ValueError):
+                    continue
+        tree, frontier = {self.process.pid}, [self.process.pid]
+        while frontier:
+            parent = frontier.pop()
+            children = [pid for pid, ppid in parents.items() if ppid == parent and pid not in tree]
+            tree.update(children)
+            frontier.extend(children)
+        return tree
+
+    def reset_peak_rss(self):
+        for pid in self.pids():
+            try:
+                with open(f'/proc/{pid}/clear_refs', 'w') as f:
+                    f.write('5')
+            except OSError:
+                pass
+
+    def peak_rss_mb(self):
+        """
+        Sum of VmHWM over the process tree, or None where /proc isn't available.
+        """
+        if not os.path.isdir('/proc'):
+            return None
+        total_kb = 0
+        for pid in self.pids():
+            try:
+                with open(f'/proc/{pid}/status') as f:
+                    total_kb += next((int(line.split()[1]) for line in f if line.startswith('VmHWM:')), 0)
+            except OSError:
+                continue
+        return round(total_kb / 1024, 1)
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.log.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks generate_blog (stubbed model), blog_list and blog_details at several "
+        "posts-per-user sizes, plus login and signup, under gunicorn (WSGI) and uvicorn (ASGI). "
+        "Reports latency percentiles, throughput, queries per request and peak server RSS, "
+        "writes them as JSON and optionally flags regressions against a baseline file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10,1000,100000', help='Comma-separated posts-per-user sizes.')
+        parser.add_argument('--servers', default=','.join(SERVERS), help='Comma-separated servers to run: wsgi, asgi.')
+        parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='Comma-separated scenarios to run.')
+        parser.add_argument('--requests', type=int, default=300, help='Measured requests per page scenario.')
+        parser.add_argument('--generate-requests', type=int, default=100, help='Measured requests per generate_blog scenario.')
+        parser.add_argument('--auth-requests', type=int, default=40, help='Measured requests for login and signup (password hashing dominates).')
+        parser.add_argument('--warmup', type=int, default=10, help='Unmeasured requests before each scenario.')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent client connections.')
+        parser.add_argument('--workers', type=int, default=2, help='Server worker processes.')
+        parser.add_argument('--threads', type=int, default=4, help='Threads per gunicorn worker.')
+        parser.add_argument('--model-latency', type=float, default=0.0, help='Stub model latency in seconds.')
+        parser.add_argument('--transcript-chars', type=int, default=4000, help='Transcript size sent to generate_blog.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--keep-db', action='store_true', help='Keep the seeded database and reuse it on the next run.')
+        parser.add_argument('--output', default='bench_results.json', help="Results file to write, or '-' to skip.")
+        parser.add_argument('--baseline', help='Earlier results file to compare against.')
+        parser.add_argument('--threshold', type=float, default=0.15, help='Relative change counted as a regression.')
+        parser.add_argument('--compare', metavar='RESULTS', help='Compare an existing results file with --baseline instead of running.')
+
+    def handle(self, *args, **options):
+        if options['compare']:
+            if not options['baseline']:
+                raise CommandError("--compare needs --baseline.")
+            with open(options['compare']) as f:
+                results = json.load(f)
+        else:
+            results = self.run_suite(options)
+            if options['output'] != '-':
+                with open(options['output'], 'w') as f:
+                    json.dump(results, f, indent=2)
+                self.stdout.write(f"Wrote {options['output']}")
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+            self.compare(results, baseline, options['threshold'])
+
+    # --- Running ---
+
+    def run_suite(self, options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        servers = options['servers'].split(',')
+        for kind in servers:
+            if kind not in SERVERS:
+                raise CommandError(f"Unknown server '{kind}'; choose from {', '.join(SERVERS)}.")
+        names = options['scenarios'].split(',')
+        for name in names:
+            if name not in SCENARIOS:
+                raise CommandError(f"Unknown scenario '{name}'; choose from {', '.join(SCENARIOS)}.")
+        rng = random.Random(options['seed'])
+        try:
+            settings.SECRET_KEY
+        except ImproperlyConfigured:
+            # Sessions are signed with SECRET_KEY; any key will do for benchmark users.
+            settings.SECRET_KEY = get_random_secret_key()
+
+        setup_test_environment()
+        settings.DATABASES['default'].setdefault('TEST', {})['NAME'] = os.path.join(tempfile.gettempdir(), 'bench_suite.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keep_db'])
+        original_backend = llm.use_backend(llm.StubBackend(latency=options['model_latency']))
+        original = (settings.BLOG_CACHE_ENABLED, settings.BLOG_ADMISSION_ENABLED)
+        # Each generation is new work: no article cache, and no rate limiting of the load.
+        settings.BLOG_CACHE_ENABLED = settings.BLOG_ADMISSION_ENABLED = False
+        static_root = tempfile.mkdtemp()
+        try:
+            started = time.perf_counter()
+            details = self.seed(sizes, rng)
+            self.stdout.write(f"Seeded {', '.join(f'{size:,}' for size in sizes)} posts per user in {time.perf_counter() - started:.1f}s")
+            transcripts = [
+                synthetic_transcript(options['transcript_chars'], seed=options['seed'] + i)
+                for i in range(options['generate_requests'] + options['warmup'])
+            ]
+            scenarios = [
+                scenario for scenario in self.scenarios(sizes, details, transcripts, options)
+                if scenario['name'] in names
+            ]
+
+            queries = {}
+            for scenario in scenarios:
+                queries[scenario['name'], scenario['posts']] = self.count_queries(scenario)
+
+            env = self.server_env(options, static_root)
+            subprocess.run(
+                [sys.executable, 'manage.py', 'collectstatic', '--no-input', '-v', '0'],
+                cwd=settings.BASE_DIR, env=env, check=True,
+            )
+            rows = []
+            self.stdout.write(
+                f"{'server':>6} {'scenario':>13} {'posts':>7} {'req/s':>8} {'p50':>9} {'p95':>9} "
+                f"{'p99':>9} {'queries':>8} {'rss MB':>8} {'errors':>6}"
+            )
+            for kind in servers:
+                server = Server(kind, env, options['workers'], options['threads'])
+                try:
+                    server.wait_ready()
+                    for scenario in scenarios:
+                        row = self.run_scenario(server, scenario, options)
+                        row['queries_per_request'] = queries[scenario['name'], scenario['posts']]
+                        rows.append(row)
+                        self.report(row)
+                finally:
+                    server.stop()
+        finally:
+            settings.BLOG_CACHE_ENABLED, settings.BLOG_ADMISSION_ENABLED = original
+            llm.use_backend(original_backend)
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keep_db'])
+            teardown_test_environment()
+
+        return {'meta': self.meta(options), 'results': rows}
+
+    def seed(self, sizes, rng):
+        """
+        Creates a user with `size` posts for every size (reusing a kept database)
+        and returns {size: (username, sample of post ids)}.
+        """
+        vocabulary = synthetic_vocabulary(5_000, rng)
+        cumulative, total = [], 0.0
+        for rank in range(1, len(vocabulary) + 1):
+            total += 1 / rank
+            cumulative.append(total)
+        templates = [
+            generation.build_post(None, f'Template {i}', 'N/A', synthetic_article(rng, vocabulary, cumulative, 3000))
+            for i in range(TEMPLATE_POSTS)
+        ]
+        User.objects.get_or_create(username='bench-login', defaults={'password': make_password(PASSWORD)})
+        details = {}
+        for size in sizes:
+            user, _ = User.objects.get_or_create(username=f'bench-{size}', defaults={'password': make_password(PASSWORD)})
+            existing = BlogPost.objects.filter(user=user).count()
+            for start in range(existing, size, SEED_BATCH):
+                generation.save_posts([
+                    clone_post(rng.choice(templates), user, f'Benchmark post {number}')
+                    for number in range(start, min(start + SEED_BATCH, size))
+                ])
+            ids = list(BlogPost.objects.filter(user=user).values_list('pk', flat=True))
+            details[size] = (user.username, rng.sample(ids, min(len(ids), 500)))
+        return details
+
+    def scenarios(self, sizes, details, transcripts, options):
+        """
+        Each scenario is a dict with the user to log in as (None for anonymous) and
+        send(session, i) -> (status, body, ok).
+        """
+        run = f'{int(time.time()):x}'
+        list_url, generate_url = reverse('blog-list'), reverse('generate-blog')
+        login_url, signup_url = reverse('login'), reverse('signup')
+
+        def blog_list(session, i):
+            status, body = session.get(list_url)
+            return status, status == 200
+
+        def blog_details(ids):
+            def send(session, i):
+                status, body = session.get(reverse('blog-details', args=[ids[i % len(ids)]]))
+                return status, status == 200
+            return send
+
+        def generate_blog(session, i):
+            payload = {'transcript': transcripts[i % len(transcripts)], 'title': '', 'link': 'N/A', 'stream': True}
+            status, body = session.post_json(generate_url, payload)
+            return status, status == 200 and '"event": "done"' in body
+
+        def login(session, i):
+            session.log_out()
+            status, body = session.post_form(login_url, {'username': 'bench-login', 'password': PASSWORD})
+            return status, status == 302
+
+        def signup(session, i):
+            session.log_out()
+            username = f'signup-{run}-{threading.get_ident() % 100000}-{i}'
+            status, body = session.post_form(signup_url, {
+                'username': username, 'email': f'{username}@example.com',
+                'password': PASSWORD, 'repeatPassword': PASSWORD,
+            })
+            return status, status == 302
+
+        scenarios = []
+        for size in sizes:
+            username, ids = details[size]
+            scenarios += [
+                {'name': 'blog_list', 'posts': size, 'user': username, 'send': blog_list, 'requests': options['requests']},
+                {'name': 'blog_details', 'posts': size, 'user': username, 'send': blog_details(ids), 'requests': options['requests']},
+                {'name': 'generate_blog', 'posts': size, 'user': username, 'send': generate_blog,
+                 'requests': options['generate_requests'], 'adds_posts': True},
+            ]
+        scenarios += [
+            {'name': 'login', 'posts': None, 'user': None, 'send': login, 'requests': options['auth_requests']},
+            {'name': 'signup', 'posts': None, 'user': None, 'send': signup, 'requests': options['auth_requests']},
+        ]
+        return scenarios
+
+    def count_queries(self, scenario, runs=3):
+        session = ClientSession()
+        if scenario['user']:
+            log_in(session, scenario['user'])
+        with self.restore_post_count(scenario):
+            scenario['send'](session, runs)  # warm up
+            with CaptureQueriesContext(connection) as captured:
+                for i in range(runs):
+                    status, ok = scenario['send'](session, i)
+                    if not ok:
+                        raise CommandError(f"{scenario['name']} returned {status} in-process.")
+        return round(len(captured) / runs, 1)
+
+    def run_scenario(self, server, scenario, options):
+        local = threading.local()
+        sessions = []
+        sessions_lock = threading.Lock()
+
+        def one_request(i):
+            if not hasattr(local, 'session'):
+                local.session = HttpSession(server.url)
+                if scenario['user']:
+                    log_in(local.session, scenario['user'])
+                with sessions_lock:
+                    sessions.append(local.session)
+            started = time.perf_counter()
+            try:
+                status, ok = scenario['send'](local.session, i)
+            except httpx.HTTPError as e:
+                status, ok = type(e).__name__, False
+            return time.perf_counter() - started, status, ok
+
+        warmup, total = options['warmup'], scenario['requests']
+        with self.restore_post_count(scenario), ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            list(pool.map(one_request, range(total, total + warmup)))
+            server.reset_peak_rss()
+            started = time.perf_counter()
+            outcomes = list(pool.map(one_request, range(total)))
+            wall = time.perf_counter() - started
+            peak_rss = server.peak_rss_mb()
+        for session in sessions:
+            session.close()
+
+        latencies = sorted(elapsed for elapsed, _, _ in outcomes)
+        failures = [str(status) for _, status, ok in outcomes if not ok]
+        return {
+            'server': server.kind,
+            'scenario': scenario['name'],
+            'posts': scenario['posts'],
+            'requests': total,
+            'concurrency': options['concurrency'],
+            'errors': len(failures),
+            'error_statuses': sorted(set(failures)),
+            'throughput_rps': round(total / wall, 1),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+            'peak_rss_mb': peak_rss,
+        }
+
+    @contextmanager
+    def restore_post_count(self, scenario):
+        """
+        Deletes the posts a generate_blog scenario created, so every server and
+        size sees the seeded number of posts.
+        """
+        if not scenario.get('adds_posts'):
+            yield
+            return
+        user = User.objects.get(username=scenario['user'])
+        last_pk = BlogPost.objects.filter(user=user).order_by('-pk').values_list('pk', flat=True).first() or 0
+        try:
+            yield
+        finally:
+            BlogPost.objects.filter(user=user, pk__gt=last_pk).delete()
+
+    def server_env(self, options, static_root):
+        """
+        Environment for collectstatic and the servers: the benchmark database, the
+        stub model and production settings (DEBUG off, static files from the manifest).
+        """
+        env = dict(os.environ)
+        env.update({
+            'SECRET_KEY': settings.SECRET_KEY,
+            'DATABASE_URL': f"sqlite:///{connection.settings_dict['NAME']}",
+            'RENDER': 'True',
+            'RENDER_EXTERNAL_HOSTNAME': '127.0.0.1',
+            'STATIC_ROOT': static_root,
+            'BLOG_LLM_BACKEND': 'stub',
+            'BLOG_LLM_OPTIONS': json.dumps({'latency': options['model_latency']}),
+            'BLOG_CACHE_ENABLED': 'False',
+            'BLOG_ADMISSION_ENABLED': 'False',
+            'BLOG_METRICS_DIR': tempfile.mkdtemp(),
+        })
+        env.pop('REPLICA_DATABASE_URL', None)
+        return env
+
+    def meta(self, options):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True,
+            ).stdout.strip() or None
+        except OSError:
+            commit = None
+        return {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'commit': commit,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'options': {
+                key: options[key] for key in (
+                    'sizes', 'servers', 'scenarios', 'requests', 'generate_requests', 'auth_requests', 'warmup',
+                    'concurrency', 'workers', 'threads', 'model_latency', 'transcript_chars', 'seed',
+                )
+            },
+        }
+
+    # --- Reporting ---
+
+    def report(self, row):
+        posts = f"{row['posts']:,}" if row['posts'] is not None else '-'
+        rss = f"{row['peak_rss_mb']:.0f}" if row['peak_rss_mb'] is not None else '-'
+        self.stdout.write(
+            f"{row['server']:>6} {row['scenario']:>13} {posts:>7} {row['throughput_rps']:>8.1f} "
+            f"{row['p50_ms']:>7.1f}ms {row['p95_ms']:>7.1f}ms {row['p99_ms']:>7.1f}ms "
+            f"{row['queries_per_request']:>8.1f} {rss:>8} {row['errors']:>6}"
+        )
+
+    def compare(self, results, baseline, threshold):
+        """
+        Flags rows that got slower, lost throughput or grew in memory by more than
+        `threshold`, or that issue more queries or fail more often than the baseline.
+        """
+        previous = {row_key(row): row for row in baseline['results']}
+        regressions, compared = [], 0
+        for row in results['results']:
+            old = previous.get(row_key(row))
+            if old is None:
+                continue
+            compared += 1
+            label = f"{row['server']} {row['scenario']}" + (f" @ {row['posts']:,} posts" if row['posts'] is not None else '')
+            for metric, higher_is_worse in COMPARED:
+                new_value, old_value = row.get(metric), old.get(metric)
+                if not new_value or not old_value:
+                    continue
+                change = (new_value - old_value) / old_value
+                if change > threshold if higher_is_worse else change < -threshold:
+                    regressions.append(f"{label}: {metric} {old_value:g} -> {new_value:g} ({change:+.0%})")
+            if row['queries_per_request'] > old['queries_per_request'] + 0.5:
+                regressions.append(
+                    f"{label}: queries_per_request {old['queries_per_request']:g} -> {row['queries_per_request']:g}"
+                )
+            if row['errors'] > old['errors']:
+                regressions.append(f"{label}: errors {old['errors']} -> {row['errors']}")
+
+        self.stdout.write(
+            f"Compared {compared} scenarios with the baseline from {baseline['meta'].get('created_at')} "
+            f"(commit {baseline['meta'].get('commit')}), threshold {threshold:.0%}"
+        )
+        if regressions:
+            for regression in regressions:
+                self.stdout.write(self.style.ERROR(f"  REGRESSION {regression}"))
+            raise CommandError(f"{len(regressions)} regression(s) against the baseline.")
+        self.stdout.write(self.style.SUCCESS("No regressions."))
+
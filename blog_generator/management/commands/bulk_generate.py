@@ -0,0 +1,49 @@
+import json
+import sys
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from blog_generator import batch, generation, llm
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates articles for every {title, transcript, link} record of a JSONL file "
+        "and prints one NDJSON result per record. Rerunning the same file skips the "
+        "records that were already imported."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="JSONL file to import, or '-' for stdin.")
+        parser.add_argument('--user', required=True, help='Username that will own the articles.')
+        parser.add_argument('--concurrency', type=int, default=settings.BLOG_BATCH_CONCURRENCY, help='Generations to run at once.')
+        parser.add_argument('--chunk-size', type=int, default=settings.BLOG_BATCH_CHUNK_SIZE, help='Articles saved per bulk insert.')
+        parser.add_argument(
+            '--mode', choices=generation.GENERATION_MODES, default=None,
+            help='Generation mode of every article (default: BLOG_GENERATION_MODE).',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist.")
+        if llm.get_backend() is None:
+            raise CommandError("AI model is not configured.")
+
+        source = sys.stdin if options['path'] == '-' else open(options['path'], encoding='utf-8')
+        try:
+            for item in batch.run_batch(
+                user, source, max(1, options['concurrency']), max(1, options['chunk_size']), mode=options['mode'],
+            ):
+                if item['status'] == 'summary':
+                    self.stderr.write(
+                        f"Created {item['created']}, skipped {item['skipped']}, failed {item['failed']}."
+                    )
+                else:
+                    self.stdout.write(json.dumps(item))
+        finally:
+            if source is not sys.stdin:
+                source.close()
@@ -0,0 +1,41 @@
+import sys
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from blog_generator import export
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes a user's articles as a ZIP of markdown files or as JSONL, streaming "
+        "them from the database. Prints the cursor for the next incremental export."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="File to write, or '-' for stdout.")
+        parser.add_argument('--user', required=True, help='Username whose articles to export.')
+        parser.add_argument('--format', choices=export.EXPORT_FORMATS, default='zip')
+        parser.add_argument('--since', help='Cursor printed by an earlier export; only newer posts are included.')
+        parser.add_argument('--chunk-size', type=int, help='Posts fetched per database round trip.')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist.")
+        try:
+            archive = export.Export(user, options['format'], options['since'], options['chunk_size'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        target = sys.stdout.buffer if options['output'] == '-' else open(options['output'], 'wb')
+        written = 0
+        try:
+            for chunk in archive.chunks():
+                target.write(chunk)
+                written += len(chunk)
+        finally:
+            if target is not sys.stdout.buffer:
+                target.close()
+        self.stderr.write(f"Wrote {written:,} bytes. Next incremental export: --since {archive.next_since}")
@@ -0,0 +1,106 @@
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand
+from django.core.management.utils import get_random_secret_key
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from blog_generator import llm
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-tests the inline generation view against a stubbed model. Compares WSGI-style "
+        "blocking workers with a single ASGI event loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Concurrent generations to fire.')
+        parser.add_argument('--latency', type=float, default=2.0, help='Stubbed model latency in seconds.')
+        parser.add_argument('--sync-workers', type=int, default=4, help='Blocking workers for the WSGI run (gunicorn sync workers).')
+
+    def handle(self, *args, **options):
+        try:
+            settings.SECRET_KEY
+        except ImproperlyConfigured:
+            # Logging the test user in signs with SECRET_KEY; any key will do here.
+            settings.SECRET_KEY = get_random_secret_key()
+        setup_test_environment()
+        # A file-backed test database lets the worker threads write concurrently.
+        test_db = os.path.join(tempfile.mkdtemp(), 'loadtest.sqlite3')
+        settings.DATABASES['default'].setdefault('TEST', {})['NAME'] = test_db
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        original_backend = llm.use_backend(llm.StubBackend(latency=options['latency']))
+        # Every request sends the same transcript from the same user; measure the
+        # model path, not the cache, duplicate detection or the rate limiter.
+        original_cache_enabled, settings.BLOG_CACHE_ENABLED = settings.BLOG_CACHE_ENABLED, False
+        original_admission_enabled, settings.BLOG_ADMISSION_ENABLED = settings.BLOG_ADMISSION_ENABLED, False
+        try:
+            user = User.objects.create_user(username='loadtest', password='loadtest')
+            payload = {'transcript': 'Stubbed transcript. ' * 50, 'title': '', 'link': 'N/A', 'on_duplicate': 'ignore'}
+
+            sync_latencies, sync_wall = self.run_sync(user, payload, options['requests'], options['sync_workers'])
+            async_latencies, async_wall = self.run_async(user, payload, options['requests'])
+
+            self.report(f"WSGI, {options['sync_workers']} blocking workers", sync_latencies, sync_wall)
+            self.report("ASGI, 1 event loop", async_latencies, async_wall)
+            self.stdout.write(self.style.SUCCESS(f"Speedup: {sync_wall / async_wall:.1f}x"))
+        finally:
+            llm.use_backend(original_backend)
+            settings.BLOG_CACHE_ENABLED = original_cache_enabled
+            settings.BLOG_ADMISSION_ENABLED = original_admission_enabled
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def run_sync(self, user, payload, total, workers):
+        # The test Client goes through the WSGI handler, which blocks a worker for the whole call.
+        url = reverse('generate-blog-async')
+
+        def one_request(_):
+            client = Client()
+            client.force_login(user)
+            started = time.perf_counter()
+            response = client.post(url, payload, content_type='application/json')
+            assert response.status_code == 200, response.content
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            latencies = list(pool.map(one_request, range(total)))
+        return latencies, time.perf_counter() - started
+
+    def run_async(self, user, payload, total):
+        url = reverse('generate-blog-async')
+        client = AsyncClient()
+        client.force_login(user)
+
+        async def one_request():
+            started = time.perf_counter()
+            response = await client.post(url, payload, content_type='application/json')
+            assert response.status_code == 200, response.content
+            return time.perf_counter() - started
+
+        async def run_all():
+            return await asyncio.gather(*(one_request() for _ in range(total)))
+
+        started = time.perf_counter()
+        latencies = asyncio.run(run_all())
+        return latencies, time.perf_counter() - started
+
+    def report(self, label, latencies, wall):
+        quantiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f"{label}: {len(latencies)} requests in {wall:.2f}s "
+            f"({len(latencies) / wall:.1f} req/s), "
+            f"p50={quantiles[49]:.2f}s p95={quantiles[94]:.2f}s"
+        )
@@ -0,0 +1,39 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from blog_generator import stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds per-user stats and daily activity from the posts, a batch of users "
+        "per transaction, and reports the users whose counters had drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only reconcile this username.')
+        parser.add_argument('--batch-size', type=int, default=100, help='Users rebuilt per transaction.')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Posts fetched per database round trip.')
+        parser.add_argument('--check', action='store_true', help='Report drift without fixing it.')
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('pk')
+        if options['user']:
+            users = users.filter(username=options['user'])
+            if not users.exists():
+                raise CommandError(f"User '{options['user']}' does not exist.")
+
+        checked, drifted, last_pk = 0, [], 0
+        while True:
+            user_ids = list(users.filter(pk__gt=last_pk).values_list('pk', flat=True)[:options['batch_size']])
+            if not user_ids:
+                break
+            drifted += sorted(stats.rebuild(user_ids, options['chunk_size'], write=not options['check']))
+            checked += len(user_ids)
+            last_pk = user_ids[-1]
+
+        verb = 'need fixing' if options['check'] else 'fixed'
+        self.stdout.write(f"Checked {checked} users; {len(drifted)} {verb}.")
+        if drifted:
+            usernames = User.objects.filter(pk__in=drifted[:20]).values_list('username', flat=True)
+            self.stdout.write(f"  {', '.join(usernames)}{' ...' if len(drifted) > 20 else ''}")
@@ -0,0 +1,79 @@
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from blog_generator import jobs, metrics
+
+
+class Command(BaseCommand):
+    help = "Runs queued blog generation jobs with a bounded pool of worker threads."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=settings.BLOG_JOB_CONCURRENCY,
+            help='Maximum number of jobs processed at the same time.',
+        )
+        parser.add_argument(
+            '--name', default=f'{socket.gethostname()}-{os.getpid()}',
+            help=(
+                'Worker name, unique among running workers (default: host-pid). A restarted worker '
+                'given the same name resumes its in-flight jobs immediately.'
+            ),
+        )
+        parser.add_argument('--once', action='store_true', help='Exit once no job is runnable and nothing is in flight.')
+
+    def handle(self, *args, **options):
+        worker_id = options['name']
+        concurrency = options['concurrency']
+        self.stopping = threading.Event()
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        jobs.recover_stale_jobs(worker_id)
+        self.stdout.write(f"Worker '{worker_id}' started with concurrency {concurrency}.")
+
+        in_flight = {}
+        last_heartbeat = last_recovery = time.monotonic()
+        heartbeat_every = settings.BLOG_JOB_LEASE_SECONDS / 3
+
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='generation') as pool:
+            while not self.stopping.is_set():
+                for job_id, future in list(in_flight.items()):
+                    if future.done():
+                        del in_flight[job_id]
+
+                claimed = False
+                if len(in_flight) < concurrency:
+                    job = jobs.claim_next(worker_id)
+                    if job is not None:
+                        in_flight[job.pk] = pool.submit(jobs.run_job, job, worker_id)
+                        claimed = True
+
+                now = time.monotonic()
+                if now - last_heartbeat >= heartbeat_every:
+                    jobs.heartbeat(list(in_flight), worker_id)
+                    last_heartbeat = now
+                if now - last_recovery >= settings.BLOG_JOB_LEASE_SECONDS:
+                    jobs.recover_stale_jobs()
+                    last_recovery = now
+                metrics.maybe_flush()
+
+                if not claimed:
+                    if options['once'] and not in_flight:
+                        break
+                    close_old_connections()
+                    self.stopping.wait(settings.BLOG_JOB_POLL_INTERVAL)
+
+            if in_flight:
+                self.stdout.write(f"Waiting for {len(in_flight)} in-flight job(s) to finish...")
+        self.stdout.write(f"Worker '{worker_id}' stopped.")
+
+    def stop(self, signum, frame):
+        self.stopping.set()
@@ -0,0 +1,104 @@
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Each run imports the target in a fresh interpreter with `python -X importtime`,
+# the way a worker boots: the server module, then the URLconf (which imports the
+# views). Import time is reported per module (self = the module's own code,
+# cumulative = including what it imported) and summed per top-level package.
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+BOOT = (
+    "import resource, time\n"
+    "started = time.perf_counter()\n"
+    "import {target}\n"
+    "from django.urls import get_resolver\n"
+    "get_resolver().url_patterns\n"
+    "print(time.perf_counter() - started, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n"
+)
+
+
+def parse_importtime(output):
+    """
+    Returns {module: (self_us, cumulative_us, depth)} from -X importtime output.
+    """
+    modules = {}
+    for line in output.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return modules
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures cold-start import time: boots the app in fresh interpreters with "
+        "-X importtime and reports the slowest modules and packages."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', default='ai_blog_app.asgi', help='Module a worker imports first.')
+        parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to start; medians are reported.')
+        parser.add_argument('--top', type=int, default=20, help='Modules to list.')
+        parser.add_argument('--output', help='Also write the results as JSON to this file.')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'ai_blog_app.settings'))
+        code = BOOT.format(target=options['target'])
+        walls, peaks, samples = [], [], defaultdict(list)
+        for _ in range(options['runs']):
+            result = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', code],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+            )
+            if result.returncode != 0:
+                raise CommandError(f"Importing {options['target']} failed:\n{result.stderr[-2000:]}")
+            wall, peak_kb = result.stdout.split()[-2:]
+            walls.append(float(wall))
+            peaks.append(int(peak_kb))
+            for name, timing in parse_importtime(result.stderr).items():
+                samples[name].append(timing)
+
+        modules = {
+            name: {
+                'self_ms': statistics.median(t[0] for t in timings) / 1000,
+                'cumulative_ms': statistics.median(t[1] for t in timings) / 1000,
+                'top_level': timings[0][2] == 0,
+            }
+            for name, timings in samples.items()
+        }
+        packages = defaultdict(float)
+        for name, module in modules.items():
+            packages[name.split('.')[0]] += module['self_ms']
+
+        boot_ms = statistics.median(walls) * 1000
+        self.stdout.write(
+            f"Boot ({options['target']} + URLconf): {boot_ms:.0f} ms median of {options['runs']}, "
+            f"{len(modules)} modules, peak RSS {statistics.median(peaks) / 1024:.0f} MB"
+        )
+        self.stdout.write(f"\n{'package':<32} {'self ms':>9}")
+        for package, total in sorted(packages.items(), key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write(f"{package:<32} {total:>9.1f}")
+        self.stdout.write(f"\n{'module':<48} {'self ms':>9} {'cumulative ms':>14}")
+        for name, module in sorted(modules.items(), key=lambda item: -item[1]['self_ms'])[:options['top']]:
+            self.stdout.write(f"{name:<48} {module['self_ms']:>9.1f} {module['cumulative_ms']:>14.1f}")
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({
+                    'target': options['target'],
+                    'runs': options['runs'],
+                    'boot_ms': round(boot_ms, 1),
+                    'peak_rss_kb': statistics.median(peaks),
+                    'packages': {package: round(total, 2) for package, total in packages.items()},
+                    'modules': modules,
+                }, f, indent=2)
+            self.stdout.write(f"Wrote {options['output']}")
@@ -0,0 +1,400 @@
+import atexit
+import bisect
+import contextvars
+import copy
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+SIZE_BUCKETS = (100, 1000, 5000, 10000, 50000, 100000, 500000, 1000000)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+# --- Metric Types ---
+
+class Metric:
+    type = ''
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    def snapshot(self):
+        with self.lock:
+            return {json.dumps(key): self.copy_value(value) for key, value in self.samples.items()}
+
+    def copy_value(self, value):
+        return value
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.samples[key] = self.samples.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self.lock:
+            return self.samples.get(self.key(labels), 0)
+
+
+class Gauge(Counter):
+    type = 'gauge'
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.samples[self.key(labels)] = value
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            sample = self.samples.get(key)
+            if sample is None:
+                sample = self.samples[key] = {'buckets': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            sample['buckets'][bisect.bisect_left(self.buckets, value)] += 1
+            sample['sum'] += value
+            sample['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def copy_value(self, value):
+        return {'buckets': list(value['buckets']), 'sum': value['sum'], 'count': value['count']}
+
+
+# --- Registry ---
+
+registry = {}
+# Callables returning extra {name: value} gauges computed at scrape time (e.g. from the database).
+collectors = []
+
+def register(metric):
+    return registry.setdefault(metric.name, metric)
+
+def counter(name, help_text, labels=()):
+    return register(Counter(name, help_text, labels))
+
+def gauge(name, help_text, labels=()):
+    return register(Gauge(name, help_text, labels))
+
+def histogram(name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+    return register(Histogram(name, help_text, labels, buckets))
+
+def register_collector(collector):
+    collectors.append(collector)
+    return collector
+
+
+# --- Multi-Process Aggregation ---
+# Every gunicorn worker keeps its own registry. Processes that serve requests or run
+# jobs periodically write a snapshot to BLOG_METRICS_DIR, and /metrics merges the
+# snapshots of all processes. One-off commands (migrate, check, ...) never call
+# maybe_flush() and so never write one. Counters and histograms of processes that
+# have exited are folded into ARCHIVE_FILE and their snapshots deleted, so the
+# totals never go backwards when a worker restarts or a PID is reused.
+
+ARCHIVE_FILE = 'metrics-archive.json'
+LOCK_FILE = 'metrics.lock'
+
+last_flush = 0.0
+flush_lock = threading.Lock()
+flushing = False
+
+def snapshot_path(pid=None):
+    return os.path.join(settings.BLOG_METRICS_DIR, f"metrics-{pid or os.getpid()}.json")
+
+def snapshot_pid(path):
+    """
+    The PID a snapshot file belongs to, or None for other files in the directory.
+    """
+    try:
+        return int(os.path.basename(path)[len('metrics-'):-len('.json')])
+    except ValueError:
+        return None
+
+def snapshot_data():
+    return {
+        name: {'type': metric.type, 'help': metric.help, 'labels': metric.label_names,
+               'buckets': getattr(metric, 'buckets', None), 'samples': metric.snapshot()}
+        for name, metric in list(registry.items())
+    }
+
+def write_json(path, data):
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+def flush():
+    global last_flush
+    try:
+        os.makedirs(settings.BLOG_METRICS_DIR, exist_ok=True)
+        write_json(snapshot_path(), snapshot_data())
+    except OSError as e:
+        logger.error(f"Failed to write metrics snapshot: {e}")
+    last_flush = time.monotonic()
+
+def start_flushing():
+    """
+    Makes this process one that writes snapshots: first archives a snapshot left
+    under its PID by an earlier process, then flushes again at exit.
+    """
+    global flushing
+    flushing = True
+    path = snapshot_path()
+    if os.path.exists(path):
+        archive([path])
+    atexit.register(flush)
+
+def maybe_flush():
+    """
+    Writes this process's snapshot if BLOG_METRICS_FLUSH_INTERVAL has passed. Cheap
+    enough to call at the end of every request.
+    """
+    if time.monotonic() - last_flush >= settings.BLOG_METRICS_FLUSH_INTERVAL:
+        if flush_lock.acquire(blocking=False):
+            try:
+                if not flushing:
+                    start_flushing()
+                flush()
+            finally:
+                flush_lock.release()
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+@contextmanager
+def directory_lock():
+    """
+    Serializes archiving across the processes sharing BLOG_METRICS_DIR.
+    """
+    os.makedirs(settings.BLOG_METRICS_DIR, exist_ok=True)
+    with open(os.path.join(settings.BLOG_METRICS_DIR, LOCK_FILE), 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+def add_metrics(merged, data, include_gauges=True):
+    """
+    Adds the samples of one snapshot to `merged`: counters and histograms are summed,
+    gauges too (one value per live process).
+    """
+    for name, metric in data.items():
+        if metric['type'] == 'gauge' and not include_gauges:
+            continue
+        target = merged.setdefault(name, {**metric, 'samples': {}})
+        for key, value in metric['samples'].items():
+            current = target['samples'].get(key)
+            if metric['type'] == 'histogram':
+                if current is None:
+                    target['samples'][key] = copy.deepcopy(value)
+                else:
+                    current['buckets'] = [a + b for a, b in zip(current['buckets'], value['buckets'])]
+                    current['sum'] += value['sum']
+                    current['count'] += value['count']
+            else:
+                target['samples'][key] = (current or 0) + value
+    return merged
+
+def read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def archive(paths):
+    """
+    Folds the counters and histograms of the given snapshots of exited processes
+    into ARCHIVE_FILE, then deletes them. Snapshots whose PID is alive again are
+    skipped, except this process's own, which start_flushing() archives before
+    its first write. The archive remembers what it folded
+    (path, size and mtime) until the file is gone, so a crash between the two
+    steps doesn't count a snapshot twice.
+    """
+    archive_path = os.path.join(settings.BLOG_METRICS_DIR, ARCHIVE_FILE)
+    with directory_lock():
+        stored = read_json(archive_path) or {'metrics': {}, 'folded': []}
+        folded = {tuple(entry) for entry in stored['folded']}
+        paths = [
+            path for path in paths
+            if snapshot_pid(path) == os.getpid() or not process_alive(snapshot_pid(path))
+        ]
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            identity = (os.path.basename(path), stat.st_size, stat.st_mtime_ns)
+            data = read_json(path)
+            if data is not None and identity not in folded:
+                add_metrics(stored['metrics'], data, include_gauges=False)
+                folded.add(identity)
+        stored['folded'] = sorted(folded)
+        try:
+            write_json(archive_path, stored)
+        except OSError as e:
+            logger.error(f"Failed to write the metrics archive: {e}")
+            return
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        # Forget files that are gone; their names may be reused by new processes.
+        remaining = {os.path.basename(path) for path in glob.glob(os.path.join(settings.BLOG_METRICS_DIR, 'metrics-*.json'))}
+        stored['folded'] = [entry for entry in stored['folded'] if entry[0] in remaining]
+        try:
+            write_json(archive_path, stored)
+        except OSError:
+            pass
+
+def merge_snapshots():
+    """
+    This process's metrics plus the snapshots of every other live process and the
+    archive of exited ones. Snapshots of exited processes are archived first.
+    """
+    own_path = snapshot_path()
+    live, dead = [], []
+    for path in glob.glob(os.path.join(settings.BLOG_METRICS_DIR, 'metrics-*.json')):
+        pid = snapshot_pid(path)
+        if pid is not None and path != own_path:
+            (live if process_alive(pid) else dead).append(path)
+    if dead:
+        archive(dead)
+
+    merged = add_metrics({}, snapshot_data())
+    for path in live:
+        data = read_json(path)
+        if data is not None:
+            add_metrics(merged, data)
+    stored = read_json(os.path.join(settings.BLOG_METRICS_DIR, ARCHIVE_FILE))
+    if stored is not None:
+        add_metrics(merged, stored['metrics'])
+    return merged
+
+
+# --- Prometheus Text Format ---
+
+def format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + (extra or [])
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+def format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render_prometheus():
+    lines = []
+    for name, metric in sorted(merge_snapshots().items()):
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for key, value in sorted(metric['samples'].items()):
+            label_values = json.loads(key)
+            if metric['type'] == 'histogram':
+                cumulative = 0
+                bounds = list(metric['buckets']) + [float('inf')]
+                for bound, bucket_count in zip(bounds, value['buckets']):
+                    cumulative += bucket_count
+                    le = format_labels(metric['labels'], label_values, [('le', format_number(bound))])
+                    lines.append(f"{name}_bucket{le} {cumulative}")
+                labels = format_labels(metric['labels'], label_values)
+                lines.append(f"{name}_sum{labels} {format_number(value['sum'])}")
+                lines.append(f"{name}_count{labels} {value['count']}")
+            else:
+                lines.append(f"{name}{format_labels(metric['labels'], label_values)} {format_number(value)}")
+
+    for collector in collectors:
+        try:
+            for name, (help_text, value) in collector().items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {format_number(value)}")
+        except Exception as e:
+            logger.error(f"Metrics collector {collector.__name__} failed: {e}")
+    return '\n'.join(lines) + '\n'
+
+
+# --- Per-Request Query Counting ---
+
+request_queries = contextvars.ContextVar('request_queries', default=None)
+
+def count_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper installed on every connection. The counter lives in a
+    context variable so queries run through sync_to_async are attributed correctly.
+    """
+    counter = request_queries.get()
+    if counter is not None:
+        counter[0] += 1
+    return execute(sql, params, many, context)
+
+
+# --- Application Metrics ---
+
+http_request_duration = histogram(
+    'http_request_duration_seconds', 'Request latency by URL name.', ('url_name', 'method'))
+http_requests = counter(
+    'http_requests_total', 'Requests by URL name and status code.', ('url_name', 'method', 'status'))
+db_queries_per_request = histogram(
+    'db_queries_per_request', 'Database queries issued while handling a request.', ('url_name',), COUNT_BUCKETS)
+db_write_duration = histogram(
+    'db_write_duration_seconds', 'Latency of database writes on the generation path.', ('operation',))
+
+llm_request_duration = histogram(
+    'llm_request_duration_seconds', 'Model call latency.', ('backend', 'call'))
+llm_prompt_chars = histogram(
+    'llm_prompt_chars', 'Prompt size in characters.', ('backend',), SIZE_BUCKETS)
+llm_response_chars = histogram(
+    'llm_response_chars', 'Response size in characters.', ('backend',), SIZE_BUCKETS)
+llm_errors = counter(
+    'llm_errors_total', 'Failed model calls.', ('backend', 'call', 'error'))
+
+generation_responses = counter(
+    'generation_responses_total', 'Parsed article responses by whether the title delimiter was found.', ('delimiter',))
@@ -0,0 +1,110 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import metrics, routers
+
+
+class MetricsMiddleware:
+    """
+    Records latency, status and database query count for every request, labelled
+    by URL name. Works in both sync (WSGI) and async (ASGI) mode.
+    For streaming responses the latency is the time to the first byte.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        queries, token, started = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.request_queries.reset(token)
+        self.finish(request, response, queries, started)
+        return response
+
+    async def __acall__(self, request):
+        queries, token, started = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.request_queries.reset(token)
+        self.finish(request, response, queries, started)
+        return response
+
+    def start(self):
+        queries = [0]
+        return queries, metrics.request_queries.set(queries), time.perf_counter()
+
+    def finish(self, request, response, queries, started):
+        elapsed = time.perf_counter() - started
+        match = request.resolver_match
+        url_name = match.url_name if match and match.url_name else 'unmatched'
+        metrics.http_request_duration.observe(elapsed, url_name=url_name, method=request.method)
+        metrics.http_requests.inc(url_name=url_name, method=request.method, status=response.status_code)
+        metrics.db_queries_per_request.observe(queries[0], url_name=url_name)
+        metrics.maybe_flush()
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Lets the database router send this request's reads to the read replica when
+    that is safe (see routers.py). A client that sent a write request is pinned to
+    the primary for BLOG_REPLICA_PIN_SECONDS through a cookie, so the pages it
+    loads next show its own changes even while the replica lags.
+    """
+    sync_capable = True
+    async_capable = True
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        state, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.routing_state.reset(token)
+        self.finish(request, response, state)
+        return response
+
+    async def __acall__(self, request):
+        state, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routers.routing_state.reset(token)
+        self.finish(request, response, state)
+        return response
+
+    def start(self, request):
+        use_replica = (
+            routers.replica_configured()
+            and request.method in self.SAFE_METHODS
+            and routers.PIN_COOKIE not in request.COOKIES
+        )
+        state = routers.RoutingState(use_replica)
+        return state, routers.routing_state.set(state)
+
+    def finish(self, request, response, state):
+        # Streaming responses may write after this returns, so any write method pins.
+        if routers.replica_configured() and (state.wrote or request.method not in self.SAFE_METHODS):
+            response.set_cookie(
+                routers.PIN_COOKIE, '1',
+                max_age=settings.BLOG_REPLICA_PIN_SECONDS, httponly=True, samesite='Lax',
+            )
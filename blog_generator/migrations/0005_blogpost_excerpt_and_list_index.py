@@ -0,0 +1,43 @@
+# Generated by Django 5.1 on 2026-10-18 13:00
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+BATCH_SIZE = 500
+
+
+def backfill_excerpts(apps, schema_editor):
+    BlogPost = apps.get_model('blog_generator', 'BlogPost')
+    last_pk = 0
+    while True:
+        batch = list(
+            BlogPost.objects.filter(pk__gt=last_pk).order_by('pk').only('pk', 'generated_content')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for post in batch:
+            post.excerpt = Truncator(' '.join(post.generated_content.split())).chars(80)
+        BlogPost.objects.bulk_update(batch, ['excerpt'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_generator', '0004_generationcacheentry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='excerpt',
+            field=models.CharField(blank=True, max_length=80),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='blogpost_user_created_idx'),
+        ),
+        migrations.RunPython(backfill_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1 on 2026-10-18 13:02
+
+import hashlib
+
+import mistune
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def render_existing_posts(apps, schema_editor):
+    BlogPost = apps.get_model('blog_generator', 'BlogPost')
+    markdown = mistune.create_markdown(escape=True, plugins=['strikethrough', 'table'])
+    last_pk = 0
+    while True:
+        batch = list(
+            BlogPost.objects.filter(pk__gt=last_pk).order_by('pk').only('pk', 'generated_content')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for post in batch:
+            post.content_html = markdown(post.generated_content)
+            post.content_hash = hashlib.sha256(post.generated_content.encode('utf-8')).hexdigest()
+        BlogPost.objects.bulk_update(batch, ['content_html', 'content_hash'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_generator', '0006_admission_control'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='content_html',
+            field=models.TextField(blank=True),
+        ),
+        migrations.RunPython(render_existing_posts, migrations.RunPython.noop),
+    ]
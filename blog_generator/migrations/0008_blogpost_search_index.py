@@ -0,0 +1,46 @@
+# Generated by Django 5.1 on 2026-10-18 13:20
+
+from django.db import migrations
+
+# Raw SQL because the index differs per database; see blog_generator/search.py.
+POSTGRES_FORWARD = [
+    "ALTER TABLE blog_generator_blogpost ADD COLUMN search_vector tsvector",
+    "UPDATE blog_generator_blogpost SET search_vector = "
+    "setweight(to_tsvector('english', youtube_title), 'A') || "
+    "setweight(to_tsvector('english', generated_content), 'B')",
+    "CREATE INDEX blogpost_search_vector_idx ON blog_generator_blogpost USING GIN (search_vector)",
+]
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS blogpost_search_vector_idx",
+    "ALTER TABLE blog_generator_blogpost DROP COLUMN IF EXISTS search_vector",
+]
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE blog_generator_blogpost_fts USING fts5("
+    "owner, title, content, tokenize = 'porter unicode61 remove_diacritics 2')",
+    "INSERT INTO blog_generator_blogpost_fts (rowid, owner, title, content) "
+    "SELECT id, 'u' || user_id, youtube_title, generated_content FROM blog_generator_blogpost",
+]
+SQLITE_REVERSE = [
+    "DROP TABLE IF EXISTS blog_generator_blogpost_fts",
+]
+
+
+def run(statements_by_vendor):
+    def operation(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_generator', '0007_blogpost_rendered_html'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            run({'postgresql': POSTGRES_REVERSE, 'sqlite': SQLITE_REVERSE}),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1 on 2026-10-18 13:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_generator', '0008_blogpost_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='transcript_signature',
+            field=models.BinaryField(null=True),
+        ),
+        migrations.CreateModel(
+            name='TranscriptBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transcript_bands', to='blog_generator.blogpost')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['band', 'bucket'], name='transcriptband_bucket_idx')],
+            },
+        ),
+    ]
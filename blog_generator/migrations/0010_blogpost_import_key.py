@@ -0,0 +1,24 @@
+# Generated by Django 5.1 on 2026-10-18 13:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_generator', '0009_blogpost_transcript_signature'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='import_key',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='blogpost',
+            constraint=models.UniqueConstraint(fields=('user', 'import_key'), name='blogpost_user_import_key_uniq'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1 on 2026-10-18 13:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_generator', '0010_blogpost_import_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generationjob',
+            name='media_path',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='generationjob',
+            name='transcript',
+            field=models.TextField(blank=True),
+        ),
+    ]
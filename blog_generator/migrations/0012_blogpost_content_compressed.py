@@ -0,0 +1,77 @@
+from django.db import migrations, models, transaction
+
+from blog_generator import compression
+
+BATCH_SIZE = 500
+
+
+def compress_content(apps, schema_editor):
+    """
+    Moves article bodies into content_compressed BATCH_SIZE rows at a time, each
+    batch in its own short transaction, so only the rows being converted are
+    locked and an interrupted run resumes where it stopped.
+    """
+    BlogPost = apps.get_model('blog_generator', 'BlogPost')
+    db_alias = schema_editor.connection.alias
+    pending = BlogPost.objects.using(db_alias).filter(content_compressed__isnull=True).order_by('pk')
+    last_pk = 0
+    while True:
+        posts = list(pending.filter(pk__gt=last_pk).only('pk', 'content_legacy')[:BATCH_SIZE])
+        if not posts:
+            break
+        for post in posts:
+            post.content_compressed = compression.compress(post.content_legacy)
+            post.content_legacy = ''
+        with transaction.atomic(using=db_alias):
+            BlogPost.objects.using(db_alias).bulk_update(posts, ['content_compressed', 'content_legacy'])
+        last_pk = posts[-1].pk
+
+def decompress_content(apps, schema_editor):
+    BlogPost = apps.get_model('blog_generator', 'BlogPost')
+    db_alias = schema_editor.connection.alias
+    pending = BlogPost.objects.using(db_alias).filter(content_compressed__isnull=False).order_by('pk')
+    last_pk = 0
+    while True:
+        posts = list(pending.filter(pk__gt=last_pk).only('pk', 'content_compressed')[:BATCH_SIZE])
+        if not posts:
+            break
+        for post in posts:
+            post.content_legacy = compression.decompress(post.content_compressed)
+            post.content_compressed = None
+        with transaction.atomic(using=db_alias):
+            BlogPost.objects.using(db_alias).bulk_update(posts, ['content_compressed', 'content_legacy'])
+        last_pk = posts[-1].pk
+
+
+class Migration(migrations.Migration):
+    # Each batch commits on its own instead of the whole table converting in one
+    # long transaction.
+    atomic = False
+
+    dependencies = [
+        ('blog_generator', '0011_generationjob_media_path'),
+    ]
+
+    operations = [
+        # The existing generated_content column stays where it is as content_legacy.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RenameField(
+                    model_name='blogpost',
+                    old_name='generated_content',
+                    new_name='content_legacy',
+                ),
+                migrations.AlterField(
+                    model_name='blogpost',
+                    name='content_legacy',
+                    field=models.TextField(blank=True, db_column='generated_content', default='', editable=False),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='content_compressed',
+            field=models.BinaryField(editable=False, null=True),
+        ),
+        migrations.RunPython(compress_content, decompress_content),
+    ]
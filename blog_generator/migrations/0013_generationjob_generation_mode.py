@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-18 13:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_generator', '0012_blogpost_content_compressed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generationjob',
+            name='generation_mode',
+            field=models.CharField(default='single', max_length=20),
+        ),
+    ]
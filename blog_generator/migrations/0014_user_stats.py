@@ -0,0 +1,92 @@
+# Generated by Django 5.1 on 2026-10-18 14:16
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+from blog_generator import compression
+
+BATCH_SIZE = 2000
+
+
+def backfill_stats(apps, schema_editor):
+    """
+    Fills the new tables from the existing posts, reading BATCH_SIZE posts at a time.
+    Matches stats.tally(); afterwards `manage.py reconcile_stats` does the same job.
+    """
+    BlogPost = apps.get_model('blog_generator', 'BlogPost')
+    UserStats = apps.get_model('blog_generator', 'UserStats')
+    DailyActivity = apps.get_model('blog_generator', 'DailyActivity')
+    db_alias = schema_editor.connection.alias
+    posts = BlogPost.objects.using(db_alias).order_by('pk')
+    totals = defaultdict(lambda: [0, 0, None])
+    days = defaultdict(lambda: [0, 0])
+    last_pk = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_pk).only(
+            'pk', 'user_id', 'created_at', 'content_compressed', 'content_legacy',
+        )[:BATCH_SIZE])
+        if not batch:
+            break
+        for post in batch:
+            if post.content_compressed is not None:
+                content = compression.decompress(post.content_compressed)
+            else:
+                content = post.content_legacy
+            words = len(content.split())
+            total = totals[post.user_id]
+            total[0] += 1
+            total[1] += words
+            if total[2] is None or post.created_at > total[2]:
+                total[2] = post.created_at
+            day = days[post.user_id, timezone.localdate(post.created_at)]
+            day[0] += 1
+            day[1] += words
+        last_pk = batch[-1].pk
+    UserStats.objects.using(db_alias).bulk_create([
+        UserStats(user_id=user_id, post_count=count, word_count=words, last_post_at=last_post_at)
+        for user_id, (count, words, last_post_at) in totals.items()
+    ], batch_size=BATCH_SIZE)
+    DailyActivity.objects.using(db_alias).bulk_create([
+        DailyActivity(user_id=user_id, day=day, post_count=count, word_count=words)
+        for (user_id, day), (count, words) in days.items()
+    ], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('blog_generator', '0013_generationjob_generation_mode'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('post_count', models.IntegerField(default=0)),
+                ('word_count', models.BigIntegerField(default=0)),
+                ('last_post_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('post_count', models.IntegerField(default=0)),
+                ('word_count', models.BigIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'day'), name='dailyactivity_user_day_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
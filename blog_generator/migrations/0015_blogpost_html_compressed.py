@@ -0,0 +1,74 @@
+from django.db import migrations, models, transaction
+
+from blog_generator import compression
+
+BATCH_SIZE = 500
+
+
+def compress_html(apps, schema_editor):
+    """
+    Moves the rendered HTML into html_compressed BATCH_SIZE rows at a time, each
+    batch in its own short transaction, like 0012 did for the bodies.
+    """
+    BlogPost = apps.get_model('blog_generator', 'BlogPost')
+    db_alias = schema_editor.connection.alias
+    pending = BlogPost.objects.using(db_alias).filter(html_compressed__isnull=True).order_by('pk')
+    last_pk = 0
+    while True:
+        posts = list(pending.filter(pk__gt=last_pk).only('pk', 'html_legacy')[:BATCH_SIZE])
+        if not posts:
+            break
+        for post in posts:
+            post.html_compressed = compression.compress(post.html_legacy)
+            post.html_legacy = ''
+        with transaction.atomic(using=db_alias):
+            BlogPost.objects.using(db_alias).bulk_update(posts, ['html_compressed', 'html_legacy'])
+        last_pk = posts[-1].pk
+
+def decompress_html(apps, schema_editor):
+    BlogPost = apps.get_model('blog_generator', 'BlogPost')
+    db_alias = schema_editor.connection.alias
+    pending = BlogPost.objects.using(db_alias).filter(html_compressed__isnull=False).order_by('pk')
+    last_pk = 0
+    while True:
+        posts = list(pending.filter(pk__gt=last_pk).only('pk', 'html_compressed')[:BATCH_SIZE])
+        if not posts:
+            break
+        for post in posts:
+            post.html_legacy = compression.decompress(post.html_compressed)
+            post.html_compressed = None
+        with transaction.atomic(using=db_alias):
+            BlogPost.objects.using(db_alias).bulk_update(posts, ['html_compressed', 'html_legacy'])
+        last_pk = posts[-1].pk
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('blog_generator', '0014_user_stats'),
+    ]
+
+    operations = [
+        # The existing content_html column stays where it is as html_legacy.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RenameField(
+                    model_name='blogpost',
+                    old_name='content_html',
+                    new_name='html_legacy',
+                ),
+                migrations.AlterField(
+                    model_name='blogpost',
+                    name='html_legacy',
+                    field=models.TextField(blank=True, db_column='content_html', default='', editable=False),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='html_compressed',
+            field=models.BinaryField(editable=False, null=True),
+        ),
+        migrations.RunPython(compress_html, decompress_html),
+    ]
@@ -1,12 +1,256 @@
+import hashlib
+
+import mistune
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
+from django.utils.text import Truncator
+
+from . import compression
+
+# Length of the precomputed excerpt shown on the blog list.
+EXCERPT_LENGTH = 80
+
+# Raw HTML from the model is escaped; only markdown is turned into markup.
+markdown = mistune.create_markdown(escape=True, plugins=['strikethrough', 'table'])
+
+def make_excerpt(content):
+    return Truncator(' '.join(content.split())).chars(EXCERPT_LENGTH)
+
+def hash_content(content):
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
 # Create your models here.
 class BlogPost(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     youtube_title = models.CharField(max_length=300)
     youtube_link = models.URLField()
-    generated_content = models.TextField()
+    # The article markdown, compressed (see compression.py). Read and write it
+    # through the generated_content property.
+    content_compressed = models.BinaryField(null=True, editable=False)
+    # Uncompressed body of rows that predate compression; migration 0012 moves it
+    # into content_compressed.
+    content_legacy = models.TextField(db_column='generated_content', blank=True, default='', editable=False)
+    # Stored so the blog list never has to read the article bodies.
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH, blank=True)
+    # Markdown rendered once at save time, compressed like the body. Read it through
+    # the content_html property; content_hash identifies the rendered version.
+    html_compressed = models.BinaryField(null=True, editable=False)
+    # Uncompressed HTML of rows that predate its compression; migration 0015 moves
+    # it into html_compressed.
+    html_legacy = models.TextField(db_column='content_html', blank=True, default='', editable=False)
+    content_hash = models.CharField(max_length=64, blank=True)
+    # MinHash of the source transcript (see similarity.py); null for posts saved without one.
+    transcript_signature = models.BinaryField(null=True, editable=False)
+    # Identifies the record a batch import created this post from, so reruns skip it.
+    import_key = models.CharField(max_length=64, null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Serves the per-user, newest-first keyset pagination of the blog list.
+            models.Index(fields=['user', '-created_at', '-id'], name='blogpost_user_created_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'import_key'], name='blogpost_user_import_key_uniq'),
+        ]
+
+    def __str__(self):
+        return self.youtube_title
+
+    @property
+    def generated_content(self):
+        """
+        The article markdown, decompressed on first access.
+        """
+        if '_generated_content' not in self.__dict__:
+            if self.content_compressed is not None:
+                self._generated_content = compression.decompress(self.content_compressed)
+            else:
+                self._generated_content = self.content_legacy
+        return self._generated_content
+
+    @generated_content.setter
+    def generated_content(self, value):
+        self._generated_content = value
+        self.content_compressed = compression.compress(value)
+        self.content_legacy = ''
+
+    @property
+    def content_html(self):
+        """
+        The rendered article, decompressed on first access.
+        """
+        if '_content_html' not in self.__dict__:
+            if self.html_compressed is not None:
+                self._content_html = compression.decompress(self.html_compressed)
+            else:
+                self._content_html = self.html_legacy
+        return self._content_html
+
+    @content_html.setter
+    def content_html(self, value):
+        self._content_html = value
+        self.html_compressed = compression.compress(value)
+        self.html_legacy = ''
+
+    def refresh_from_db(self, *args, **kwargs):
+        self.__dict__.pop('_generated_content', None)
+        self.__dict__.pop('_content_html', None)
+        super().refresh_from_db(*args, **kwargs)
+
+    def save(self, *args, **kwargs):
+        self.refresh_derived_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'generated_content' in update_fields:
+            kwargs['update_fields'] = (set(update_fields) - {'generated_content'}) | {
+                'content_compressed', 'content_legacy', 'excerpt', 'html_compressed', 'html_legacy', 'content_hash',
+            }
+        super().save(*args, **kwargs)
+
+    def refresh_derived_fields(self):
+        """
+        Recomputes the excerpt and rendered HTML. Rendering is skipped when the
+        content has not changed since it was last rendered.
+        """
+        content_hash = hash_content(self.generated_content)
+        if content_hash != self.content_hash or (self.html_compressed is None and not self.html_legacy):
+            self.excerpt = make_excerpt(self.generated_content)
+            self.content_html = markdown(self.generated_content)
+            self.content_hash = content_hash
+
+class GenerationJob(models.Model):
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    youtube_title = models.CharField(max_length=300, blank=True)
+    youtube_link = models.URLField()
+    # Media jobs start with an empty transcript and fill it in once transcribed,
+    # so a retry doesn't transcribe the file again.
+    transcript = models.TextField(blank=True)
+    media_path = models.CharField(max_length=255, blank=True)
+    # One of generation.GENERATION_MODES.
+    generation_mode = models.CharField(max_length=20, default='single')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    progress = models.CharField(max_length=100, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    blog_post = models.ForeignKey(BlogPost, null=True, blank=True, on_delete=models.SET_NULL)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx'),
+        ]
+
+    def __str__(self):
+        return f"Job {self.pk} ({self.status})"
+
+
+class GenerationCacheEntry(models.Model):
+    key = models.CharField(max_length=64, unique=True)
+    model_name = models.CharField(max_length=100)
+    prompt_version = models.CharField(max_length=20)
+    title = models.CharField(max_length=300)
+    content = models.TextField()
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.title
+
+
+class RateLimitBucket(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True)
+    tokens = models.FloatField()
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.user} ({self.tokens:.2f} tokens)"
+
+
+class GenerationSlot(models.Model):
+    STATE_WAITING = 'waiting'
+    STATE_ACTIVE = 'active'
+    STATE_CHOICES = [
+        (STATE_WAITING, 'Waiting'),
+        (STATE_ACTIVE, 'Active'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    state = models.CharField(max_length=10, choices=STATE_CHOICES)
+    # Leases expire so a crashed worker cannot hold a slot forever.
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['state', 'created_at'], name='slot_state_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Slot {self.pk} ({self.state})"
+
+
+class TranscriptBand(models.Model):
+    """
+    One LSH band of a post's transcript signature. Posts sharing a (band, bucket)
+    pair are near-duplicate candidates.
+    """
+    post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='transcript_bands')
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['band', 'bucket'], name='transcriptband_bucket_idx'),
+        ]
+
+
+class UserStats(models.Model):
+    """
+    Running totals of a user's posts, maintained by stats.py. A missing row means
+    the user has no posts.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True)
+    post_count = models.IntegerField(default=0)
+    word_count = models.BigIntegerField(default=0)
+    last_post_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user} ({self.post_count} posts)"
+
+
+class DailyActivity(models.Model):
+    """
+    Posts and words a user generated on one day (in TIME_ZONE).
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    day = models.DateField()
+    post_count = models.IntegerField(default=0)
+    word_count = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Also serves the recent-days range read of stats.summary().
+            models.UniqueConstraint(fields=['user', 'day'], name='dailyactivity_user_day_uniq'),
+        ]
+
     def __str__(self):
-        return self.youtube_title
\ No newline at end of file
+        return f"{self.user} on {self.day}"
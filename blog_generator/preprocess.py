@@ -0,0 +1,191 @@
+import re
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+
+from django.conf import settings
+
+from . import chunking, metrics
+
+# Transcript clean-up ahead of the model call. Pasted YouTube transcripts carry
+# timestamps, caption numbering, sound markers, filler words and rolling captions
+# that repeat the previous line; all of that costs input tokens without adding
+# content. Each stage is a generator over lines, so the pipeline works on any
+# iterable of lines without holding intermediate copies.
+
+# Bump when the cleaning rules change: cached articles depend on the cleaned text.
+PREPROCESS_VERSION = '3'
+
+# Timestamps are only stripped where captions put them: SRT/WebVTT cue timings
+# (with any WebVTT cue settings), a bracketed stamp that does not follow a word,
+# so slices like list[0:10] survive, and a stamp opening a line. Times and verse
+# references inside a sentence ("at 10:30", "John 3:16") are content.
+TIMESTAMP = r'\d{1,2}:\d{2}(?::\d{2})?(?:[.,]\d+)?'
+CUE_TIMING_PATTERN = re.compile(rf'^\s*{TIMESTAMP}\s*-->\s*{TIMESTAMP}(?:\s+[\w-]+:\S+)*')
+TIMESTAMP_PATTERN = re.compile(rf'(?<!\w)\[{TIMESTAMP}\]|(?<!\w)\({TIMESTAMP}\)|^\s*{TIMESTAMP}(?![\w:])')
+# Only the sound cues captioners use, e.g. [Music], (applause), [inaudible] or
+# [Music playing]; other bracketed text such as arr[i] or [config.yaml] is content.
+CAPTION_CUES = (
+    'music', 'applause', 'laughter', 'laughs', 'laughing', 'inaudible', 'silence', 'crosstalk',
+    'foreign', 'cheering', 'cheers', 'no audio', 'background noise', 'sighs', 'coughs',
+)
+MARKER_PATTERN = re.compile(
+    rf'[\[(]\s*(?:{"|".join(CAPTION_CUES)})(?:\s+[a-z]+){{0,3}}\s*[\])]|[♪♫]|>>',
+    re.IGNORECASE,
+)
+# Hesitation sounds only; "mm" and "ah" are too often units or real words.
+FILLER_PATTERN = re.compile(r'\b(?:um+|uh+|erm+|uhm+|hmm+)\b[,.]?\s*', re.IGNORECASE)
+# "I I I think" -> "I think". Words that legitimately double are left alone.
+STUTTER_PATTERN = re.compile(r'\b(\w+)(?:\s+\1\b)+', re.IGNORECASE)
+LEGITIMATE_REPEATS = {'that', 'had', 'is', 'very', 'really', 'no', 'bye', 'ha'}
+# Rolling captions repeat at most this many words of the previous line.
+MAX_CAPTION_OVERLAP = 30
+
+STOPWORDS = set(
+    "a an and are as at be but by can do for from have he her his i if in is it its just "
+    "like me my not of on or our so that the their them then there they this to up was we "
+    "were what when which who will with would you your going know really right yeah okay".split()
+)
+# Pieces of unpunctuated captions are scored as if they were sentences of this size.
+COMPRESSION_UNIT_TOKENS = 40
+
+transcript_tokens = metrics.histogram(
+    'transcript_tokens', 'Estimated transcript tokens before and after preprocessing.',
+    ('stage',), (250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000),
+)
+
+
+@dataclass(frozen=True)
+class PreparedTranscript:
+    text: str
+    tokens_before: int
+    tokens_after: int
+
+    def as_dict(self):
+        return {'before': self.tokens_before, 'after': self.tokens_after}
+
+
+# --- Line Stages ---
+
+def strip_timestamps(lines):
+    for line in lines:
+        line = TIMESTAMP_PATTERN.sub(' ', CUE_TIMING_PATTERN.sub(' ', line))
+        # SRT cue numbers and the WebVTT header carry no content.
+        if line.strip().isdigit() or line.strip() == 'WEBVTT':
+            continue
+        yield line
+
+def strip_markers(lines):
+    for line in lines:
+        yield MARKER_PATTERN.sub(' ', line)
+
+def strip_fillers(lines):
+    def collapse(match):
+        word = match.group(1)
+        return match.group(0) if word.lower() in LEGITIMATE_REPEATS else word
+
+    for line in lines:
+        yield STUTTER_PATTERN.sub(collapse, FILLER_PATTERN.sub('', line))
+
+def normalize_whitespace(lines):
+    for line in lines:
+        line = ' '.join(line.split())
+        if line:
+            yield line
+
+def collapse_repeats(lines):
+    """
+    Drops lines that repeat the previous one and, for rolling captions, the words
+    a line repeats from the end of the previous one.
+    """
+    previous = []
+    for line in lines:
+        words = line.split(' ')
+        folded = [w.lower() for w in words]
+        overlap = 0
+        for size in range(min(len(previous), len(folded), MAX_CAPTION_OVERLAP), 0, -1):
+            if previous[-size:] == folded[:size] and (size > 1 or len(folded) == 1):
+                overlap = size
+                break
+        previous = (previous + folded[overlap:])[-MAX_CAPTION_OVERLAP:]
+        if overlap < len(words):
+            yield ' '.join(words[overlap:])
+
+def clean_lines(lines):
+    """
+    The full cleaning pipeline over an iterable of transcript lines.
+    """
+    return collapse_repeats(normalize_whitespace(strip_fillers(strip_markers(strip_timestamps(lines)))))
+
+def clean(transcript):
+    return ' '.join(clean_lines(transcript.splitlines()))
+
+
+# --- Extractive Compression ---
+
+def compress(text, budget_tokens):
+    """
+    Keeps the most informative sentences, in their original order, until the text
+    fits `budget_tokens`. Sentences are scored by how frequent their content words
+    are across the whole transcript; exact repeats are dropped first.
+    """
+    if chunking.estimate_tokens(text) <= budget_tokens:
+        return text
+
+    units = [
+        piece
+        for sentence in chunking.split_sentences(text)
+        for piece in chunking.split_oversized(sentence, COMPRESSION_UNIT_TOKENS)
+    ]
+    unit_words = [[w for w in re.findall(r'\w+', unit.lower()) if w not in STOPWORDS and len(w) > 2] for unit in units]
+    frequencies = Counter(word for words in unit_words for word in words)
+
+    seen, scored = set(), []
+    for index, (unit, words) in enumerate(zip(units, unit_words)):
+        fingerprint = ' '.join(words)
+        if fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+        score = sum(frequencies[w] for w in set(words)) / (len(words) or 1) ** 0.5
+        scored.append((score, index))
+
+    kept, used = set(), 0
+    for score, index in sorted(scored, reverse=True):
+        tokens = chunking.estimate_tokens(units[index])
+        if used + tokens > budget_tokens:
+            continue
+        kept.add(index)
+        used += tokens
+    return ' '.join(units[index] for index in sorted(kept))
+
+
+# --- Entry Point ---
+
+def config_tag():
+    """
+    Identifies the preprocessing settings, for cache keys.
+    """
+    if not settings.BLOG_PREPROCESS_ENABLED:
+        return 'raw'
+    return f"p{PREPROCESS_VERSION}b{settings.BLOG_TRANSCRIPT_TOKEN_BUDGET}"
+
+@lru_cache(maxsize=32)
+def _prepare(transcript, enabled, budget):
+    text = transcript
+    if enabled:
+        text = clean(transcript)
+        if budget:
+            text = compress(text, budget)
+    return PreparedTranscript(text, chunking.estimate_tokens(transcript), chunking.estimate_tokens(text))
+
+def prepare(transcript):
+    """
+    Returns the transcript as it will be sent to the model, with estimated token
+    counts before and after. Cached, since the views report the counts for the
+    same transcript the generation pipeline prepares.
+    """
+    return _prepare(transcript, settings.BLOG_PREPROCESS_ENABLED, settings.BLOG_TRANSCRIPT_TOKEN_BUDGET)
+
+def record(prepared):
+    transcript_tokens.observe(prepared.tokens_before, stage='raw')
+    transcript_tokens.observe(prepared.tokens_after, stage='prepared')
@@ -0,0 +1,78 @@
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from . import metrics
+
+# Read/write splitting between the primary database and an optional read replica
+# (REPLICA_DATABASE_URL). Reads only go to the replica inside a request that
+# ReplicaRoutingMiddleware marked as safe: a GET/HEAD from a client that hasn't
+# written recently, with no write earlier in the same request and no open
+# transaction. Everything else, including the generation worker and management
+# commands, uses the primary.
+
+REPLICA_DB_ALIAS = 'replica'
+# Set on clients that recently wrote, so their reads stay on the primary.
+PIN_COOKIE = 'db_primary_pin'
+
+routed_reads = metrics.counter('db_routed_reads_total', 'ORM reads by database alias.', ('alias',))
+
+
+class RoutingState:
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+# Holds a mutable RoutingState so writes made in sync_to_async threads are seen by
+# the middleware that created it.
+routing_state = contextvars.ContextVar('db_routing_state', default=None)
+
+def replica_configured():
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+@contextmanager
+def use_primary():
+    """
+    Sends the reads in the block (or decorated view) to the primary, for data that
+    must not lag, such as job progress.
+    """
+    state = routing_state.get()
+    if state is None:
+        yield
+        return
+    previous, state.use_replica = state.use_replica, False
+    try:
+        yield
+    finally:
+        state.use_replica = previous
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = routing_state.get()
+        alias = DEFAULT_DB_ALIAS
+        if (
+            state is not None and state.use_replica and not state.wrote
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            alias = REPLICA_DB_ALIAS
+        routed_reads.inc(alias=alias)
+        return alias
+
+    def db_for_write(self, model, **hints):
+        state = routing_state.get()
+        if state is not None:
+            # Read what was just written from the primary for the rest of the request.
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives schema changes through replication.
+        return db == DEFAULT_DB_ALIAS
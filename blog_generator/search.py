@@ -0,0 +1,156 @@
+import re
+
+from django.db import connection, connections, router
+
+from .models import BlogPost
+
+# Full-text index over article titles and bodies.
+# PostgreSQL: a weighted tsvector column on the blog post table with a GIN index.
+# SQLite: an FTS5 table keyed by post id. Its `owner` column holds a per-user token
+# so a search only walks the posting lists of the requesting user's articles.
+# Both are created by migration 0008 and kept up to date by index_post/remove_post,
+# which run on post_save/post_delete. Queryset .update() calls bypass the signals
+# and must reindex explicitly.
+
+POST_TABLE = 'blog_generator_blogpost'
+FTS_TABLE = 'blog_generator_blogpost_fts'
+SEARCH_CONFIG = 'english'
+MAX_QUERY_TERMS = 16
+# Relative weight of a title match over a body match in SQLite's bm25().
+TITLE_WEIGHT = 4.0
+
+
+def is_indexed():
+    return connection.vendor in ('postgresql', 'sqlite')
+
+def scan_posts(user, terms, limit, offset=0):
+    """
+    Unindexed search: walks the user's posts newest first, decompressing each body,
+    and returns up to `limit` posts containing every term after skipping `offset`.
+    """
+    posts = (
+        BlogPost.objects.filter(user=user)
+        .only('id', 'youtube_title', 'excerpt', 'created_at', 'content_compressed', 'content_legacy')
+        .order_by('-created_at', '-id')
+    )
+    matches = []
+    for post in posts.iterator(chunk_size=200):
+        text = f"{post.youtube_title}\n{post.generated_content}".lower()
+        if all(term in text for term in terms):
+            if offset:
+                offset -= 1
+                continue
+            post.rank = None
+            matches.append(post)
+            if len(matches) == limit:
+                break
+    return matches
+
+def parse_query(query):
+    """
+    Splits a user query into lowercase word terms. Operators are not supported:
+    every term must match.
+    """
+    return re.findall(r'\w+', query.lower())[:MAX_QUERY_TERMS]
+
+def owner_token(user_id):
+    return f'u{user_id}'
+
+
+# --- Index Maintenance ---
+
+def index_posts(posts):
+    """
+    Adds or refreshes the index entries of the given posts.
+    """
+    posts = list(posts)
+    if not posts or not is_indexed():
+        return
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.executemany(
+                f"UPDATE {POST_TABLE} SET search_vector = "
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', %s), 'A') || "
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', %s), 'B') "
+                f"WHERE id = %s",
+                [(post.youtube_title, post.generated_content, post.pk) for post in posts],
+            )
+        else:
+            cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(post.pk,) for post in posts])
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, owner, title, content) VALUES (%s, %s, %s, %s)",
+                [(post.pk, owner_token(post.user_id), post.youtube_title, post.generated_content) for post in posts],
+            )
+
+def index_post(sender, instance, update_fields=None, **kwargs):
+    """
+    post_save receiver. Saves that touch neither the title nor the body are skipped.
+    """
+    if update_fields is not None and not {'youtube_title', 'content_compressed'} & set(update_fields):
+        return
+    index_posts([instance])
+
+def remove_post(sender, instance, **kwargs):
+    """
+    post_delete receiver. The PostgreSQL column goes away with the row.
+    """
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [instance.pk])
+
+
+# --- Querying ---
+
+def ranked_ids(user, terms, limit, offset):
+    """
+    Returns [(post_id, rank)] of the user's matching posts, best match first.
+    """
+    # Raw SQL bypasses the router, so ask it which database the posts are read from.
+    database = connections[router.db_for_read(BlogPost)]
+    with database.cursor() as cursor:
+        if database.vendor == 'postgresql':
+            cursor.execute(
+                f"SELECT id, ts_rank_cd(search_vector, query) AS rank "
+                f"FROM {POST_TABLE}, plainto_tsquery('{SEARCH_CONFIG}', %s) AS query "
+                f"WHERE user_id = %s AND search_vector @@ query "
+                f"ORDER BY rank DESC, id DESC LIMIT %s OFFSET %s",
+                [' '.join(terms), user.pk, limit, offset],
+            )
+            return cursor.fetchall()
+
+        match = f'owner : "{owner_token(user.pk)}" AND ' + ' AND '.join(f'"{term}"' for term in terms)
+        # bm25() is lower-is-better; negate it so both backends rank descending.
+        cursor.execute(
+            f"SELECT rowid, -bm25({FTS_TABLE}, 0.0, {TITLE_WEIGHT}, 1.0) AS rank "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+            f"ORDER BY rank DESC, rowid DESC LIMIT %s OFFSET %s",
+            [match, limit, offset],
+        )
+        return cursor.fetchall()
+
+def search_posts(user, query, page=1, page_size=20):
+    """
+    Returns (posts, has_next) for one page of the user's posts matching `query`,
+    ranked by relevance. Posts carry a `rank` attribute and are loaded without
+    their article bodies.
+    """
+    terms = parse_query(query)
+    if not terms:
+        return [], False
+    offset = (page - 1) * page_size
+    fields = ('id', 'youtube_title', 'excerpt', 'created_at')
+
+    if not is_indexed():
+        # Other databases can't search the compressed bodies; scan them instead.
+        posts = scan_posts(user, terms, page_size + 1, offset)
+        return posts[:page_size], len(posts) > page_size
+
+    rows = ranked_ids(user, terms, page_size + 1, offset)
+    page_rows = rows[:page_size]
+    posts = BlogPost.objects.filter(user=user, pk__in=[pk for pk, _ in page_rows]).only(*fields).in_bulk()
+    results = []
+    for pk, rank in page_rows:
+        if pk in posts:
+            posts[pk].rank = rank
+            results.append(posts[pk])
+    return results, len(rows) > page_size
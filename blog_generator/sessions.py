@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+
+# Sessions read from the cache and written through to the database, with each
+# cache entry kept for at most BLOG_SESSION_CACHE_SECONDS instead of the session's
+# whole lifetime. The default cache is per process: logging out deletes the session
+# from the database and the logging-out process's cache, and other processes stop
+# honouring it once their entry expires, as with the user cache in auth.py.
+
+
+class CappedCache:
+    """
+    Passes everything through to `cache`, capping the timeout of entries it sets.
+    """
+    def __init__(self, cache, max_timeout):
+        self.cache = cache
+        self.max_timeout = max_timeout
+
+    def __getattr__(self, name):
+        return getattr(self.cache, name)
+
+    def __contains__(self, key):
+        return key in self.cache
+
+    def set(self, key, value, timeout):
+        self.cache.set(key, value, min(timeout, self.max_timeout))
+
+    async def aset(self, key, value, timeout):
+        await self.cache.aset(key, value, min(timeout, self.max_timeout))
+
+
+class SessionStore(cached_db.SessionStore):
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._cache = CappedCache(self._cache, settings.BLOG_SESSION_CACHE_SECONDS)
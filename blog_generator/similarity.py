@@ -0,0 +1,141 @@
+import hashlib
+import logging
+import random
+import re
+import zlib
+from array import array
+from dataclasses import dataclass
+from functools import lru_cache, reduce
+from operator import or_
+
+from django.conf import settings
+from django.db.models import Count, Q
+
+from . import metrics, preprocess
+from .models import BlogPost, TranscriptBand
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Near-duplicate transcript detection with MinHash and LSH banding.
+# Each post stores a NUM_PERM-value MinHash signature of its transcript's word
+# shingles. The signature is cut into BANDS bands of ROWS values and every band
+# is hashed into a TranscriptBand row. Transcripts with Jaccard similarity s share
+# at least one band with probability 1 - (1 - s^ROWS)^BANDS (about 0.7 for
+# s=0.7 and 0.999 for s=0.85), so a lookup only reads the rows of matching
+# buckets via the (band, bucket) index rather than scanning all posts.
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 5
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+_rng = random.Random(1)
+PERMUTATIONS = [(_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+
+lookups = metrics.counter('duplicate_lookups_total', 'Near-duplicate lookups by outcome.', ('result',))
+
+
+@dataclass
+class DuplicateMatch:
+    post: BlogPost
+    similarity: float
+
+
+# --- Signatures ---
+
+def shingles(transcript):
+    """
+    Hashes of the overlapping SHINGLE_WORDS-word windows of a transcript, ignoring
+    case, punctuation and the caption noise preprocess.clean() removes.
+    """
+    words = re.findall(r'\w+', preprocess.clean(transcript).lower())
+    if len(words) < SHINGLE_WORDS:
+        return {zlib.crc32(' '.join(words).encode('utf-8'))} if words else set()
+    return {
+        zlib.crc32(' '.join(words[i:i + SHINGLE_WORDS]).encode('utf-8'))
+        for i in range(len(words) - SHINGLE_WORDS + 1)
+    }
+
+@lru_cache(maxsize=32)
+def signature(transcript):
+    """
+    MinHash signature packed as NUM_PERM unsigned 32-bit ints, or None for an
+    empty transcript. Cached because the views and save_post ask for the same
+    transcript's signature.
+    """
+    hashes = shingles(transcript)
+    if not hashes:
+        return None
+    values = array('I', (
+        min((a * h + b) % MERSENNE_PRIME for h in hashes) & MAX_HASH
+        for a, b in PERMUTATIONS
+    ))
+    return values.tobytes()
+
+def unpack(packed):
+    values = array('I')
+    values.frombytes(bytes(packed))
+    return values
+
+def estimate_similarity(first, second):
+    """
+    Estimated Jaccard similarity: the share of positions where two signatures agree.
+    """
+    first, second = unpack(first), unpack(second)
+    return sum(a == b for a, b in zip(first, second)) / NUM_PERM
+
+def band_buckets(packed):
+    """
+    Yields (band, bucket) for each band of a signature; bucket is a signed 64-bit hash.
+    """
+    band_size = ROWS * 4
+    for band in range(BANDS):
+        digest = hashlib.blake2b(packed[band * band_size:(band + 1) * band_size], digest_size=8).digest()
+        yield band, int.from_bytes(digest, 'big', signed=True)
+
+def band_rows(post, packed):
+    return [TranscriptBand(post=post, band=band, bucket=bucket) for band, bucket in band_buckets(packed)]
+
+
+# --- Lookup ---
+
+def find_duplicate(transcript, user, include_others=False):
+    """
+    Returns the user's most similar post whose transcript reaches
+    BLOG_DUPLICATE_THRESHOLD, or None. With include_others, other users' posts
+    are candidates too, though the user's own are preferred.
+    """
+    packed = signature(transcript)
+    if packed is None:
+        return None
+
+    same_bucket = reduce(or_, (Q(band=band, bucket=bucket) for band, bucket in band_buckets(packed)))
+    bands = TranscriptBand.objects.filter(same_bucket)
+    if not include_others:
+        bands = bands.filter(post__user=user)
+    candidates = (
+        bands
+        .values('post_id')
+        .annotate(shared_bands=Count('id'))
+        .order_by('-shared_bands')[:settings.BLOG_DUPLICATE_MAX_CANDIDATES]
+    )
+    posts = BlogPost.objects.filter(pk__in=[c['post_id'] for c in candidates]).only(
+        'id', 'user_id', 'youtube_title', 'transcript_signature'
+    )
+
+    matches = []
+    for post in posts:
+        similarity = estimate_similarity(packed, post.transcript_signature)
+        if similarity >= settings.BLOG_DUPLICATE_THRESHOLD:
+            matches.append(DuplicateMatch(post, similarity))
+    if not matches:
+        lookups.inc(result='none')
+        return None
+
+    best = max(matches, key=lambda match: (match.post.user_id == user.pk, match.similarity))
+    lookups.inc(result='own' if best.post.user_id == user.pk else 'other')
+    logger.info(f"Transcript matches post {best.post.pk} (similarity {best.similarity:.2f}).")
+    return best
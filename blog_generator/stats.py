@@ -0,0 +1,177 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from . import metrics
+from .models import BlogPost, DailyActivity, UserStats
+
+# Dashboard numbers kept as counters instead of aggregating BlogPost on every page
+# load: UserStats holds each user's post count, words generated and latest post,
+# DailyActivity the same counts per day. record_posts() adds new posts in the
+# transaction that creates them and remove_post() subtracts deleted ones, so
+# summary() reads one row plus at most BLOG_STATS_RECENT_DAYS rows however many
+# posts the user has.
+#
+# Edits to an existing post's body (e.g. in the admin) are not tracked.
+# `manage.py reconcile_stats` rebuilds the counters from the posts.
+
+stats_updates = metrics.counter('user_stats_updates_total', 'Incremental changes to per-user stats.', ('operation',))
+
+
+def count_words(content):
+    return len(content.split())
+
+def activity_day(created_at):
+    return timezone.localdate(created_at)
+
+def tally(rows):
+    """
+    Totals (user_id, created_at, content) rows. Returns ({user_id: [posts, words,
+    last_post_at]}, {(user_id, day): [posts, words]}).
+    """
+    totals = defaultdict(lambda: [0, 0, None])
+    days = defaultdict(lambda: [0, 0])
+    for user_id, created_at, content in rows:
+        words = count_words(content)
+        total = totals[user_id]
+        total[0] += 1
+        total[1] += words
+        if total[2] is None or created_at > total[2]:
+            total[2] = created_at
+        day = days[user_id, activity_day(created_at)]
+        day[0] += 1
+        day[1] += words
+    return totals, days
+
+
+# --- Incremental Updates ---
+
+def record_posts(posts):
+    """
+    Adds newly created posts to their users' stats. Call it inside the transaction
+    that inserts the posts, so the counters commit or roll back with them.
+    """
+    totals, days = tally((post.user_id, post.created_at, post.generated_content) for post in posts)
+    # UserStats before DailyActivity, the order rebuild() locks in.
+    for user_id, (count, words, last_post_at) in totals.items():
+        increment(UserStats, {'user_id': user_id}, count, words, last_post_at)
+    for (user_id, day), (count, words) in days.items():
+        increment(DailyActivity, {'user_id': user_id, 'day': day}, count, words)
+    stats_updates.inc(len(totals), operation='add')
+
+def increment(model, lookup, posts, words, last_post_at=None):
+    changes = {'post_count': F('post_count') + posts, 'word_count': F('word_count') + words}
+    created = {'post_count': posts, 'word_count': words}
+    if model is UserStats:
+        latest = Value(last_post_at)
+        changes.update(last_post_at=Greatest(Coalesce('last_post_at', latest), latest), updated_at=timezone.now())
+        created['last_post_at'] = last_post_at
+    if model.objects.filter(**lookup).update(**changes):
+        return
+    try:
+        # In a savepoint, so losing the race to create the row doesn't break the
+        # caller's transaction.
+        with transaction.atomic():
+            model.objects.create(**lookup, **created)
+    except IntegrityError:
+        model.objects.filter(**lookup).update(**changes)
+
+def remove_post(sender, instance, **kwargs):
+    """
+    post_delete receiver for BlogPost.
+    """
+    words = count_words(instance.generated_content)
+    changes = {'post_count': F('post_count') - 1, 'word_count': F('word_count') - words}
+    UserStats.objects.filter(user_id=instance.user_id).update(**changes, updated_at=timezone.now())
+    DailyActivity.objects.filter(user_id=instance.user_id, day=activity_day(instance.created_at)).update(**changes)
+    # If this was the latest post, fall back to the next latest (an index lookup).
+    UserStats.objects.filter(user_id=instance.user_id, last_post_at__lte=instance.created_at).update(
+        last_post_at=Subquery(
+            BlogPost.objects.filter(user_id=OuterRef('user_id')).order_by('-created_at').values('created_at')[:1]
+        ),
+    )
+    stats_updates.inc(operation='remove')
+
+
+# --- Reads ---
+
+def summary(user, days=None):
+    """
+    The user's totals plus posts and words for each of the last `days` days
+    (BLOG_STATS_RECENT_DAYS by default), oldest first.
+    """
+    days = days or settings.BLOG_STATS_RECENT_DAYS
+    stats = UserStats.objects.filter(user=user).first() or UserStats(user=user)
+    today = timezone.localdate()
+    first_day = today - timedelta(days=days - 1)
+    counts = {
+        row.day: row
+        for row in DailyActivity.objects.filter(user=user, day__gte=first_day).only('day', 'post_count', 'word_count')
+    }
+    activity = []
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        row = counts.get(day)
+        activity.append({'day': day, 'posts': row.post_count if row else 0, 'words': row.word_count if row else 0})
+    return {
+        'post_count': stats.post_count,
+        'word_count': stats.word_count,
+        'last_post_at': stats.last_post_at,
+        'recent_activity': activity,
+        'recent_posts': sum(entry['posts'] for entry in activity),
+        'recent_peak': max(entry['posts'] for entry in activity),
+    }
+
+
+# --- Reconciliation ---
+
+def rebuild(user_ids, chunk_size=2000, write=True):
+    """
+    Recomputes the given users' stats from their posts and returns the ids of
+    users whose stored stats were wrong (fixed unless write=False). Holds their
+    UserStats rows for the duration, so concurrent record_posts() calls wait and
+    then apply on top of the rebuilt numbers.
+    """
+    with transaction.atomic():
+        stored = {row.user_id: row for row in UserStats.objects.select_for_update().filter(user_id__in=user_ids)}
+        posts = (
+            BlogPost.objects.filter(user_id__in=user_ids)
+            .only('user_id', 'created_at', 'content_compressed', 'content_legacy')
+            .order_by()
+            .iterator(chunk_size=chunk_size)
+        )
+        totals, days = tally((post.user_id, post.created_at, post.generated_content) for post in posts)
+        stored_days = {
+            (row.user_id, row.day): [row.post_count, row.word_count]
+            for row in DailyActivity.objects.filter(user_id__in=user_ids)
+        }
+
+        drifted = set()
+        for user_id in user_ids:
+            expected = totals.get(user_id, [0, 0, None])
+            row = stored.get(user_id)
+            actual = [row.post_count, row.word_count, row.last_post_at] if row else [0, 0, None]
+            if actual != expected:
+                drifted.add(user_id)
+        for key in stored_days.keys() | days.keys():
+            if stored_days.get(key, [0, 0]) != days.get(key, [0, 0]):
+                drifted.add(key[0])
+
+        if write and drifted:
+            for user_id in drifted:
+                count, words, last_post_at = totals.get(user_id, [0, 0, None])
+                UserStats.objects.update_or_create(
+                    user_id=user_id,
+                    defaults={'post_count': count, 'word_count': words, 'last_post_at': last_post_at},
+                )
+            DailyActivity.objects.filter(user_id__in=drifted).delete()
+            DailyActivity.objects.bulk_create([
+                DailyActivity(user_id=user_id, day=day, post_count=count, word_count=words)
+                for (user_id, day), (count, words) in days.items() if user_id in drifted
+            ])
+    return drifted
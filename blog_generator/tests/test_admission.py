@@ -0,0 +1,87 @@
+import json
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from blog_generator import admission
+from blog_generator.models import GenerationSlot, RateLimitBucket
+
+from .utils import TEST_SETTINGS, TRANSCRIPT, StubModelMixin
+
+
+@override_settings(**{**TEST_SETTINGS, 'BLOG_ADMISSION_ENABLED': True}, BLOG_RATE_LIMIT_BURST=2, BLOG_RATE_LIMIT_PER_MINUTE=1)
+class AdmissionTests(StubModelMixin, TestCase):
+    def test_empty_bucket_is_rejected(self):
+        admission.take_token(self.user)
+        admission.take_token(self.user)
+        with self.assertRaises(admission.AdmissionRejected) as rejected:
+            admission.take_token(self.user)
+        self.assertEqual(rejected.exception.reason, 'rate_limited')
+        self.assertGreaterEqual(rejected.exception.retry_after, 1)
+
+    def test_view_answers_429_with_retry_after(self):
+        self.client.force_login(self.user)
+        body = json.dumps({'transcript': TRANSCRIPT, 'on_duplicate': 'ignore'})
+        for _ in range(2):
+            response = self.client.post(reverse('generate-blog'), body, content_type='application/json')
+            self.assertEqual(response.status_code, 202)
+
+        response = self.client.post(reverse('generate-blog'), body, content_type='application/json')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    def test_bucket_refills_over_time(self):
+        admission.take_token(self.user)
+        admission.take_token(self.user)
+        # One token a minute: two minutes later there are two again.
+        RateLimitBucket.objects.filter(user=self.user).update(updated_at=timezone.now() - timedelta(minutes=2))
+        admission.take_token(self.user)
+        admission.take_token(self.user)
+        with self.assertRaises(admission.AdmissionRejected):
+            admission.take_token(self.user)
+
+
+@override_settings(**{**TEST_SETTINGS, 'BLOG_ADMISSION_ENABLED': True}, BLOG_MAX_IN_FLIGHT=2, BLOG_ADMISSION_QUEUE_SIZE=1)
+class InFlightLimitTests(StubModelMixin, TestCase):
+    def test_slots_queue_in_order(self):
+        first, second = admission.acquire(self.user), admission.acquire(self.user)
+        waiting = admission.try_acquire(self.user)
+        self.assertEqual(waiting.state, GenerationSlot.STATE_WAITING)
+        with self.assertRaises(admission.AdmissionRejected) as rejected:
+            admission.try_acquire(self.user)
+        self.assertEqual(rejected.exception.reason, 'queue_full')
+
+        admission.release(first)
+        self.assertEqual(admission.try_acquire(self.user, waiting).state, GenerationSlot.STATE_ACTIVE)
+        self.assertEqual(admission.get_stats()['in_flight'], 2)
+        admission.release(second)
+        admission.release(waiting)
+        self.assertEqual(admission.get_stats()['in_flight'], 0)
+
+    @override_settings(BLOG_ADMISSION_MAX_WAIT=0)
+    def test_waiting_too_long_is_rejected(self):
+        admission.acquire(self.user)
+        admission.acquire(self.user)
+        with self.assertRaises(admission.AdmissionRejected) as rejected:
+            admission.acquire(self.user)
+        self.assertEqual(rejected.exception.reason, 'timeout')
+        self.assertFalse(GenerationSlot.objects.filter(state=GenerationSlot.STATE_WAITING).exists())
+
+    def test_expired_slots_are_reclaimed(self):
+        stale = admission.acquire(self.user)
+        admission.acquire(self.user)
+        GenerationSlot.objects.filter(pk=stale.pk).update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(admission.try_acquire(self.user).state, GenerationSlot.STATE_ACTIVE)
+
+    def test_context_manager_releases_the_slot(self):
+        with self.assertRaises(RuntimeError):
+            with admission.generation_slot(self.user, rate_limit=False):
+                self.assertEqual(GenerationSlot.objects.count(), 1)
+                raise RuntimeError
+        self.assertFalse(GenerationSlot.objects.exists())
+
+    @override_settings(BLOG_ADMISSION_ENABLED=False)
+    def test_disabled(self):
+        self.assertIsNone(admission.admit(self.user))
@@ -0,0 +1,41 @@
+import json
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from blog_generator.models import BlogPost
+
+from .utils import TEST_SETTINGS, TRANSCRIPT, StubModelMixin
+
+
+@override_settings(**TEST_SETTINGS)
+class GenerateBlogAsyncTests(StubModelMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.async_client.force_login(self.user)
+
+    async def post(self, **fields):
+        body = json.dumps({'transcript': TRANSCRIPT, 'on_duplicate': 'ignore', **fields})
+        return await self.async_client.post(reverse('generate-blog-async'), body, content_type='application/json')
+
+    async def test_generates_and_saves_the_article(self):
+        response = await self.post(title='Scheduling')
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(payload['title'], 'Scheduling')
+        self.assertTrue(payload['content'])
+
+        blog_post = await BlogPost.objects.aget(user=self.user)
+        self.assertEqual(blog_post.generated_content, payload['content'])
+
+    async def test_rejects_bad_requests(self):
+        response = await self.async_client.get(reverse('generate-blog-async'))
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual((await self.post(transcript='')).status_code, 400)
+        self.assertEqual((await self.post(mode='nonsense')).status_code, 400)
+        self.assertFalse(await BlogPost.objects.aexists())
+
+    async def test_requires_login(self):
+        await self.async_client.alogout()
+        response = await self.post()
+        self.assertEqual(response.status_code, 302)
@@ -0,0 +1,63 @@
+import io
+import json
+import tempfile
+
+from django.core.management import CommandError, call_command
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from blog_generator import batch
+from blog_generator.models import BlogPost
+
+from .utils import TEST_SETTINGS, TRANSCRIPT, StubModelMixin
+
+
+# Batches generate in pool threads, which need to see (and write to) the database
+# outside the test's transaction.
+@override_settings(**TEST_SETTINGS)
+class BatchImportTests(StubModelMixin, TransactionTestCase):
+    def lines(self, count):
+        return [json.dumps({'title': f'Talk {i}', 'transcript': f'{TRANSCRIPT} Part {i}.'}) for i in range(count)]
+
+    def test_rerun_skips_imported_records(self):
+        first = list(batch.run_batch(self.user, self.lines(3), concurrency=2, chunk_size=2))
+        self.assertEqual(first[-1], {'status': 'summary', 'created': 3, 'skipped': 0, 'failed': 0})
+
+        second = list(batch.run_batch(self.user, self.lines(5), concurrency=2, chunk_size=2))
+        self.assertEqual(second[-1], {'status': 'summary', 'created': 2, 'skipped': 3, 'failed': 0})
+        self.assertEqual(BlogPost.objects.filter(user=self.user).count(), 5)
+        self.assertEqual(
+            {item['reason'] for item in second if item['status'] == 'skipped'}, {'already imported'},
+        )
+
+    def test_invalid_and_repeated_records(self):
+        lines = self.lines(1) * 2 + ['not json', json.dumps({'title': 'No transcript'})]
+        results = list(batch.run_batch(self.user, lines, concurrency=1, chunk_size=10))
+        self.assertEqual(results[-1], {'status': 'summary', 'created': 1, 'skipped': 1, 'failed': 2})
+
+    @override_settings(BLOG_ADMISSION_ENABLED=True, BLOG_RATE_LIMIT_BURST=2, BLOG_RATE_LIMIT_PER_MINUTE=1)
+    def test_endpoint_charges_a_token_per_record(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('generate-blog-batch'), '\n'.join(self.lines(4)), content_type='application/x-ndjson')
+        results = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+        summary = results[-1]
+        self.assertEqual((summary['created'], summary['failed']), (2, 1))
+        self.assertIn('retry_after', summary)
+        # The bucket is empty now, so the next batch is turned away outright.
+        response = self.client.post(reverse('generate-blog-batch'), '\n'.join(self.lines(4)), content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 429)
+
+    def test_command_prints_a_result_per_record(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl') as source:
+            source.write('\n'.join(self.lines(3)))
+            source.flush()
+            stdout, stderr = io.StringIO(), io.StringIO()
+            call_command('bulk_generate', source.name, user='alice', chunk_size=2, stdout=stdout, stderr=stderr)
+
+        results = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual([result['status'] for result in results], ['created'] * 3)
+        self.assertIn('Created 3, skipped 0, failed 0.', stderr.getvalue())
+
+        with self.assertRaisesMessage(CommandError, "User 'bob' does not exist."):
+            call_command('bulk_generate', '-', user='bob')
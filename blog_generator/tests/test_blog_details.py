@@ -0,0 +1,60 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from blog_generator import models
+from blog_generator.models import BlogPost
+
+from .utils import TEST_SETTINGS, StubModelMixin
+
+
+@override_settings(**TEST_SETTINGS)
+class RenderedHtmlTests(StubModelMixin, TestCase):
+    def test_markdown_is_rendered_at_save_and_raw_html_escaped(self):
+        blog_post = self.make_post(content='## Heading\n\nSome **bold** text <script>alert(1)</script>')
+        blog_post = BlogPost.objects.get(pk=blog_post.pk)
+
+        self.assertIn('<h2>Heading</h2>', blog_post.content_html)
+        self.assertIn('<strong>bold</strong>', blog_post.content_html)
+        self.assertNotIn('<script>', blog_post.content_html)
+        self.assertEqual(blog_post.content_hash, models.hash_content(blog_post.generated_content))
+
+    def test_unchanged_content_is_not_rendered_again(self):
+        blog_post = self.make_post(content='Some text.')
+        with mock.patch.object(models, 'markdown', wraps=models.markdown) as render:
+            blog_post.youtube_title = 'Renamed'
+            blog_post.save()
+            self.assertEqual(render.call_count, 0)
+            blog_post.generated_content = 'Other text.'
+            blog_post.save()
+            self.assertEqual(render.call_count, 1)
+        self.assertIn('Other text.', BlogPost.objects.get(pk=blog_post.pk).content_html)
+
+
+@override_settings(**TEST_SETTINGS)
+class BlogDetailsViewTests(StubModelMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.blog_post = self.make_post(title='My Post', content='# Title\n\nBody text.')
+        self.url = reverse('blog-details', args=[self.blog_post.pk])
+        self.client.force_login(self.user)
+
+    def test_page_and_revalidation(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Body text.')
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        repeat = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(repeat.status_code, 304)
+
+    def test_etag_changes_with_the_content(self):
+        etag = self.client.get(self.url)['ETag']
+        self.blog_post.generated_content = 'New body.'
+        self.blog_post.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_other_users_are_redirected(self):
+        self.client.force_login(User.objects.create_user('bob'))
+        self.assertRedirects(self.client.get(self.url), reverse('blog-list'))
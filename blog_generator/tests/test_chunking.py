@@ -0,0 +1,90 @@
+import time
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase, override_settings
+
+from blog_generator import admission, chunking, generation, llm
+from blog_generator.models import GenerationSlot
+
+from .utils import TEST_SETTINGS, TRANSCRIPT, ConcurrencyRecordingBackend, StubModelMixin
+
+
+class ChunkTranscriptTests(TestCase):
+    def test_whole_sentences_within_the_budget(self):
+        text = ' '.join(f"Sentence number {i} says something." for i in range(40))
+        chunks = chunking.chunk_transcript(text, max_tokens=30)
+
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(chunking.estimate_tokens(chunk) <= 30 for chunk in chunks))
+        self.assertTrue(all(chunk.endswith('.') for chunk in chunks))
+        self.assertEqual(' '.join(chunks), text)
+
+    def test_unpunctuated_captions_split_on_words(self):
+        text = ' '.join(f"word{i}" for i in range(200))
+        chunks = chunking.chunk_transcript(text, max_tokens=25)
+
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(chunking.estimate_tokens(chunk) <= 25 for chunk in chunks))
+        self.assertEqual(' '.join(chunks).split(), text.split())
+
+
+LONG_TRANSCRIPT = ' '.join([TRANSCRIPT] * 12)
+
+
+@override_settings(**TEST_SETTINGS, BLOG_LONG_TRANSCRIPT_CHARS=1000, BLOG_CHUNK_TOKENS=200, BLOG_CHUNK_WORKERS=8)
+class MapReduceTests(StubModelMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.backend = ConcurrencyRecordingBackend()
+        previous = llm.use_backend(self.backend)
+        self.addCleanup(llm.use_backend, previous)
+
+    def test_long_transcript_is_written_from_chunk_notes(self):
+        chunks = chunking.chunk_transcript(generation.prepare_transcript(LONG_TRANSCRIPT), 200)
+        title, content = generation.generate_article(LONG_TRANSCRIPT, mode='single')
+
+        chunk_prompts = [prompt for prompt in self.backend.prompts if prompt.endswith('Notes:')]
+        self.assertEqual(len(chunk_prompts), len(chunks))
+        self.assertEqual(len(self.backend.prompts), len(chunks) + 1)
+        self.assertIn(f"Part {len(chunks)}:", self.backend.prompts[-1])
+        self.assertTrue(title and content)
+
+    def test_short_transcript_is_one_call(self):
+        generation.generate_article(TRANSCRIPT, mode='single')
+        self.assertEqual(len(self.backend.prompts), 1)
+
+    @override_settings(BLOG_ADMISSION_ENABLED=True, BLOG_MAX_IN_FLIGHT=3)
+    def test_chunk_calls_take_free_admission_slots(self):
+        slot = admission.acquire(self.user)
+        notes = generation.summarize_chunks(LONG_TRANSCRIPT, slot)
+
+        self.assertGreater(len(notes), 3)
+        # Its own slot plus the two free ones.
+        self.assertEqual(self.backend.peak, 3)
+        self.assertEqual(list(GenerationSlot.objects.values_list('pk', flat=True)), [slot.pk])
+
+    @override_settings(BLOG_ADMISSION_ENABLED=True, BLOG_MAX_IN_FLIGHT=3)
+    def test_chunk_calls_run_one_at_a_time_without_free_slots(self):
+        slot = admission.acquire(self.user)
+        others = [admission.acquire(self.user) for _ in range(2)]
+        generation.summarize_chunks(LONG_TRANSCRIPT, slot)
+        self.assertEqual(self.backend.peak, 1)
+
+        # Somebody queues, so the slot freed next is theirs, not the fan-out's.
+        waiting = admission.try_acquire(self.user)
+        self.assertEqual(waiting.state, GenerationSlot.STATE_WAITING)
+        admission.release(others[0])
+        self.backend.peak = 0
+        generation.summarize_chunks(LONG_TRANSCRIPT, slot)
+        self.assertEqual(self.backend.peak, 1)
+
+    @override_settings(BLOG_ADMISSION_ENABLED=True, BLOG_MAX_IN_FLIGHT=2)
+    def test_async_chunk_calls_take_free_admission_slots(self):
+        slot = admission.acquire(self.user)
+        started = time.monotonic()
+        notes = async_to_sync(generation.asummarize_chunks)(LONG_TRANSCRIPT, slot)
+
+        self.assertGreater(len(notes), 2)
+        self.assertEqual(self.backend.peak, 2)
+        self.assertLess(time.monotonic() - started, len(notes) * 0.05)
+        self.assertEqual(GenerationSlot.objects.count(), 1)
@@ -0,0 +1,110 @@
+import zlib
+from unittest import mock
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+
+from blog_generator import compression
+from blog_generator.models import BlogPost
+
+from .utils import TEST_SETTINGS, StubModelMixin
+
+ARTICLE = "## Queues\n\nEvery job holds a lease while it runs. " * 20
+
+
+class CodecTests(SimpleTestCase):
+    def test_round_trips(self):
+        for text in ('', 'Short.', ARTICLE, 'Ünïcödé ' * 20):
+            self.assertEqual(compression.decompress(compression.compress(text)), text)
+
+    def test_short_text_is_stored_as_is(self):
+        self.assertEqual(compression.compress('Short.'), bytes([compression.STORED]) + b'Short.')
+
+    def test_long_text_is_compressed(self):
+        packed = compression.compress(ARTICLE)
+        self.assertEqual(packed[0], compression.BROTLI)
+        self.assertLess(len(packed), len(ARTICLE) // 4)
+
+        with mock.patch.object(compression, 'brotli', None):
+            packed = compression.compress(ARTICLE)
+            self.assertEqual(packed[0], compression.ZLIB)
+            self.assertEqual(compression.decompress(packed), ARTICLE)
+
+    def test_zlib_rows_stay_readable(self):
+        self.assertEqual(compression.decompress(bytes([compression.ZLIB]) + zlib.compress(b'Old row.')), 'Old row.')
+
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError):
+            compression.decompress(b'\x09data')
+
+
+@override_settings(**TEST_SETTINGS)
+class CompressedFieldTests(StubModelMixin, TestCase):
+    def test_body_and_html_are_stored_compressed(self):
+        post = self.make_post(content=ARTICLE)
+        row = BlogPost.objects.values('content_compressed', 'html_compressed', 'content_legacy', 'html_legacy').get(pk=post.pk)
+
+        self.assertEqual(compression.decompress(row['content_compressed']), ARTICLE)
+        self.assertIn('<h2>Queues</h2>', compression.decompress(row['html_compressed']))
+        self.assertEqual((row['content_legacy'], row['html_legacy']), ('', ''))
+
+        post = BlogPost.objects.get(pk=post.pk)
+        self.assertEqual(post.generated_content, ARTICLE)
+        self.assertIn('<h2>Queues</h2>', post.content_html)
+
+    def test_rows_that_predate_compression(self):
+        post = self.make_post()
+        BlogPost.objects.filter(pk=post.pk).update(
+            content_compressed=None, content_legacy='Legacy body.', html_compressed=None, html_legacy='<p>Legacy</p>',
+        )
+        post = BlogPost.objects.get(pk=post.pk)
+        self.assertEqual((post.generated_content, post.content_html), ('Legacy body.', '<p>Legacy</p>'))
+
+
+class MigrationTests(TransactionTestCase):
+    """
+    Runs the compression migrations forward and back over rows written by the
+    schema before them.
+    """
+    def migrate(self, name):
+        executor = MigrationExecutor(connection)
+        target = [('blog_generator', name)]
+        executor.migrate(target)
+        executor.loader.build_graph()
+        return executor.loader.project_state(target).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+        super().tearDown()
+
+    def create_post(self, apps, **fields):
+        user = apps.get_model('auth', 'User').objects.create(username='alice')
+        return apps.get_model('blog_generator', 'BlogPost').objects.create(
+            user=user, youtube_title='Post', youtube_link='N/A', **fields,
+        )
+
+    def test_0012_moves_bodies_into_content_compressed(self):
+        apps = self.migrate('0011_generationjob_media_path')
+        pk = self.create_post(apps, generated_content=ARTICLE).pk
+
+        apps = self.migrate('0012_blogpost_content_compressed')
+        post = apps.get_model('blog_generator', 'BlogPost').objects.get(pk=pk)
+        self.assertEqual(compression.decompress(post.content_compressed), ARTICLE)
+        self.assertEqual(post.content_legacy, '')
+
+        apps = self.migrate('0011_generationjob_media_path')
+        self.assertEqual(apps.get_model('blog_generator', 'BlogPost').objects.get(pk=pk).generated_content, ARTICLE)
+
+    def test_0015_moves_html_into_html_compressed(self):
+        apps = self.migrate('0014_user_stats')
+        pk = self.create_post(apps, content_compressed=compression.compress(ARTICLE), content_html='<p>Body</p>').pk
+
+        apps = self.migrate('0015_blogpost_html_compressed')
+        post = apps.get_model('blog_generator', 'BlogPost').objects.get(pk=pk)
+        self.assertEqual(compression.decompress(post.html_compressed), '<p>Body</p>')
+        self.assertEqual(post.html_legacy, '')
+
+        apps = self.migrate('0014_user_stats')
+        self.assertEqual(apps.get_model('blog_generator', 'BlogPost').objects.get(pk=pk).content_html, '<p>Body</p>')
@@ -0,0 +1,63 @@
+import io
+import json
+import os
+import tempfile
+import zipfile
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .utils import TEST_SETTINGS, StubModelMixin
+
+
+@override_settings(**TEST_SETTINGS)
+class ExportTests(StubModelMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.posts = [self.make_post(title=f'Article {i}', content=f'# Heading {i}\n\nBody {i}.') for i in range(3)]
+        self.make_post(user=User.objects.create_user('bob'), title='Not yours')
+        self.client.force_login(self.user)
+
+    def export(self, **params):
+        response = self.client.get(reverse('export'), params)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content)
+
+    def test_jsonl(self):
+        response, body = self.export(format='jsonl')
+        records = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual([record['title'] for record in records], ['Article 0', 'Article 1', 'Article 2'])
+        self.assertEqual(records[0]['content'], '# Heading 0\n\nBody 0.')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+    def test_zip(self):
+        response, body = self.export()
+        with zipfile.ZipFile(io.BytesIO(body)) as archive:
+            names = archive.namelist()
+            self.assertEqual(len([name for name in names if name.startswith('articles/')]), 3)
+            self.assertIn('export.json', names)
+            self.assertIn('Body 1.', archive.read(next(name for name in names if 'article-1' in name)).decode())
+
+    def test_since_exports_only_newer_posts(self):
+        response, _ = self.export(format='jsonl')
+        self.make_post(title='Article 3')
+
+        _, body = self.export(format='jsonl', since=response['X-Export-Cursor'])
+        self.assertEqual([json.loads(line)['title'] for line in body.decode().splitlines()], ['Article 3'])
+        self.assertEqual(self.client.get(reverse('export'), {'since': 'garbage'}).status_code, 400)
+
+    def test_command_writes_the_archive_and_the_next_cursor(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'export.jsonl')
+            stderr = io.StringIO()
+            call_command('export_posts', path, user='alice', format='jsonl', stderr=stderr)
+            with open(path) as f:
+                self.assertEqual(len(f.read().splitlines()), 3)
+
+            since = stderr.getvalue().split('--since ')[-1].strip()
+            self.make_post(title='Article 3')
+            call_command('export_posts', path, user='alice', format='jsonl', since=since, stderr=io.StringIO())
+            with open(path) as f:
+                self.assertEqual([json.loads(line)['title'] for line in f], ['Article 3'])
@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from blog_generator import generation, generation_cache
+from blog_generator.models import GenerationCacheEntry
+
+from .utils import TEST_SETTINGS, TRANSCRIPT, StubModelMixin
+
+
+@override_settings(**TEST_SETTINGS, BLOG_CACHE_ENABLED=True, BLOG_CACHE_HIT_FLUSH_SECONDS=float('inf'))
+class GenerationCacheTests(StubModelMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        generation_cache.pending_hits.clear()
+        self.addCleanup(generation_cache.pending_hits.clear)
+
+    def test_hit_after_store(self):
+        key = generation.cache_key(TRANSCRIPT)
+        self.assertIsNone(generation_cache.lookup(key))
+
+        generation.cache_article(TRANSCRIPT, 'Title', 'Body')
+        self.assertEqual(generation_cache.lookup(key), ('Title', 'Body'))
+        # Cosmetic differences in the transcript map to the same entry.
+        self.assertEqual(generation.cache_key(f'  {TRANSCRIPT.upper()} '), key)
+
+        generation_cache.memory_cache.clear()
+        self.assertEqual(generation_cache.lookup(key), ('Title', 'Body'))
+        generation_cache.flush_hits()
+        self.assertEqual(GenerationCacheEntry.objects.get(key=key).hits, 2)
+
+    def test_expired_entry_is_a_miss(self):
+        key = generation.cache_key(TRANSCRIPT)
+        generation.cache_article(TRANSCRIPT, 'Title', 'Body')
+        GenerationCacheEntry.objects.filter(key=key).update(expires_at=timezone.now() - timedelta(seconds=1))
+        generation_cache.memory_cache.clear()
+
+        self.assertIsNone(generation_cache.lookup(key))
+
+    def test_memory_hits_are_counted_without_queries(self):
+        key = generation.cache_key(TRANSCRIPT)
+        generation.cache_article(TRANSCRIPT, 'Title', 'Body')
+        GenerationCacheEntry.objects.filter(key=key).update(last_used_at=timezone.now() - timedelta(days=1))
+
+        with self.assertNumQueries(0):
+            for _ in range(3):
+                self.assertEqual(generation_cache.lookup(key), ('Title', 'Body'))
+        with self.assertNumQueries(1):
+            generation_cache.flush_hits()
+        entry = GenerationCacheEntry.objects.get(key=key)
+        self.assertEqual(entry.hits, 3)
+        self.assertGreater(entry.last_used_at, timezone.now() - timedelta(minutes=1))
+
+    @override_settings(BLOG_CACHE_HIT_FLUSH_SECONDS=0)
+    def test_hits_are_written_once_the_interval_passes(self):
+        key = generation.cache_key(TRANSCRIPT)
+        generation.cache_article(TRANSCRIPT, 'Title', 'Body')
+        generation_cache.lookup(key)
+        self.assertEqual(GenerationCacheEntry.objects.get(key=key).hits, 1)
@@ -0,0 +1,129 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from blog_generator import generation, jobs
+from blog_generator.models import BlogPost, GenerationJob
+
+from .utils import TEST_SETTINGS, TRANSCRIPT, StubModelMixin
+
+
+# run_job closes its thread's connection when it finishes, which a TestCase's
+# wrapping transaction would not survive.
+@override_settings(**TEST_SETTINGS, BLOG_JOB_MAX_ATTEMPTS=3, BLOG_JOB_RETRY_BACKOFF=10)
+class GenerationJobTests(StubModelMixin, TransactionTestCase):
+    def test_claim_and_run(self):
+        job = jobs.enqueue(self.user, TRANSCRIPT, 'Title')
+        claimed = jobs.claim_next('worker-1')
+
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual((claimed.status, claimed.locked_by, claimed.attempts), (GenerationJob.STATUS_RUNNING, 'worker-1', 1))
+        self.assertIsNone(jobs.claim_next('worker-2'))
+
+        jobs.run_job(claimed, 'worker-1')
+        job.refresh_from_db()
+        self.assertEqual(job.status, GenerationJob.STATUS_SUCCEEDED)
+        self.assertEqual(job.blog_post.user, self.user)
+        self.assertEqual(job.locked_by, '')
+
+    def test_failed_attempt_is_retried_with_backoff(self):
+        jobs.enqueue(self.user, TRANSCRIPT)
+        claimed = jobs.claim_next('worker-1')
+        with mock.patch.object(generation, 'generate_article', side_effect=RuntimeError('model exploded')):
+            jobs.run_job(claimed, 'worker-1')
+
+        job = GenerationJob.objects.get(pk=claimed.pk)
+        self.assertEqual(job.status, GenerationJob.STATUS_QUEUED)
+        self.assertEqual(job.error, 'model exploded')
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=5))
+        self.assertIsNone(jobs.claim_next('worker-1'))
+
+    def test_last_attempt_fails_the_job(self):
+        jobs.enqueue(self.user, TRANSCRIPT)
+        GenerationJob.objects.update(attempts=2)
+        claimed = jobs.claim_next('worker-1')
+        with mock.patch.object(generation, 'generate_article', side_effect=RuntimeError('model exploded')):
+            jobs.run_job(claimed, 'worker-1')
+
+        self.assertEqual(GenerationJob.objects.get(pk=claimed.pk).status, GenerationJob.STATUS_FAILED)
+
+    def test_permanent_error_fails_without_retrying(self):
+        jobs.enqueue(self.user, '', media_path='uploads/missing.mp3')
+        claimed = jobs.claim_next('worker-1')
+        jobs.run_job(claimed, 'worker-1')
+
+        job = GenerationJob.objects.get(pk=claimed.pk)
+        self.assertEqual((job.status, job.attempts), (GenerationJob.STATUS_FAILED, 1))
+        self.assertIn('not found', job.error)
+
+    def test_worker_that_lost_the_job_does_not_save_it(self):
+        jobs.enqueue(self.user, TRANSCRIPT)
+        claimed = jobs.claim_next('worker-1')
+        # The lease expired and another worker took the job over.
+        GenerationJob.objects.filter(pk=claimed.pk).update(locked_by='worker-2')
+
+        jobs.run_job(claimed, 'worker-1')
+        job = GenerationJob.objects.get(pk=claimed.pk)
+        self.assertEqual((job.status, job.locked_by), (GenerationJob.STATUS_RUNNING, 'worker-2'))
+        self.assertFalse(BlogPost.objects.exists())
+
+    def test_lost_job_rolls_back_the_post(self):
+        jobs.enqueue(self.user, TRANSCRIPT)
+        claimed = jobs.claim_next('worker-1')
+
+        def take_over(*args, **kwargs):
+            blog_post = original_save_post(*args, **kwargs)
+            GenerationJob.objects.filter(pk=claimed.pk).update(locked_by='worker-2')
+            return blog_post
+
+        original_save_post = generation.save_post
+        with mock.patch.object(generation, 'save_post', side_effect=take_over):
+            jobs.run_job(claimed, 'worker-1')
+        self.assertFalse(BlogPost.objects.exists())
+
+    @override_settings(BLOG_JOB_LEASE_SECONDS=60)
+    def test_recover_stale_jobs(self):
+        jobs.enqueue(self.user, TRANSCRIPT)
+        jobs.enqueue(self.user, TRANSCRIPT)
+        stale, fresh = jobs.claim_next('worker-1'), jobs.claim_next('worker-2')
+        GenerationJob.objects.filter(pk=stale.pk).update(heartbeat_at=timezone.now() - timedelta(minutes=5))
+
+        self.assertEqual(jobs.recover_stale_jobs(), 1)
+        self.assertEqual(GenerationJob.objects.get(pk=stale.pk).status, GenerationJob.STATUS_QUEUED)
+        self.assertEqual(GenerationJob.objects.get(pk=fresh.pk).status, GenerationJob.STATUS_RUNNING)
+        # A restarted worker takes its own jobs back at once.
+        self.assertEqual(jobs.recover_stale_jobs('worker-2'), 1)
+
+    def test_heartbeat_only_extends_own_jobs(self):
+        jobs.enqueue(self.user, TRANSCRIPT)
+        claimed = jobs.claim_next('worker-1')
+        old = timezone.now() - timedelta(minutes=5)
+        GenerationJob.objects.filter(pk=claimed.pk).update(heartbeat_at=old)
+
+        jobs.heartbeat([claimed.pk], 'worker-2')
+        self.assertEqual(GenerationJob.objects.get(pk=claimed.pk).heartbeat_at, old)
+        jobs.heartbeat([claimed.pk], 'worker-1')
+        self.assertGreater(GenerationJob.objects.get(pk=claimed.pk).heartbeat_at, old)
+
+    def test_status_endpoint(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse('generate-blog'), json.dumps({'transcript': TRANSCRIPT, 'on_duplicate': 'ignore'}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 202)
+        status_url = response.json()['status_url']
+        self.assertEqual(self.client.get(status_url).json()['status'], GenerationJob.STATUS_QUEUED)
+
+        jobs.run_job(jobs.claim_next('worker-1'), 'worker-1')
+        payload = self.client.get(status_url).json()
+        self.assertEqual(payload['status'], GenerationJob.STATUS_SUCCEEDED)
+        self.assertEqual(payload['blog_id'], BlogPost.objects.get().pk)
+        # Other users' jobs look the same as missing ones.
+        self.client.force_login(User.objects.create_user('bob'))
+        self.assertEqual(self.client.get(status_url).status_code, 404)
@@ -0,0 +1,57 @@
+from django.test import SimpleTestCase, override_settings
+
+from blog_generator import generation, llm
+
+
+class StubBackendTests(SimpleTestCase):
+    def test_output_depends_only_on_the_prompt(self):
+        prompt = generation.build_combined_prompt("A talk about queues.")
+        first = llm.StubBackend(latency=0, seed=1).generate(prompt)
+        self.assertEqual(llm.StubBackend(latency=0, seed=2).generate(prompt), first)
+        self.assertNotEqual(llm.StubBackend(latency=0).generate(prompt + ' '), first)
+
+        title, content = generation.split_generated_text(first)
+        self.assertTrue(title)
+        self.assertTrue(content.startswith('## Section 1'))
+
+    def test_stream_yields_the_generated_text(self):
+        backend = llm.StubBackend(latency=0, stream_chunk_chars=10)
+        prompt = generation.build_combined_prompt("A talk about queues.")
+        chunks = list(backend.stream(prompt))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(''.join(chunks), backend.generate(prompt))
+
+    def test_injected_failures_are_retryable(self):
+        with self.assertRaises(llm.RetryableBackendError):
+            llm.StubBackend(latency=0, error_rate=1).generate('prompt')
+
+    def test_unknown_latency_distribution(self):
+        with self.assertRaises(ValueError):
+            llm.StubBackend(latency_distribution='bimodal')
+
+
+class BackendSelectionTests(SimpleTestCase):
+    @override_settings(BLOG_LLM_BACKEND='stub', BLOG_LLM_OPTIONS={'latency': 0, 'article_tokens': 50})
+    def test_named_backend_is_built_with_its_options_and_wrapped(self):
+        backend = llm.load_backend()
+        self.assertIsInstance(backend, llm.ResilientBackend)
+        self.assertIsInstance(backend.backend, llm.InstrumentedBackend)
+        stub = backend.backend.backend
+        self.assertIsInstance(stub, llm.StubBackend)
+        self.assertEqual((stub.latency, stub.article_tokens), (0, 50))
+        self.assertEqual(backend.model_name, 'stub')
+
+    @override_settings(BLOG_LLM_BACKEND='blog_generator.llm.StubBackend', BLOG_LLM_OPTIONS={'latency': 0})
+    def test_dotted_path(self):
+        self.assertIsInstance(llm.load_backend().backend.backend, llm.StubBackend)
+
+    @override_settings(BLOG_LLM_BACKEND='blog_generator.llm.NoSuchBackend', BLOG_LLM_OPTIONS={})
+    def test_unusable_backend_is_none(self):
+        self.assertIsNone(llm.load_backend())
+
+    def test_use_backend_wraps_and_restores(self):
+        previous = llm.use_backend(llm.StubBackend(latency=0))
+        try:
+            self.assertIsInstance(llm.get_backend(), llm.ResilientBackend)
+        finally:
+            llm.use_backend(previous)
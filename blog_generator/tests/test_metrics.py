@@ -0,0 +1,135 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from blog_generator import metrics
+
+from .utils import TEST_SETTINGS
+
+# Larger than any Linux pid_max, so never a live process.
+DEAD_PID = 99_999_999
+
+
+class MetricsDirMixin:
+    """
+    Runs each test against an empty BLOG_METRICS_DIR and a registry holding only
+    the metrics the test registers.
+    """
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        directory_setting = override_settings(BLOG_METRICS_DIR=self.directory)
+        directory_setting.enable()
+        self.addCleanup(directory_setting.disable)
+        for patcher in (
+            mock.patch.dict(metrics.registry, clear=True),
+            mock.patch.object(metrics, 'collectors', []),
+            mock.patch.object(metrics, 'flushing', False),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.requests = metrics.counter('test_requests_total', 'Requests.', ('status',))
+        self.latency = metrics.histogram('test_latency_seconds', 'Latency.', buckets=(0.1, 1))
+        self.workers = metrics.gauge('test_workers', 'Workers.')
+
+    def write_snapshot(self, pid, requests=0, workers=0):
+        data = {
+            'test_requests_total': {
+                'type': 'counter', 'help': 'Requests.', 'labels': ['status'], 'buckets': None,
+                'samples': {json.dumps(['200']): requests},
+            },
+            'test_workers': {
+                'type': 'gauge', 'help': 'Workers.', 'labels': [], 'buckets': None,
+                'samples': {json.dumps([]): workers},
+            },
+        }
+        metrics.write_json(metrics.snapshot_path(pid), data)
+
+    def merged_value(self, name, labels=()):
+        return metrics.merge_snapshots().get(name, {'samples': {}})['samples'].get(json.dumps(list(labels)))
+
+
+class PrometheusFormatTests(MetricsDirMixin, SimpleTestCase):
+    def test_counters_and_cumulative_histograms(self):
+        self.requests.inc(status='200')
+        self.requests.inc(2, status='500')
+        for value in (0.05, 0.5, 5):
+            self.latency.observe(value)
+        self.workers.set(3)
+
+        text = metrics.render_prometheus()
+        self.assertIn('# TYPE test_requests_total counter', text)
+        self.assertIn('test_requests_total{status="500"} 2', text)
+        self.assertIn('test_latency_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('test_latency_seconds_bucket{le="1"} 2', text)
+        self.assertIn('test_latency_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn('test_latency_seconds_count 3', text)
+        self.assertIn('test_workers 3', text)
+
+    def test_failing_collector_is_skipped(self):
+        @metrics.register_collector
+        def broken():
+            raise RuntimeError('database down')
+
+        self.assertIn('test_requests_total', metrics.render_prometheus())
+
+
+class SnapshotTests(MetricsDirMixin, SimpleTestCase):
+    def test_live_snapshots_are_merged(self):
+        self.requests.inc(status='200')
+        self.write_snapshot(os.getppid(), requests=4, workers=2)
+        self.workers.set(1)
+
+        self.assertEqual(self.merged_value('test_requests_total', ['200']), 5)
+        self.assertEqual(self.merged_value('test_workers'), 3)
+        self.assertTrue(os.path.exists(metrics.snapshot_path(os.getppid())))
+
+    def test_exited_processes_are_archived_once(self):
+        self.write_snapshot(DEAD_PID, requests=4, workers=2)
+
+        self.assertEqual(self.merged_value('test_requests_total', ['200']), 4)
+        self.assertFalse(os.path.exists(metrics.snapshot_path(DEAD_PID)))
+        # Gauges of exited processes are dropped; counters stay in the archive.
+        self.assertIsNone(self.merged_value('test_workers'))
+        self.assertEqual(self.merged_value('test_requests_total', ['200']), 4)
+
+        # A later process with the same PID adds to the total instead of replacing it.
+        self.write_snapshot(DEAD_PID, requests=6)
+        self.assertEqual(self.merged_value('test_requests_total', ['200']), 10)
+
+    def test_reading_does_not_write_a_snapshot(self):
+        metrics.merge_snapshots()
+        self.assertFalse(os.path.exists(metrics.snapshot_path()))
+
+    @override_settings(BLOG_METRICS_FLUSH_INTERVAL=0)
+    def test_first_flush_archives_a_stale_snapshot_of_this_pid(self):
+        self.write_snapshot(os.getpid(), requests=7)
+        with mock.patch('atexit.register') as register:
+            metrics.maybe_flush()
+        register.assert_called_once_with(metrics.flush)
+
+        self.requests.inc(status='200')
+        self.assertEqual(self.merged_value('test_requests_total', ['200']), 8)
+        # The fresh snapshot holds only this process's own counts.
+        with open(metrics.snapshot_path()) as f:
+            self.assertEqual(json.load(f)['test_requests_total']['samples'], {})
+
+
+@override_settings(**TEST_SETTINGS)
+class MetricsEndpointTests(MetricsDirMixin, TestCase):
+    @override_settings(BLOG_METRICS_TOKEN='secret')
+    def test_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'# TYPE test_requests_total counter', response.content)
+
+    @override_settings(BLOG_METRICS_TOKEN=None)
+    def test_staff_session_without_a_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
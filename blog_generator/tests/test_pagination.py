@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from blog_generator import views
+from blog_generator.models import BlogPost
+from blog_generator.pagination import decode_cursor, keyset_page
+
+from .utils import TEST_SETTINGS, StubModelMixin
+
+
+@override_settings(**TEST_SETTINGS)
+class KeysetPaginationTests(StubModelMixin, TestCase):
+    def test_pages_cover_every_post_once_newest_first(self):
+        now = timezone.now()
+        posts = [self.make_post(title=f'Post {i}') for i in range(5)]
+        # Two posts share a timestamp, so the id tie-breaker matters.
+        for offset, post in zip((4, 3, 3, 2, 1), posts):
+            BlogPost.objects.filter(pk=post.pk).update(created_at=now - timedelta(minutes=offset))
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = keyset_page(BlogPost.objects.filter(user=self.user), cursor, page_size=2)
+            seen += [post.pk for post in page]
+            if cursor is None:
+                break
+
+        expected = list(BlogPost.objects.filter(user=self.user).order_by('-created_at', '-id').values_list('pk', flat=True))
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(seen), 5)
+
+    def test_malformed_cursor(self):
+        with self.assertRaises(ValueError):
+            decode_cursor('not-a-cursor')
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('blog-list-json'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(BLOG_LIST_PAGE_SIZE=2)
+    def test_json_pages_list_only_the_users_posts(self):
+        for i in range(3):
+            self.make_post(title=f'Post {i}', content=f'Body of post {i}.')
+        self.make_post(user=User.objects.create_user('bob'), title='Not yours')
+        self.client.force_login(self.user)
+
+        first = self.client.get(reverse('blog-list-json')).json()
+        self.assertEqual([item['title'] for item in first['results']], ['Post 2', 'Post 1'])
+        self.assertEqual(first['results'][0]['excerpt'], 'Body of post 2.')
+        second = self.client.get(reverse('blog-list-json'), {'cursor': first['next_cursor']}).json()
+        self.assertEqual([item['title'] for item in second['results']], ['Post 0'])
+        self.assertIsNone(second['next_cursor'])
+
+    def test_list_page_does_not_load_article_bodies(self):
+        self.make_post(content='A long article body.')
+        request = RequestFactory().get(reverse('blog-list'))
+        request.user = self.user
+        posts, _ = views.blog_list_page(request)
+        self.assertLessEqual({'content_compressed', 'html_compressed'}, posts[0].get_deferred_fields())
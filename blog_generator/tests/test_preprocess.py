@@ -0,0 +1,62 @@
+from django.test import SimpleTestCase, override_settings
+
+from blog_generator import chunking, preprocess
+
+
+class CleanTests(SimpleTestCase):
+    def test_caption_timings_and_numbering_are_dropped(self):
+        srt = (
+            "1\n00:00:01,000 --> 00:00:04,000\nWelcome back to the channel.\n\n"
+            "2\n00:00:04,000 --> 00:00:07,500\nToday we talk about queues."
+        )
+        vtt = "WEBVTT\n\n00:01.000 --> 00:04.000 align:start position:0%\nWelcome back."
+        self.assertEqual(preprocess.clean(srt), 'Welcome back to the channel. Today we talk about queues.')
+        self.assertEqual(preprocess.clean(vtt), 'Welcome back.')
+
+    def test_leading_and_bracketed_timestamps_are_dropped(self):
+        text = "0:00\nIntro.\n1:23 First point [01:45] and (1:02:03) the second."
+        self.assertEqual(preprocess.clean(text), 'Intro. First point and the second.')
+
+    def test_times_inside_sentences_are_kept(self):
+        text = "The meeting is at 10:30 and John 3:16 says to take list[0:10] with you."
+        self.assertEqual(preprocess.clean(text), text)
+
+    def test_markers_fillers_and_stutters(self):
+        text = "[Music] So um I I I think, uh, the [config.yaml] file is very very important >> (applause)"
+        self.assertEqual(preprocess.clean(text), 'So I think, the [config.yaml] file is very very important')
+
+    def test_rolling_captions_are_joined(self):
+        lines = ["we start with the queue", "with the queue and then", "and then the workers", "the workers"]
+        self.assertEqual(preprocess.clean('\n'.join(lines)), 'we start with the queue and then the workers')
+
+
+class CompressTests(SimpleTestCase):
+    def test_fits_the_budget_in_the_original_order(self):
+        topics = ('leases', 'retries', 'backoff', 'workers', 'priorities', 'deadlines', 'batches', 'timeouts')
+        sentences = [f"The queue handles {topic} for every job it runs." for topic in topics]
+        text = ' '.join(sentences + sentences[:3] + ["The weather was nice."])
+        compressed = preprocess.compress(text, 50)
+
+        self.assertLessEqual(chunking.estimate_tokens(compressed), 50)
+        kept = list(chunking.split_sentences(compressed))
+        self.assertGreater(len(kept), 1)
+        self.assertEqual(kept, sorted(kept, key=text.index))
+        # Repeated sentences are kept once.
+        self.assertEqual(len(kept), len(set(kept)))
+
+    def test_short_text_is_unchanged(self):
+        self.assertEqual(preprocess.compress('Short text.', 100), 'Short text.')
+
+
+class PrepareTests(SimpleTestCase):
+    @override_settings(BLOG_PREPROCESS_ENABLED=True, BLOG_TRANSCRIPT_TOKEN_BUDGET=0)
+    def test_counts_before_and_after(self):
+        prepared = preprocess.prepare("[Music] um hello hello there")
+        self.assertEqual(prepared.text, 'hello there')
+        self.assertLess(prepared.tokens_after, prepared.tokens_before)
+        self.assertTrue(preprocess.config_tag().startswith(f"p{preprocess.PREPROCESS_VERSION}"))
+
+    @override_settings(BLOG_PREPROCESS_ENABLED=False)
+    def test_disabled(self):
+        self.assertEqual(preprocess.prepare("[Music] um hello").text, "[Music] um hello")
+        self.assertEqual(preprocess.config_tag(), 'raw')
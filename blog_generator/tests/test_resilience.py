@@ -0,0 +1,119 @@
+import time
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase
+
+from blog_generator import llm
+
+
+class ScriptedBackend(llm.LLMBackend):
+    """
+    Raises or returns the scripted outcomes in turn, then keeps returning 'ok'.
+    """
+    model_name = 'scripted'
+
+    def __init__(self, *outcomes, latency=0):
+        self.outcomes = list(outcomes)
+        self.latency = latency
+        self.calls = 0
+
+    def generate(self, prompt):
+        self.calls += 1
+        time.sleep(self.latency)
+        outcome = self.outcomes.pop(0) if self.outcomes else 'ok'
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def stream(self, prompt):
+        text = self.generate(prompt)
+        yield text[:1]
+        yield text[1:]
+
+
+def resilient(backend, **options):
+    defaults = dict(
+        timeout=1, max_attempts=3, backoff_base=0.001, backoff_max=0.001, deadline=5,
+        hedge=False, breaker_failures=10, breaker_reset=60,
+    )
+    return llm.ResilientBackend(backend, **{**defaults, **options})
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def test_opens_probes_and_closes(self):
+        breaker = llm.CircuitBreaker('test', failure_threshold=2, reset_timeout=0.05)
+        breaker.record_failure()
+        breaker.check()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, breaker.OPEN)
+        with self.assertRaises(llm.CircuitOpenError):
+            breaker.before_call()
+
+        time.sleep(0.06)
+        breaker.before_call()
+        self.assertEqual(breaker.state, breaker.HALF_OPEN)
+        # Only one probe at a time.
+        with self.assertRaises(llm.CircuitOpenError):
+            breaker.before_call()
+        breaker.record_success()
+        self.assertEqual((breaker.state, breaker.failures), (breaker.CLOSED, 0))
+
+    def test_failed_probe_opens_again(self):
+        breaker = llm.CircuitBreaker('test', failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        breaker.before_call()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, breaker.OPEN)
+        with self.assertRaises(llm.CircuitOpenError) as raised:
+            breaker.check()
+        self.assertEqual(raised.exception.retry_after, 1)
+
+
+class ResilientBackendTests(SimpleTestCase):
+    def test_retryable_errors_are_retried(self):
+        backend = ScriptedBackend(llm.RetryableBackendError('busy'), llm.RetryableBackendError('busy'))
+        self.assertEqual(resilient(backend).generate('prompt'), 'ok')
+        self.assertEqual(backend.calls, 3)
+
+    def test_attempts_run_out(self):
+        backend = ScriptedBackend(*[llm.RetryableBackendError('busy')] * 3)
+        with self.assertRaisesMessage(llm.RetryableBackendError, 'busy'):
+            resilient(backend).generate('prompt')
+        self.assertEqual(backend.calls, 3)
+
+    def test_other_errors_are_not_retried(self):
+        backend = ScriptedBackend(llm.BackendError('bad request'))
+        wrapped = resilient(backend, breaker_failures=1)
+        with self.assertRaises(llm.BackendError):
+            wrapped.generate('prompt')
+        self.assertEqual(backend.calls, 1)
+        # Upstream answered, so the breaker stays closed.
+        wrapped.ensure_available()
+
+    def test_slow_attempts_time_out(self):
+        backend = ScriptedBackend(latency=0.2)
+        with self.assertRaises(llm.CallTimeout):
+            resilient(backend, timeout=0.02, max_attempts=1).generate('prompt')
+
+    def test_open_breaker_refuses_calls(self):
+        backend = ScriptedBackend(llm.RetryableBackendError('busy'))
+        wrapped = resilient(backend, max_attempts=1, breaker_failures=1)
+        with self.assertRaises(llm.RetryableBackendError):
+            wrapped.generate('prompt')
+
+        with self.assertRaises(llm.CircuitOpenError):
+            wrapped.ensure_available()
+        with self.assertRaises(llm.CircuitOpenError):
+            wrapped.generate('prompt')
+        self.assertEqual(backend.calls, 1)
+
+    def test_stream_is_retried_before_its_first_chunk(self):
+        backend = ScriptedBackend(llm.RetryableBackendError('busy'), 'hello')
+        self.assertEqual(''.join(resilient(backend).stream('prompt')), 'hello')
+        self.assertEqual(backend.calls, 2)
+
+    def test_async_calls_are_retried(self):
+        backend = ScriptedBackend(llm.RetryableBackendError('busy'))
+        self.assertEqual(async_to_sync(resilient(backend).agenerate)('prompt'), 'ok')
+        self.assertEqual(backend.calls, 2)
@@ -0,0 +1,88 @@
+from unittest import mock
+
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from blog_generator import routers
+from blog_generator.middleware import ReplicaRoutingMiddleware
+from blog_generator.models import BlogPost
+
+
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = routers.PrimaryReplicaRouter()
+
+    def route(self):
+        """
+        Routes the rest of the test like a request that may read from the replica.
+        """
+        token = routers.routing_state.set(routers.RoutingState(use_replica=True))
+        self.addCleanup(routers.routing_state.reset, token)
+
+    def test_reads_outside_requests_use_the_primary(self):
+        self.assertEqual(self.router.db_for_read(BlogPost), 'default')
+
+    def test_reads_in_a_safe_request_use_the_replica(self):
+        self.route()
+        self.assertEqual(self.router.db_for_read(BlogPost), routers.REPLICA_DB_ALIAS)
+
+    def test_a_write_moves_later_reads_to_the_primary(self):
+        self.route()
+        self.assertEqual(self.router.db_for_write(BlogPost), 'default')
+        self.assertEqual(self.router.db_for_read(BlogPost), 'default')
+
+    def test_use_primary(self):
+        self.route()
+        with routers.use_primary():
+            self.assertEqual(self.router.db_for_read(BlogPost), 'default')
+        self.assertEqual(self.router.db_for_read(BlogPost), routers.REPLICA_DB_ALIAS)
+
+    def test_reads_inside_a_transaction_use_the_primary(self):
+        self.route()
+        with mock.patch.object(connection, 'in_atomic_block', True):
+            self.assertEqual(self.router.db_for_read(BlogPost), 'default')
+
+    def test_migrations_only_run_on_the_primary(self):
+        self.assertTrue(self.router.allow_migrate('default', 'blog_generator'))
+        self.assertFalse(self.router.allow_migrate(routers.REPLICA_DB_ALIAS, 'blog_generator'))
+
+
+@mock.patch.object(routers, 'replica_configured', return_value=True)
+class ReplicaRoutingMiddlewareTests(SimpleTestCase):
+    def run_request(self, request, write=False):
+        seen = {}
+
+        def view(request):
+            seen['use_replica'] = routers.routing_state.get().use_replica
+            if write:
+                routers.PrimaryReplicaRouter().db_for_write(BlogPost)
+            return HttpResponse()
+
+        response = ReplicaRoutingMiddleware(view)(request)
+        self.assertIsNone(routers.routing_state.get())
+        return seen['use_replica'], response
+
+    def test_safe_requests_may_use_the_replica(self, configured):
+        use_replica, response = self.run_request(RequestFactory().get('/'))
+        self.assertTrue(use_replica)
+        self.assertNotIn(routers.PIN_COOKIE, response.cookies)
+
+    def test_writes_pin_the_client_to_the_primary(self, configured):
+        use_replica, response = self.run_request(RequestFactory().post('/'))
+        self.assertFalse(use_replica)
+        self.assertIn(routers.PIN_COOKIE, response.cookies)
+
+        _, response = self.run_request(RequestFactory().get('/'), write=True)
+        self.assertIn(routers.PIN_COOKIE, response.cookies)
+
+    def test_pinned_clients_read_from_the_primary(self, configured):
+        request = RequestFactory().get('/')
+        request.COOKIES[routers.PIN_COOKIE] = '1'
+        self.assertFalse(self.run_request(request)[0])
+
+    def test_nothing_is_routed_without_a_replica(self, configured):
+        configured.return_value = False
+        use_replica, response = self.run_request(RequestFactory().post('/'))
+        self.assertFalse(use_replica)
+        self.assertNotIn(routers.PIN_COOKIE, response.cookies)
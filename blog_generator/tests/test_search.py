@@ -0,0 +1,62 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from blog_generator import generation, search
+
+from .utils import TEST_SETTINGS, StubModelMixin
+
+
+@override_settings(**TEST_SETTINGS)
+class SearchTests(StubModelMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.in_title = self.make_post(title='Kubernetes scheduling', content='How pods get placed on nodes.')
+        self.in_body = self.make_post(title='Cluster notes', content='We moved everything to kubernetes last year.')
+        self.unrelated = self.make_post(title='Baking bread', content='Flour, water, salt and time.')
+        self.make_post(user=User.objects.create_user('bob'), title='Kubernetes for Bob', content='kubernetes')
+
+    def ids(self, query, **kwargs):
+        posts, _ = search.search_posts(self.user, query, **kwargs)
+        return [post.pk for post in posts]
+
+    def test_only_the_users_matching_posts_title_first(self):
+        self.assertEqual(self.ids('Kubernetes'), [self.in_title.pk, self.in_body.pk])
+        self.assertEqual(self.ids('kubernetes pods'), [self.in_title.pk])
+        self.assertEqual(self.ids('kubernetes bread'), [])
+
+    def test_index_follows_edits_and_deletes(self):
+        self.unrelated.generated_content = 'Sourdough on kubernetes.'
+        self.unrelated.save()
+        self.assertIn(self.unrelated.pk, self.ids('kubernetes'))
+
+        self.in_title.delete()
+        self.assertNotIn(self.in_title.pk, self.ids('kubernetes'))
+
+    def test_bulk_created_posts_are_indexed(self):
+        created = generation.save_posts([generation.build_post(self.user, 'Imported', 'N/A', 'Talk about zeppelins.')])
+        self.assertEqual(self.ids('zeppelins'), [created[0].pk])
+
+    def test_pages(self):
+        posts, has_next = search.search_posts(self.user, 'kubernetes', page=1, page_size=1)
+        self.assertEqual(([post.pk for post in posts], has_next), ([self.in_title.pk], True))
+        posts, has_next = search.search_posts(self.user, 'kubernetes', page=2, page_size=1)
+        self.assertEqual(([post.pk for post in posts], has_next), ([self.in_body.pk], False))
+
+    def test_query_syntax_is_not_interpreted(self):
+        # Quotes, columns and "-" are not FTS syntax here: every word must match.
+        self.assertEqual(self.ids('"Kubernetes" -pods title:'), [])
+        self.assertEqual(self.ids('"Kubernetes" -pods*'), [self.in_title.pk])
+        self.assertEqual(self.ids('!!!'), [])
+
+    def test_scan_fallback_finds_the_same_posts(self):
+        with mock.patch.object(search, 'is_indexed', return_value=False):
+            self.assertEqual(sorted(self.ids('kubernetes')), sorted([self.in_title.pk, self.in_body.pk]))
+
+    def test_json_endpoint(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('search'), {'q': 'bread'})
+        self.assertEqual([result['id'] for result in response.json()['results']], [self.unrelated.pk])
+        self.assertEqual(self.client.get(reverse('search'), {'q': 'bread', 'page': '0'}).status_code, 400)
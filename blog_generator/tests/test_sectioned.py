@@ -0,0 +1,67 @@
+from asgiref.sync import async_to_sync
+from django.test import TestCase, override_settings
+
+from blog_generator import admission, generation, llm
+from blog_generator.models import GenerationSlot
+
+from .utils import TEST_SETTINGS, TRANSCRIPT, ConcurrencyRecordingBackend, StubModelMixin
+
+
+@override_settings(**TEST_SETTINGS, BLOG_MAX_SECTIONS=8, BLOG_SECTION_WORKERS=8)
+class SectionedGenerationTests(StubModelMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.backend = ConcurrencyRecordingBackend()
+        previous = llm.use_backend(self.backend)
+        self.addCleanup(llm.use_backend, previous)
+
+    def section_prompts(self):
+        return [prompt for prompt in self.backend.prompts if self.backend.is_section_prompt(prompt)]
+
+    def test_outline_then_one_call_per_section(self):
+        title, content = generation.generate_article(TRANSCRIPT, mode='sectioned')
+
+        self.assertTrue(self.backend.is_outline_prompt(self.backend.prompts[0]))
+        self.assertEqual(len(self.section_prompts()), self.backend.outline_sections)
+        self.assertEqual(content.count('## '), self.backend.outline_sections)
+        self.assertTrue(title)
+        # Without admission control every section is written at once.
+        self.assertEqual(self.backend.peak, self.backend.outline_sections)
+
+    def test_stream_yields_the_title_then_each_section(self):
+        chunks = list(generation.stream_sectioned(TRANSCRIPT))
+        self.assertTrue(chunks[0].endswith(f"\n{generation.CONTENT_DELIMITER}\n"))
+        self.assertEqual(len(chunks), 1 + self.backend.outline_sections)
+        self.assertTrue(all(chunk.lstrip().startswith('## ') for chunk in chunks[1:]))
+
+    def test_unusable_outline_falls_back_to_one_call(self):
+        self.backend.outline_sections = 1
+        _, content = generation.generate_article(TRANSCRIPT, mode='sectioned')
+        self.assertEqual(self.section_prompts(), [])
+        self.assertTrue(content.startswith('## Section 1'))
+
+    @override_settings(BLOG_ADMISSION_ENABLED=True, BLOG_MAX_IN_FLIGHT=3)
+    def test_section_calls_take_free_admission_slots(self):
+        slot = admission.acquire(self.user)
+        generation.generate_article(TRANSCRIPT, mode='sectioned', slot=slot)
+
+        # Its own slot plus the two free ones, all released afterwards.
+        self.assertEqual(self.backend.peak, 3)
+        self.assertEqual(list(GenerationSlot.objects.values_list('pk', flat=True)), [slot.pk])
+
+    @override_settings(BLOG_ADMISSION_ENABLED=True, BLOG_MAX_IN_FLIGHT=3)
+    def test_section_calls_run_one_at_a_time_without_free_slots(self):
+        slot = admission.acquire(self.user)
+        for _ in range(2):
+            admission.acquire(self.user)
+        generation.generate_article(TRANSCRIPT, mode='sectioned', slot=slot)
+        self.assertEqual(self.backend.peak, 1)
+
+    @override_settings(BLOG_ADMISSION_ENABLED=True, BLOG_MAX_IN_FLIGHT=2)
+    def test_async_section_calls_take_free_admission_slots(self):
+        slot = admission.acquire(self.user)
+        _, content = async_to_sync(generation.agenerate_article)(TRANSCRIPT, mode='sectioned', slot=slot)
+
+        self.assertEqual(content.count('## '), self.backend.outline_sections)
+        self.assertEqual(self.backend.peak, 2)
+        self.assertEqual(GenerationSlot.objects.count(), 1)
@@ -0,0 +1,81 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from blog_generator import auth, sessions
+
+
+class CappedCacheTests(SimpleTestCase):
+    def test_timeouts_are_capped(self):
+        cache = mock.Mock()
+        capped = sessions.CappedCache(cache, 60)
+        capped.set('key', 'value', 1209600)
+        capped.set('other', 'value', 10)
+        self.assertEqual(cache.set.call_args_list, [mock.call('key', 'value', 60), mock.call('other', 'value', 10)])
+
+        capped.get('key')
+        cache.get.assert_called_once_with('key')
+
+
+@override_settings(BLOG_SESSION_CACHE_SECONDS=30)
+class SessionStoreTests(TestCase):
+    def test_saved_sessions_load_from_the_cache(self):
+        store = sessions.SessionStore()
+        store['cart'] = 3
+        store.save()
+
+        with mock.patch.object(store._cache.cache, 'set') as cache_set:
+            store.save()
+        self.assertLessEqual(cache_set.call_args.args[2], 30)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(sessions.SessionStore(store.session_key)['cart'], 3)
+
+    def test_deleted_sessions_are_gone_from_this_process(self):
+        store = sessions.SessionStore()
+        store['cart'] = 3
+        store.save()
+        store.delete()
+        self.assertNotIn('cart', sessions.SessionStore(store.session_key).load())
+
+
+@override_settings(BLOG_USER_CACHE_SECONDS=60)
+class CachedModelBackendTests(TestCase):
+    def setUp(self):
+        auth.user_cache.clear()
+        self.addCleanup(auth.user_cache.clear)
+        self.user = User.objects.create_user('alice')
+        self.backend = auth.CachedModelBackend()
+
+    def test_repeat_lookups_are_served_from_the_cache(self):
+        first = self.backend.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            second = self.backend.get_user(self.user.pk)
+        self.assertEqual(second, self.user)
+        # Every request gets its own copy.
+        self.assertIsNot(second, first)
+
+    def test_saving_a_user_evicts_it(self):
+        self.backend.get_user(self.user.pk)
+        User.objects.filter(pk=self.user.pk).update(first_name='Stale')
+        self.user.first_name = 'Alice'
+        self.user.save()
+        self.assertEqual(self.backend.get_user(self.user.pk).first_name, 'Alice')
+
+        self.user.delete()
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+    @override_settings(BLOG_USER_CACHE_SECONDS=0)
+    def test_zero_seconds_disables_the_cache(self):
+        self.backend.get_user(self.user.pk)
+        with self.assertNumQueries(1):
+            self.backend.get_user(self.user.pk)
+
+    def test_least_recently_used_users_are_dropped(self):
+        cache = auth.UserCache(max_size=2, ttl=60)
+        cache.set(1, self.user)
+        cache.set(2, self.user)
+        cache.get(1)
+        cache.set(3, self.user)
+        self.assertEqual(list(cache.entries), [1, 3])
@@ -0,0 +1,82 @@
+import json
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from blog_generator import similarity
+from blog_generator.models import BlogPost
+
+from .utils import TEST_SETTINGS, TRANSCRIPT, StubModelMixin
+
+
+class SignatureTests(SimpleTestCase):
+    def test_small_edits_keep_most_of_the_signature(self):
+        edited = TRANSCRIPT.replace('Today', 'So today').upper() + ' [Music]'
+        unrelated = "Sourdough needs flour, water, salt and a lot of patience before it rises properly."
+
+        self.assertGreater(similarity.estimate_similarity(similarity.signature(TRANSCRIPT), similarity.signature(edited)), 0.8)
+        self.assertLess(similarity.estimate_similarity(similarity.signature(TRANSCRIPT), similarity.signature(unrelated)), 0.2)
+        self.assertEqual(similarity.estimate_similarity(similarity.signature(TRANSCRIPT), similarity.signature(TRANSCRIPT)), 1)
+
+    def test_layout(self):
+        packed = similarity.signature(TRANSCRIPT)
+        self.assertEqual(len(similarity.unpack(packed)), similarity.NUM_PERM)
+        self.assertEqual([band for band, _ in similarity.band_buckets(packed)], list(range(similarity.BANDS)))
+        self.assertIsNone(similarity.signature('  '))
+        self.assertEqual(len(similarity.shingles('two words')), 1)
+
+
+@override_settings(**TEST_SETTINGS)
+class FindDuplicateTests(StubModelMixin, TestCase):
+    def test_near_duplicate_is_found_and_unrelated_is_not(self):
+        post = self.make_post(transcript=TRANSCRIPT)
+        self.make_post(transcript="Sourdough needs flour, water, salt and a lot of patience before it rises properly.")
+
+        match = similarity.find_duplicate(TRANSCRIPT.replace('Today', 'So today'), self.user)
+        self.assertEqual(match.post.pk, post.pk)
+        self.assertGreaterEqual(match.similarity, 0.8)
+        self.assertIsNone(similarity.find_duplicate("A lecture on medieval trade routes across the Baltic sea.", self.user))
+
+
+@override_settings(**TEST_SETTINGS)
+class DuplicateDetectionTests(StubModelMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = self.make_post(title='Original', content='Original article.', transcript=TRANSCRIPT)
+        self.bob = User.objects.create_user('bob', 'bob@example.com', 'password')
+
+    def generate(self, user, **fields):
+        self.client.force_login(user)
+        body = json.dumps({'transcript': TRANSCRIPT.replace('Today', 'So today'), **fields})
+        return self.client.post(reverse('generate-blog'), body, content_type='application/json')
+
+    def test_offer_points_at_the_existing_post(self):
+        response = self.generate(self.user)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['duplicate']['blog_id'], self.post.pk)
+        self.assertEqual(BlogPost.objects.count(), 1)
+
+    def test_reuse_returns_the_existing_post(self):
+        response = self.generate(self.user, on_duplicate='reuse')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()['blog_id'], response.json()['reused']), (self.post.pk, True))
+        self.assertEqual(BlogPost.objects.count(), 1)
+
+    def test_ignore_queues_a_generation(self):
+        self.assertEqual(self.generate(self.user, on_duplicate='ignore').status_code, 202)
+
+    def test_other_users_posts_are_not_matched(self):
+        self.assertIsNone(similarity.find_duplicate(TRANSCRIPT, self.bob))
+        for action in ('offer', 'reuse'):
+            self.assertEqual(self.generate(self.bob, on_duplicate=action).status_code, 202)
+        self.assertFalse(BlogPost.objects.filter(user=self.bob).exists())
+
+    @override_settings(BLOG_DUPLICATE_ACROSS_USERS=True)
+    def test_cross_user_reuse_is_opt_in(self):
+        self.assertEqual(self.generate(self.bob, on_duplicate='offer').status_code, 202)
+
+        response = self.generate(self.bob, on_duplicate='reuse')
+        self.assertEqual(response.status_code, 200)
+        copy = BlogPost.objects.get(user=self.bob)
+        self.assertEqual(copy.generated_content, 'Original article.')
@@ -0,0 +1,59 @@
+import io
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from blog_generator import generation, stats
+
+from .utils import TEST_SETTINGS, StubModelMixin
+
+
+@override_settings(**TEST_SETTINGS)
+class UserStatsTests(StubModelMixin, TestCase):
+    def test_counters_follow_creates_and_deletes(self):
+        first = self.make_post(content='one two three')
+        self.make_post(content='four five')
+        summary = stats.summary(self.user, days=3)
+        self.assertEqual((summary['post_count'], summary['word_count'], summary['recent_posts']), (2, 5, 2))
+        self.assertEqual(summary['recent_activity'][-1]['posts'], 2)
+
+        first.delete()
+        summary = stats.summary(self.user, days=3)
+        self.assertEqual((summary['post_count'], summary['word_count']), (1, 2))
+
+    def test_bulk_created_posts_are_counted(self):
+        generation.save_posts([generation.build_post(self.user, 'Bulk', 'N/A', 'a b c') for _ in range(3)])
+        self.assertEqual(stats.summary(self.user)['post_count'], 3)
+
+    def test_rebuild_fixes_drift(self):
+        self.make_post(content='one two three')
+        self.user.userstats.post_count = 7
+        self.user.userstats.save()
+
+        self.assertEqual(stats.rebuild([self.user.pk]), {self.user.pk})
+        self.assertEqual(stats.summary(self.user)['post_count'], 1)
+        self.assertEqual(stats.rebuild([self.user.pk]), set())
+
+    def test_json_endpoint(self):
+        self.make_post(content='one two three')
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('user-stats'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['post_count'], 1)
+        self.assertEqual(self.client.get(reverse('user-stats'), {'days': 'x'}).status_code, 400)
+
+    def test_reconcile_command(self):
+        self.make_post(content='one two three')
+        self.user.userstats.post_count = 7
+        self.user.userstats.save()
+
+        stdout = io.StringIO()
+        call_command('reconcile_stats', check=True, stdout=stdout)
+        self.assertIn('1 need fixing', stdout.getvalue())
+        self.assertEqual(stats.summary(self.user)['post_count'], 7)
+
+        stdout = io.StringIO()
+        call_command('reconcile_stats', user='alice', stdout=stdout)
+        self.assertIn('Checked 1 users; 1 fixed.', stdout.getvalue())
+        self.assertEqual(stats.summary(self.user)['post_count'], 1)
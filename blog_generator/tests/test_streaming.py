@@ -0,0 +1,60 @@
+import json
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from blog_generator import generation
+from blog_generator.models import BlogPost
+
+from .utils import TEST_SETTINGS, TRANSCRIPT, StubModelMixin
+
+
+class DelimiterSplitterTests(TestCase):
+    def test_delimiter_split_across_chunks(self):
+        splitter = generation.DelimiterSplitter()
+        events = []
+        for chunk in ('My Title\n---CON', 'TENT', '---\nFirst para', 'graph.'):
+            events += splitter.feed(chunk)
+        events += splitter.finish()
+
+        self.assertEqual(events[0], ('title', 'My Title'))
+        self.assertEqual(''.join(text for part, text in events if part == 'content'), 'First paragraph.')
+        self.assertEqual(splitter.result(), ('My Title', 'First paragraph.'))
+
+    def test_missing_delimiter_falls_back_to_default_title(self):
+        splitter = generation.DelimiterSplitter()
+        events = splitter.feed('No delimiter in this response.') + splitter.finish()
+
+        self.assertEqual(events, [('content', 'No delimiter in this response.')])
+        self.assertEqual(splitter.result(), (generation.FALLBACK_TITLE, 'No delimiter in this response.'))
+        self.assertEqual(splitter.result('Given'), ('Given', 'No delimiter in this response.'))
+
+
+@override_settings(**TEST_SETTINGS)
+class StreamingViewTests(StubModelMixin, TestCase):
+    def stream(self, **fields):
+        self.client.force_login(self.user)
+        body = json.dumps({'transcript': TRANSCRIPT, 'stream': True, 'on_duplicate': 'ignore', **fields})
+        response = self.client.post(reverse('generate-blog'), body, content_type='application/json')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        return [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+    def test_events_build_the_saved_article(self):
+        events = self.stream(title='Given Title')
+        self.assertEqual(events[0], {'event': 'start'})
+        self.assertEqual(events[1], {'event': 'title', 'text': 'Given Title'})
+        done = events[-1]
+        self.assertEqual(done['event'], 'done')
+
+        blog_post = BlogPost.objects.get(pk=done['blog_id'])
+        self.assertEqual(blog_post.youtube_title, 'Given Title')
+        content = ''.join(event['text'] for event in events if event['event'] == 'content')
+        self.assertEqual(blog_post.generated_content, content.strip())
+
+    def test_model_failure_is_an_error_event(self):
+        with self.settings(BLOG_CACHE_ENABLED=False), \
+                mock.patch.object(generation, 'stream_article', side_effect=RuntimeError('boom')):
+            events = self.stream()
+        self.assertEqual(events[-1]['event'], 'error')
+        self.assertFalse(BlogPost.objects.exists())
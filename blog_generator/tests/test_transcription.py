@@ -0,0 +1,117 @@
+import shutil
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from blog_generator import audio, jobs, transcription
+from blog_generator.models import GenerationJob
+
+from .utils import TEST_SETTINGS, StubModelMixin
+
+
+class PlanSegmentsTests(TestCase):
+    def test_cuts_in_the_middle_of_pauses(self):
+        segments = audio.plan_segments(1000, [(290, 310), (590, 610), (880, 900)], target_seconds=300, max_seconds=420)
+        self.assertEqual(segments, [(0.0, 300.0), (300.0, 600.0), (600.0, 1000)])
+
+    def test_cuts_at_max_seconds_without_a_pause(self):
+        segments = audio.plan_segments(1000, [], target_seconds=300, max_seconds=420)
+        self.assertEqual(segments, [(0.0, 420.0), (420.0, 840.0), (840.0, 1000)])
+        self.assertTrue(all(end - start <= 420 for start, end in segments))
+
+    def test_short_recording_is_one_segment(self):
+        self.assertEqual(audio.plan_segments(200, [(50, 60)], target_seconds=300, max_seconds=420), [(0.0, 200)])
+
+
+@override_settings(BLOG_SEGMENT_TARGET_SECONDS=300, BLOG_SEGMENT_MAX_SECONDS=420)
+class TranscribeMediaTests(TestCase):
+    """
+    Runs the segmenting pipeline with ffmpeg replaced by fakes and the stub transcriber.
+    """
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.path = Path(self.media_root) / 'talk.mp3'
+        self.path.write_bytes(b'not really audio')
+        previous = transcription.use_transcriber(transcription.StubTranscriber(words_per_second=0.05))
+        self.addCleanup(transcription.use_transcriber, previous)
+
+    def fake_extract(self, path, start, end, destination):
+        Path(destination).write_bytes(f'{start}-{end}'.encode())
+        return destination
+
+    def test_segments_are_transcribed_in_order(self):
+        progress = []
+        with mock.patch.object(audio, 'probe_duration', return_value=1000.0), \
+                mock.patch.object(audio, 'detect_silences', return_value=[(590, 610)]), \
+                mock.patch.object(audio, 'extract_segment', side_effect=self.fake_extract):
+            text = transcription.transcribe_media(self.path, lambda done, total: progress.append((done, total)), workers=2)
+
+        lines = text.splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(progress[0], (0, 3))
+        self.assertEqual(progress[-1], (3, 3))
+        # The stub's text depends only on the segment, so a rerun gives the same result.
+        with mock.patch.object(audio, 'probe_duration', return_value=1000.0), \
+                mock.patch.object(audio, 'detect_silences', return_value=[(590, 610)]), \
+                mock.patch.object(audio, 'extract_segment', side_effect=self.fake_extract):
+            self.assertEqual(transcription.transcribe_media(self.path), text)
+
+    def test_missing_media_is_a_transcription_error(self):
+        with override_settings(MEDIA_ROOT=self.media_root):
+            self.assertEqual(transcription.resolve_media('talk.mp3'), self.path.resolve())
+            with self.assertRaises(transcription.TranscriptionError):
+                transcription.resolve_media('../etc/passwd')
+            with self.assertRaises(transcription.TranscriptionError):
+                transcription.resolve_media('missing.mp3')
+
+
+def failing_assemblyai(error):
+    """
+    An AssemblyAITranscriber whose SDK reports every transcript as failed.
+    """
+    transcriber = transcription.AssemblyAITranscriber.__new__(transcription.AssemblyAITranscriber)
+    transcriber.aai = SimpleNamespace(TranscriptStatus=SimpleNamespace(error='error'))
+    transcriber.transcriber = mock.Mock(**{'transcribe.return_value': SimpleNamespace(status='error', error=error, text=None)})
+    return transcriber
+
+
+# run_job closes its thread's connection when it finishes.
+@override_settings(**TEST_SETTINGS, BLOG_JOB_MAX_ATTEMPTS=3, BLOG_SEGMENT_MAX_SECONDS=420)
+class MediaJobTests(StubModelMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media_setting = override_settings(MEDIA_ROOT=media_root)
+        media_setting.enable()
+        self.addCleanup(media_setting.disable)
+        self.upload = Path(media_root) / transcription.UPLOAD_DIR / 'talk.mp3'
+        self.upload.parent.mkdir()
+        self.upload.write_bytes(b'not really audio')
+
+    def run_media_job(self, transcriber):
+        previous = transcription.use_transcriber(transcriber)
+        self.addCleanup(transcription.use_transcriber, previous)
+        jobs.enqueue(self.user, '', media_path=f'{transcription.UPLOAD_DIR}/talk.mp3')
+        claimed = jobs.claim_next('worker-1')
+        with mock.patch.object(audio, 'probe_duration', return_value=60.0), \
+                mock.patch.object(audio, 'extract_segment', side_effect=lambda path, start, end, destination: destination.write_bytes(b'x')):
+            jobs.run_job(claimed, 'worker-1')
+        return GenerationJob.objects.get(pk=claimed.pk)
+
+    def test_provider_failure_is_retried(self):
+        job = self.run_media_job(failing_assemblyai('Server busy'))
+        self.assertEqual(job.status, GenerationJob.STATUS_QUEUED)
+        self.assertIn('Server busy', job.error)
+        # The upload is kept for the next attempt.
+        self.assertTrue(self.upload.exists())
+
+    def test_transcribed_media_is_generated(self):
+        job = self.run_media_job(transcription.StubTranscriber())
+        self.assertEqual(job.status, GenerationJob.STATUS_SUCCEEDED)
+        self.assertTrue(job.transcript)
+        self.assertFalse(self.upload.exists())
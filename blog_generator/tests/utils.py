@@ -0,0 +1,76 @@
+import threading
+
+from django.contrib.auth.models import User
+
+from blog_generator import generation, generation_cache, llm
+
+# The views are exercised with admission control off (individual tests turn it on)
+# and without metrics snapshots, so test runs leave nothing in BLOG_METRICS_DIR.
+# Pages render with plain static URLs, as there is no collectstatic manifest.
+TEST_SETTINGS = {
+    'BLOG_ADMISSION_ENABLED': False,
+    'BLOG_METRICS_FLUSH_INTERVAL': float('inf'),
+    'STORAGES': {
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    },
+}
+
+TRANSCRIPT = (
+    "Today we look at how the scheduler decides which job runs next, why the queue "
+    "keeps a lease on every running job, and what happens when a worker disappears "
+    "halfway through. We also cover retries with exponential backoff, permanent "
+    "failures that should never be retried, and how progress is reported to the user."
+)
+
+
+class StubModelMixin:
+    """
+    Runs every test against the offline stub model and an empty generation cache.
+    """
+    def setUp(self):
+        super().setUp()
+        previous = llm.use_backend(llm.StubBackend(latency=0, article_tokens=200, seed=1))
+        self.addCleanup(llm.use_backend, previous)
+        generation_cache.memory_cache.clear()
+        self.addCleanup(generation_cache.memory_cache.clear)
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+
+    def make_post(self, user=None, title='Post', content='Some words here.', transcript=None):
+        return generation.save_post(user or self.user, title, 'N/A', content, transcript)
+
+
+class ConcurrencyRecordingBackend(llm.StubBackend):
+    """
+    Stub that remembers its prompts and the most calls it had in flight at once.
+    """
+    def __init__(self):
+        super().__init__(latency=0.05, article_tokens=200, notes_tokens=20, seed=1)
+        self.prompts = []
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def enter(self, prompt):
+        with self.lock:
+            self.prompts.append(prompt)
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+
+    def leave(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def generate(self, prompt):
+        self.enter(prompt)
+        try:
+            return super().generate(prompt)
+        finally:
+            self.leave()
+
+    async def agenerate(self, prompt):
+        self.enter(prompt)
+        try:
+            return await super().agenerate(prompt)
+        finally:
+            self.leave()
@@ -0,0 +1,274 @@
+import hashlib
+import logging
+import random
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.move import file_move_safe
+from django.utils.module_loading import import_string
+
+from . import audio, metrics
+from .llm import STUB_VOCABULARY
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Speech-to-text for uploaded audio and video. A recording is cut at pauses into
+# segments of about BLOG_SEGMENT_TARGET_SECONDS, the segments are extracted and
+# transcribed concurrently, and the texts are joined back in recording order.
+
+# Extensions ffmpeg is expected to read an audio track from.
+MEDIA_EXTENSIONS = ('.aac', '.flac', '.m4a', '.mkv', '.mov', '.mp3', '.mp4', '.oga', '.ogg', '.opus', '.wav', '.webm')
+# Uploads live here, relative to MEDIA_ROOT; only these are deleted after use.
+UPLOAD_DIR = 'uploads'
+
+TRANSCRIBERS = {
+    'assemblyai': 'blog_generator.transcription.AssemblyAITranscriber',
+    'stub': 'blog_generator.transcription.StubTranscriber',
+}
+
+segment_duration = metrics.histogram(
+    'transcription_segment_duration_seconds', 'Time spent per audio segment, by stage.',
+    ('stage',), (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+media_transcriptions = metrics.counter('media_transcriptions_total', 'Media files transcribed, by result.', ('result',))
+
+
+class TranscriptionError(Exception):
+    """
+    A recording cannot be transcribed: it is missing, outside MEDIA_ROOT or of an
+    unsupported type. Trying again will not help.
+    """
+
+
+class TranscriptionUnavailable(Exception):
+    """
+    The speech-to-text provider failed on a segment. Unlike TranscriptionError,
+    this is worth retrying later.
+    """
+
+
+@dataclass(frozen=True)
+class Segment:
+    index: int
+    start: float
+    end: float
+    path: Path
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+
+class Transcriber:
+    """
+    Interface every speech-to-text backend implements. transcribe() is called from
+    several threads at once, one segment per call.
+    """
+    name = ''
+
+    def transcribe(self, segment):
+        raise NotImplementedError
+
+
+# --- AssemblyAI ---
+
+class AssemblyAITranscriber(Transcriber):
+    name = 'assemblyai'
+
+    def __init__(self, api_key=None, speech_model=None):
+        import assemblyai as aai
+
+        api_key = api_key or settings.ASSEMBLYAI_API_KEY
+        if not api_key:
+            raise ValueError("ASSEMBLYAI_API_KEY is not set.")
+        aai.settings.api_key = api_key
+        config = aai.TranscriptionConfig(speech_model=speech_model) if speech_model else None
+        self.aai = aai
+        self.transcriber = aai.Transcriber(config=config)
+
+    def transcribe(self, segment):
+        transcript = self.transcriber.transcribe(str(segment.path))
+        if transcript.status == self.aai.TranscriptStatus.error:
+            raise TranscriptionUnavailable(f"AssemblyAI failed on segment {segment.index}: {transcript.error}")
+        return transcript.text or ''
+
+
+# --- Local Stub ---
+
+class StubTranscriber(Transcriber):
+    """
+    Offline, deterministic stand-in for tests and benchmarks. The text depends only
+    on the segment's audio; it is about `words_per_second` words per second of
+    audio, and each call takes `latency` seconds plus `realtime_factor` times the
+    segment duration.
+    """
+    name = 'stub'
+
+    def __init__(self, latency=0.0, realtime_factor=0.0, words_per_second=2.5):
+        self.latency = latency
+        self.realtime_factor = realtime_factor
+        self.words_per_second = words_per_second
+
+    def transcribe(self, segment):
+        rng = random.Random(hashlib.sha256(segment.path.read_bytes()).digest())
+        words = [rng.choice(STUB_VOCABULARY) for _ in range(max(1, round(segment.duration * self.words_per_second)))]
+        time.sleep(self.latency + segment.duration * self.realtime_factor)
+        return ' '.join(words).capitalize() + '.'
+
+
+# --- Transcriber Selection ---
+
+_transcriber = None
+_transcriber_loaded = False
+_transcriber_lock = threading.Lock()
+
+def load_transcriber():
+    """
+    Instantiates the transcriber named by settings.BLOG_TRANSCRIBER with
+    BLOG_TRANSCRIBER_OPTIONS, or returns None if it cannot be configured.
+    """
+    path = TRANSCRIBERS.get(settings.BLOG_TRANSCRIBER, settings.BLOG_TRANSCRIBER)
+    try:
+        return import_string(path)(**settings.BLOG_TRANSCRIBER_OPTIONS)
+    except Exception as e:
+        logger.error(f"Failed to configure transcription: {e}")
+        return None
+
+def get_transcriber():
+    global _transcriber, _transcriber_loaded
+    if not _transcriber_loaded:
+        with _transcriber_lock:
+            if not _transcriber_loaded:
+                _transcriber = load_transcriber()
+                _transcriber_loaded = True
+    return _transcriber
+
+def use_transcriber(transcriber):
+    """
+    Replaces the active transcriber and returns the previous one so it can be restored.
+    """
+    global _transcriber, _transcriber_loaded
+    with _transcriber_lock:
+        previous = _transcriber if _transcriber_loaded else None
+        _transcriber, _transcriber_loaded = transcriber, True
+    return previous
+
+
+# --- Media Files ---
+
+def media_root():
+    return Path(settings.MEDIA_ROOT).resolve()
+
+def resolve_media(relative_path):
+    """
+    The absolute path of a media file given relative to MEDIA_ROOT. Raises
+    TranscriptionError for paths outside MEDIA_ROOT, missing files and
+    unsupported extensions.
+    """
+    root = media_root()
+    path = (root / relative_path).resolve()
+    if not path.is_relative_to(root) or not path.is_file():
+        raise TranscriptionError(f"Media file '{relative_path}' not found.")
+    if path.suffix.lower() not in MEDIA_EXTENSIONS:
+        raise TranscriptionError(f"Unsupported media type '{path.suffix}'.")
+    return path
+
+def save_upload(uploaded_file):
+    """
+    Moves an uploaded file into MEDIA_ROOT/uploads under a random name and returns
+    its path relative to MEDIA_ROOT. Files spooled to disk by
+    TemporaryFileUploadHandler are moved, not copied.
+    """
+    suffix = Path(uploaded_file.name).suffix.lower()
+    if suffix not in MEDIA_EXTENSIONS:
+        raise TranscriptionError(f"Unsupported media type '{suffix or uploaded_file.name}'.")
+    relative_path = Path(UPLOAD_DIR) / f'{uuid.uuid4().hex}{suffix}'
+    destination = media_root() / relative_path
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    if hasattr(uploaded_file, 'temporary_file_path'):
+        file_move_safe(uploaded_file.temporary_file_path(), destination)
+    else:
+        with open(destination, 'wb') as output:
+            for chunk in uploaded_file.chunks():
+                output.write(chunk)
+    return relative_path.as_posix()
+
+def discard_upload(relative_path):
+    """
+    Deletes a file saved by save_upload. Files referenced elsewhere in MEDIA_ROOT
+    are left alone.
+    """
+    path = (media_root() / relative_path).resolve()
+    if path.is_relative_to(media_root() / UPLOAD_DIR):
+        path.unlink(missing_ok=True)
+
+
+# --- Pipeline ---
+
+def plan(path):
+    """
+    Segment boundaries for a recording. Silence detection reads the whole file,
+    so it is skipped when the recording fits in one segment.
+    """
+    duration = audio.probe_duration(path)
+    if duration <= settings.BLOG_SEGMENT_MAX_SECONDS:
+        return [(0.0, duration)]
+    return audio.plan_segments(
+        duration, audio.detect_silences(path),
+        settings.BLOG_SEGMENT_TARGET_SECONDS, settings.BLOG_SEGMENT_MAX_SECONDS,
+    )
+
+def process_segment(transcriber, source, segment):
+    with segment_duration.time(stage='extract'):
+        audio.extract_segment(source, segment.start, segment.end, segment.path)
+    try:
+        with segment_duration.time(stage='transcribe'):
+            return transcriber.transcribe(segment).strip()
+    finally:
+        segment.path.unlink(missing_ok=True)
+
+def transcribe_media(path, on_progress=None, workers=None):
+    """
+    Transcribes an audio or video file and returns the text, one line per segment.
+    on_progress(done, total) is called from the calling thread as segments finish.
+    """
+    transcriber = get_transcriber()
+    if transcriber is None:
+        raise TranscriptionError("Transcription is not configured.")
+    workers = workers or settings.BLOG_TRANSCRIPTION_WORKERS
+
+    try:
+        boundaries = plan(path)
+        texts = [''] * len(boundaries)
+        with tempfile.TemporaryDirectory(prefix='blog-segments-') as directory:
+            segments = [
+                Segment(index, start, end, Path(directory) / f'{index:04d}.flac')
+                for index, (start, end) in enumerate(boundaries)
+            ]
+            if on_progress:
+                on_progress(0, len(segments))
+            with ThreadPoolExecutor(max_workers=min(workers, len(segments))) as executor:
+                futures = {executor.submit(process_segment, transcriber, path, s): s for s in segments}
+                try:
+                    for done, future in enumerate(as_completed(futures), start=1):
+                        texts[futures[future].index] = future.result()
+                        if on_progress:
+                            on_progress(done, len(segments))
+                except BaseException:
+                    # One failed segment fails the file; don't start the rest.
+                    for future in futures:
+                        future.cancel()
+                    raise
+    except Exception:
+        media_transcriptions.inc(result='failed')
+        raise
+    media_transcriptions.inc(result='succeeded')
+    logger.info(f"Transcribed {path} in {len(boundaries)} segment(s).")
+    return '\n'.join(text for text in texts if text)
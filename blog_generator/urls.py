@@ -7,6 +7,17 @@ urlpatterns = [
     path('signup/', views.user_signup, name='signup'),
     path('logout/', views.user_logout, name='logout'),
     path('generate-blog/', views.generate_blog, name='generate-blog'),
+    path('generate-blog/batch/', views.generate_blog_batch, name='generate-blog-batch'),
+    path('generate-blog/media/', views.generate_blog_media, name='generate-blog-media'),
+    path('generate-blog-async/', views.generate_blog_async, name='generate-blog-async'),
+    path('jobs/<int:pk>/', views.job_status, name='job-status'),
+    path('generation-cache/stats/', views.generation_cache_stats, name='generation-cache-stats'),
+    path('admission/stats/', views.admission_stats, name='admission-stats'),
+    path('metrics', views.metrics_view, name='metrics'),
     path('blog-list/', views.blog_list, name='blog-list'),
+    path('blog-list.json', views.blog_list_json, name='blog-list-json'),
+    path('search/', views.search_json, name='search'),
+    path('stats.json', views.user_stats_json, name='user-stats'),
+    path('export/', views.export_archive, name='export'),
     path('blog-details/<int:pk>/', views.blog_details, name='blog-details'),
 ]
\ No newline at end of file
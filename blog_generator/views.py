@@ -145,31 +145,37 @@
 
 
 from django.shortcuts import render, redirect
+from django.urls import reverse
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse, HttpResponseBadRequest
-from django.db import IntegrityError
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse, JsonResponse, HttpResponseBadRequest, StreamingHttpResponse
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.core.handlers.asgi import ASGIRequest
+from django.db import IntegrityError, transaction
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+import hmac
 import json
-import os
 import logging
-from .models import BlogPost
-import google.generativeai as genai
+import math
+from asgiref.sync import sync_to_async
+from .models import BlogPost, GenerationJob
+from . import (
+    admission, batch, export, generation, generation_cache, jobs, llm, metrics, preprocess, search, similarity,
+    stats, transcription,
+)
+from .pagination import keyset_page
+from .routers import use_primary
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-# --- Gemini API Configuration ---
-# It's good practice to handle the case where the API key might be missing.
-try:
-    GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
-    if not GEMINI_API_KEY:
-        raise ValueError("GEMINI_API_KEY environment variable not set.")
-    genai.configure(api_key=GEMINI_API_KEY)
-    model = genai.GenerativeModel('gemini-2.5-flash')
-except Exception as e:
-    logger.error(f"Failed to configure Generative AI: {e}")
-    model = None # Set model to None if configuration fails
+# Bump when blog-details.html changes so browsers stop reusing cached copies.
+DETAIL_PAGE_VERSION = '1'
 
 # --- Core Views ---
 
@@ -180,15 +186,23 @@ def index(request):
     """
     if request.method != 'GET':
         return HttpResponseBadRequest("Only GET requests are allowed.")
-    return render(request, 'index.html')
+    return render(request, 'index.html', {'media_enabled': settings.BLOG_MEDIA_ENABLED})
 
 @login_required
 def generate_blog(request):
     """
-    Handles the POST request to generate a blog from a transcript using a single API call.
-    This view is now secure and expects a CSRF token from the frontend.
+    Queues a blog generation job and returns its id immediately.
+    The background worker runs the generation; clients poll job_status for the result.
+
+    With {"stream": true} in the body the article is generated inline instead and
+    streamed back as NDJSON events while the model produces it.
+
+    Transcripts that nearly match one of the user's posts are handled per "on_duplicate"
+    (see BLOG_DUPLICATE_ACTION) without calling the model.
+
+    "mode" picks single-call or sectioned generation (see BLOG_GENERATION_MODE).
     """
-    if model is None:
+    if llm.get_backend() is None:
         return JsonResponse({'error': 'AI model is not configured. Please check server logs.'}, status=500)
         
     if request.method != 'POST':
@@ -202,75 +216,629 @@ def generate_blog(request):
 
         if not transcript:
             return JsonResponse({'error': 'A transcript is required.'}, status=400)
+        mode = data.get('mode') or settings.BLOG_GENERATION_MODE
+        if mode not in generation.GENERATION_MODES:
+            return invalid_mode_response()
+
+        on_duplicate = data.get('on_duplicate', settings.BLOG_DUPLICATE_ACTION)
+        if on_duplicate not in DUPLICATE_ACTIONS:
+            return JsonResponse({'error': f"on_duplicate must be one of {', '.join(DUPLICATE_ACTIONS)}."}, status=400)
+
+        admission.take_token(request.user)
+        match = lookup_duplicate(transcript, request.user, on_duplicate)
+        if match is not None:
+            if on_duplicate == 'offer':
+                return duplicate_offer_response(match)
+            blog_post = reuse_duplicate(request.user, match, transcript, title, yt_link)
+            if data.get('stream'):
+                return ndjson_response(request, reused_post_events(blog_post, match))
+            return JsonResponse(reused_post_payload(blog_post, match))
+
+        if data.get('stream'):
+            llm.get_backend().ensure_available()
+            slot = admission.admit(request.user, rate_limit=False)
+            return ndjson_response(
+                request, stream_generation_events(request.user, transcript, title, yt_link, slot, mode),
+            )
+
+        job = jobs.enqueue(request.user, transcript, title, yt_link, mode=mode)
+        logger.info(f"Queued generation job {job.pk}.")
+
+        return JsonResponse({
+            'job_id': job.pk,
+            'status': job.status,
+            'status_url': reverse('job-status', args=[job.pk]),
+            'transcript_tokens': preprocess.prepare(transcript).as_dict(),
+        }, status=202)
 
-        logger.info("Generating title and content in a single API call...")
-        
-        # A single, powerful prompt asking for both parts separated by a unique delimiter.
-        combined_prompt = (
-            f"Based on the following transcript, perform two tasks:\n"
-            f"1. Generate a concise and compelling blog post title (no more than 10 words, no quotes).\n"
-            f"2. Write a comprehensive and well-structured blog article.\n\n"
-            f"Separate the title and the article with the special delimiter '---CONTENT---'.\n\n"
-            f"Transcript: {transcript}\n\n"
-            f"Title and Article:"
-        )
-        
-        response = model.generate_content(combined_prompt)
-        full_text = response.text.strip()
-        
-        # Split the response to get the title and content.
-        if '---CONTENT---' in full_text:
-            generated_title, generated_content = full_text.split('---CONTENT---', 1)
-            # Use the title provided by the user if it exists, otherwise use the generated one.
-            final_title = title if title else generated_title.strip()
-            final_content = generated_content.strip()
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON in request body.'}, status=400)
+    except admission.AdmissionRejected as e:
+        return admission_rejected_response(e)
+    except llm.CircuitOpenError as e:
+        return backend_error_response(e)
+    except Exception as e:
+        logger.error(f"Error in generate_blog view: {e}")
+        return JsonResponse({'error': "An internal server error occurred while queueing the blog."}, status=500)
+
+async def aiterate(iterator):
+    """
+    Adapts a sync iterator for streaming under ASGI, where Django would otherwise
+    read it to the end before sending anything. Each step runs in the request's
+    sync thread, so database connections stay with the request.
+    """
+    done = object()
+    step = sync_to_async(next)
+    try:
+        while (item := await step(iterator, done)) is not done:
+            yield item
+    finally:
+        if hasattr(iterator, 'close'):
+            await sync_to_async(iterator.close)()
+
+def streaming_response(request, chunks, content_type):
+    """
+    Streams `chunks` without proxy buffering, under WSGI or ASGI.
+    """
+    if isinstance(request, ASGIRequest):
+        chunks = aiterate(chunks)
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+def ndjson_response(request, lines):
+    """
+    Streams newline-delimited JSON.
+    """
+    return streaming_response(request, lines, 'application/x-ndjson')
+
+DUPLICATE_ACTIONS = ('offer', 'reuse', 'ignore')
+
+def lookup_duplicate(transcript, user, on_duplicate):
+    """
+    The existing post a transcript duplicates, or None. Other users' posts only
+    count for 'reuse' with BLOG_DUPLICATE_ACROSS_USERS. Call it once the request
+    is admitted: signing a long transcript takes a good fraction of a second.
+    """
+    if on_duplicate == 'ignore':
+        return None
+    include_others = on_duplicate == 'reuse' and settings.BLOG_DUPLICATE_ACROSS_USERS
+    return similarity.find_duplicate(transcript, user, include_others)
+
+def invalid_mode_response():
+    return JsonResponse({'error': f"mode must be one of {', '.join(generation.GENERATION_MODES)}."}, status=400)
+
+def duplicate_offer_response(match):
+    """
+    409 pointing at the user's existing post; resend with "on_duplicate": "ignore"
+    to generate anyway.
+    """
+    return JsonResponse({
+        'error': 'You already have an article for a very similar transcript.',
+        'duplicate': {
+            'blog_id': match.post.pk,
+            'title': match.post.youtube_title,
+            'url': reverse('blog-details', args=[match.post.pk]),
+            'similarity': round(match.similarity, 3),
+        },
+    }, status=409)
+
+def reuse_duplicate(user, match, transcript, title, yt_link):
+    """
+    Returns the user's own matching post, or a copy of another user's article
+    saved for this user, without calling the model.
+    """
+    if match.post.user_id == user.pk:
+        return match.post
+    return generation.save_post(user, title or match.post.youtube_title, yt_link, match.post.generated_content, transcript)
+
+def reused_post_payload(blog_post, match):
+    return {
+        'blog_id': blog_post.pk,
+        'title': blog_post.youtube_title,
+        'content': blog_post.generated_content,
+        'url': reverse('blog-details', args=[blog_post.pk]),
+        'reused': True,
+        'similarity': round(match.similarity, 3),
+    }
+
+def reused_post_events(blog_post, match):
+    """
+    The NDJSON events of a streamed generation, for an article that was reused.
+    """
+    yield json.dumps({'event': 'start'}) + '\n'
+    yield json.dumps({'event': 'title', 'text': blog_post.youtube_title}) + '\n'
+    yield json.dumps({'event': 'content', 'text': blog_post.generated_content}) + '\n'
+    yield json.dumps({'event': 'done', 'blog_id': blog_post.pk, 'title': blog_post.youtube_title,
+                      'reused': True, 'similarity': round(match.similarity, 3)}) + '\n'
+
+def admission_rejected_response(rejection):
+    """
+    429 response telling the client when to retry.
+    """
+    if rejection.reason == 'rate_limited':
+        message = "You are generating blogs too quickly. Please wait a moment and try again."
+    else:
+        message = "The generator is busy right now. Please try again shortly."
+    response = JsonResponse({'error': message, 'reason': rejection.reason}, status=429)
+    response['Retry-After'] = str(rejection.retry_after)
+    return response
+
+def backend_error_message(error):
+    if isinstance(error, llm.CircuitOpenError):
+        return "The AI model is temporarily unavailable. Please try again shortly.", 'circuit_open'
+    if isinstance(error, llm.RetryableBackendError):
+        return "The AI model is overloaded or not responding. Please try again shortly.", 'upstream_unavailable'
+    return "The AI model could not process this transcript.", 'upstream_rejected'
+
+def backend_error_response(error):
+    """
+    503 with Retry-After while the model is unavailable or kept failing, 502 when
+    it rejected the request.
+    """
+    message, reason = backend_error_message(error)
+    if reason == 'upstream_rejected':
+        return JsonResponse({'error': message, 'reason': reason}, status=502)
+    response = JsonResponse({'error': message, 'reason': reason}, status=503)
+    response['Retry-After'] = str(getattr(error, 'retry_after', math.ceil(settings.BLOG_LLM_BREAKER_RESET)))
+    return response
+
+def stream_generation_events(user, transcript, title, yt_link, slot=None, mode=None):
+    """
+    Generator behind the streaming mode of generate_blog.
+    Yields one JSON event per line: start, title, content deltas, then done or error.
+    In sectioned mode each content delta is a whole section.
+    The assembled article is saved once the stream completes, and the admission
+    slot is released when the stream ends or the client goes away.
+    """
+    yield json.dumps({'event': 'start'}) + '\n'
+    try:
+        mode = generation.resolve_mode(mode)
+        cached = generation_cache.lookup(generation.cache_key(transcript, mode))
+        if cached is not None:
+            final_title, final_content = title or cached[0], cached[1]
+            blog_post = generation.save_post(user, final_title, yt_link, final_content, transcript)
+            yield json.dumps({'event': 'title', 'text': final_title}) + '\n'
+            yield json.dumps({'event': 'content', 'text': final_content}) + '\n'
+            yield json.dumps({'event': 'done', 'blog_id': blog_post.pk, 'title': final_title, 'cached': True,
+                              'transcript_tokens': preprocess.prepare(transcript).as_dict()}) + '\n'
+            return
+
+        splitter = generation.DelimiterSplitter()
+        for chunk in generation.stream_article(transcript, mode, slot):
+            for part, text in splitter.feed(chunk):
+                if part == 'title':
+                    text = title or text
+                yield json.dumps({'event': part, 'text': text}) + '\n'
+        for part, text in splitter.finish():
+            yield json.dumps({'event': part, 'text': text}) + '\n'
+
+        generated_title, final_content = splitter.result()
+        generation.cache_article(transcript, generated_title, final_content, mode)
+        final_title = title or generated_title
+        blog_post = generation.save_post(user, final_title, yt_link, final_content, transcript)
+        yield json.dumps({'event': 'done', 'blog_id': blog_post.pk, 'title': final_title,
+                          'transcript_tokens': preprocess.prepare(transcript).as_dict()}) + '\n'
+
+    except llm.BackendError as e:
+        logger.error(f"Model call failed while streaming blog generation: {e!r}")
+        message, reason = backend_error_message(e)
+        yield json.dumps({'event': 'error', 'error': message, 'reason': reason}) + '\n'
+    except Exception as e:
+        logger.error(f"Error while streaming blog generation: {e}")
+        yield json.dumps({'event': 'error', 'error': "An internal server error occurred while generating the blog."}) + '\n'
+    finally:
+        if slot is not None:
+            admission.release(slot)
+
+@login_required
+def generate_blog_batch(request):
+    """
+    Generates many articles in one request. The body is JSONL with one
+    {"title", "transcript", "link"} record per line, or a multipart upload in the
+    "file" field. Results stream back as NDJSON, one line per record as it
+    finishes, then a summary line. Rerunning a file skips records already imported.
+    ?mode= sets the generation mode of every record.
+
+    Each record costs a rate-limit token; when they run out the batch stops and
+    the summary line says when to rerun it.
+    """
+    if llm.get_backend() is None:
+        return JsonResponse({'error': 'AI model is not configured. Please check server logs.'}, status=500)
+
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Only POST requests are allowed.'}, status=405)
+
+    try:
+        concurrency = int(request.GET.get('concurrency', settings.BLOG_BATCH_CONCURRENCY))
+    except ValueError:
+        return JsonResponse({'error': 'concurrency must be a number.'}, status=400)
+    concurrency = max(1, min(concurrency, settings.BLOG_BATCH_CONCURRENCY))
+    mode = request.GET.get('mode') or settings.BLOG_GENERATION_MODE
+    if mode not in generation.GENERATION_MODES:
+        return invalid_mode_response()
+
+    if request.content_type == 'multipart/form-data':
+        lines = request.FILES.get('file')
+        if lines is None:
+            return JsonResponse({'error': 'Upload the JSONL file in the "file" field.'}, status=400)
+    else:
+        # Iterating the request reads the body line by line instead of all at once.
+        lines = request
+
+    # The first record's token, taken here so an empty bucket is still a 429.
+    # run_batch charges each further record as it starts.
+    try:
+        admission.take_token(request.user)
+    except admission.AdmissionRejected as e:
+        return admission_rejected_response(e)
+
+    results = batch.run_batch(
+        request.user, lines, concurrency, settings.BLOG_BATCH_CHUNK_SIZE, settings.BLOG_BATCH_MAX_RECORDS, mode,
+        rate_limit=True, prepaid=1,
+    )
+    return ndjson_response(request, (json.dumps(item) + '\n' for item in results))
+
+@csrf_exempt
+@login_required
+def generate_blog_media(request):
+    """
+    Queues a blog generation job for an audio or video file: either uploaded in the
+    "media" field of a multipart form, or an existing file named by "media_path"
+    relative to MEDIA_ROOT. The worker transcribes it before generating; clients
+    poll job_status as for generate_blog.
+    """
+    if not settings.BLOG_MEDIA_ENABLED:
+        return JsonResponse({'error': 'Media uploads are not available on this server.'}, status=404)
+
+    # Rejected before anything reads the body, so an oversized upload is never
+    # spooled to disk.
+    try:
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        content_length = 0
+    if content_length > settings.BLOG_MEDIA_MAX_UPLOAD_MB * 1024 * 1024:
+        return JsonResponse({'error': f'Media files are limited to {settings.BLOG_MEDIA_MAX_UPLOAD_MB} MB.'}, status=413)
+
+    # Upload handlers must be set before anything reads request.POST, including the
+    # CSRF check, hence csrf_exempt here and csrf_protect on the inner view.
+    # The upload is written to a temporary file as it arrives, never held in memory.
+    request.upload_handlers = [TemporaryFileUploadHandler(request)]
+    return _generate_blog_media(request)
+
+@csrf_protect
+def _generate_blog_media(request):
+    if llm.get_backend() is None or transcription.get_transcriber() is None:
+        return JsonResponse({'error': 'Transcription is not configured. Please check server logs.'}, status=500)
+
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Only POST requests are allowed.'}, status=405)
+
+    mode = request.POST.get('mode') or settings.BLOG_GENERATION_MODE
+    if mode not in generation.GENERATION_MODES:
+        return invalid_mode_response()
+
+    try:
+        upload = request.FILES.get('media')
+        if upload is not None:
+            media_path = transcription.save_upload(upload)
+        elif request.POST.get('media_path'):
+            transcription.resolve_media(request.POST['media_path'])
+            media_path = request.POST['media_path']
         else:
-            # Fallback in case the model doesn't follow instructions perfectly.
-            logger.warning("Delimiter '---CONTENT---' not found in AI response. Using fallback.")
-            final_title = title if title else "A Blog Post About Your Video"
-            final_content = full_text
-
-        # BlogPost.objects.create() creates and saves the object in one step.
-        BlogPost.objects.create(
-            user=request.user,
-            youtube_title=final_title,
-            youtube_link=yt_link,
-            generated_content=final_content,
-        )
-        
-        return JsonResponse({'title': final_title, 'content': final_content})
+            return JsonResponse({'error': 'Upload a file in the "media" field or name one in "media_path".'}, status=400)
+
+        try:
+            admission.take_token(request.user)
+            job = jobs.enqueue(
+                request.user, '', request.POST.get('title', ''), request.POST.get('link') or 'N/A',
+                media_path=media_path, mode=mode,
+            )
+        except BaseException:
+            # No job will ever read the file; don't leave it in MEDIA_ROOT.
+            if upload is not None:
+                transcription.discard_upload(media_path)
+            raise
+        logger.info(f"Queued media generation job {job.pk} for {media_path}.")
+
+        return JsonResponse({
+            'job_id': job.pk,
+            'status': job.status,
+            'status_url': reverse('job-status', args=[job.pk]),
+        }, status=202)
+
+    except transcription.TranscriptionError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except admission.AdmissionRejected as e:
+        return admission_rejected_response(e)
+    except Exception as e:
+        logger.error(f"Error in generate_blog_media view: {e}")
+        return JsonResponse({'error': "An internal server error occurred while queueing the blog."}, status=500)
+
+@login_required
+@use_primary()
+def job_status(request, pk):
+    """
+    Reports the progress of a generation job owned by the logged-in user. Read from
+    the primary, since a lagging replica would hold back progress updates.
+    """
+    try:
+        job = GenerationJob.objects.select_related('blog_post').get(id=pk, user=request.user)
+    except GenerationJob.DoesNotExist:
+        return JsonResponse({'error': 'Job not found.'}, status=404)
+
+    payload = {
+        'job_id': job.pk,
+        'status': job.status,
+        'progress': job.progress,
+        'attempts': job.attempts,
+    }
+    if job.status == GenerationJob.STATUS_SUCCEEDED and job.blog_post:
+        payload.update({
+            'blog_id': job.blog_post.pk,
+            'title': job.blog_post.youtube_title,
+            'content': job.blog_post.generated_content,
+        })
+    elif job.status == GenerationJob.STATUS_FAILED:
+        payload['error'] = "The blog could not be generated. Please try again."
+    return JsonResponse(payload)
+
+@login_required
+async def generate_blog_async(request):
+    """
+    Async version of generate_blog for ASGI deployments.
+    The Gemini round trip is awaited, so a single worker process can hold many
+    in-flight generations without blocking other pages.
+    """
+    if llm.get_backend() is None:
+        return JsonResponse({'error': 'AI model is not configured. Please check server logs.'}, status=500)
+
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Only POST requests are allowed.'}, status=405)
+
+    try:
+        data = json.loads(request.body)
+        title = data.get('title')
+        transcript = data.get('transcript')
+        yt_link = data.get('link', 'N/A')
+
+        if not transcript:
+            return JsonResponse({'error': 'A transcript is required.'}, status=400)
+        mode = data.get('mode') or settings.BLOG_GENERATION_MODE
+        if mode not in generation.GENERATION_MODES:
+            return invalid_mode_response()
+
+        user = await request.auser()
+        on_duplicate = data.get('on_duplicate', settings.BLOG_DUPLICATE_ACTION)
+        if on_duplicate not in DUPLICATE_ACTIONS:
+            return JsonResponse({'error': f"on_duplicate must be one of {', '.join(DUPLICATE_ACTIONS)}."}, status=400)
+        await sync_to_async(admission.take_token)(user)
+        match = await sync_to_async(lookup_duplicate)(transcript, user, on_duplicate)
+        if match is not None:
+            if on_duplicate == 'offer':
+                return duplicate_offer_response(match)
+            blog_post = await sync_to_async(reuse_duplicate)(user, match, transcript, title, yt_link)
+            return JsonResponse(await sync_to_async(reused_post_payload)(blog_post, match))
+
+        llm.get_backend().ensure_available()
+        async with admission.ageneration_slot(user, rate_limit=False) as slot:
+            logger.info("Generating title and content asynchronously...")
+            final_title, final_content = await generation.agenerate_article(transcript, title, mode, slot)
+
+        await generation.asave_post(user, final_title, yt_link, final_content, transcript)
+
+        return JsonResponse({
+            'title': final_title,
+            'content': final_content,
+            'transcript_tokens': (await sync_to_async(preprocess.prepare)(transcript)).as_dict(),
+        })
 
     except json.JSONDecodeError:
         return JsonResponse({'error': 'Invalid JSON in request body.'}, status=400)
+    except admission.AdmissionRejected as e:
+        return admission_rejected_response(e)
+    except llm.BackendError as e:
+        logger.error(f"Model call failed in generate_blog_async view: {e!r}")
+        return backend_error_response(e)
     except Exception as e:
-        logger.error(f"Error in generate_blog view: {e}")
+        logger.error(f"Error in generate_blog_async view: {e}")
         return JsonResponse({'error': "An internal server error occurred while generating the blog."}, status=500)
 
+@staff_member_required
+def generation_cache_stats(request):
+    """
+    Reports generation cache hit rates and how many model calls it has saved.
+    """
+    return JsonResponse(generation_cache.get_stats())
+
+@staff_member_required
+def admission_stats(request):
+    """
+    Reports admission queue depth, in-flight generations and rejection counts.
+    """
+    return JsonResponse(admission.get_stats())
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint covering every worker process. Requires
+    `Authorization: Bearer <BLOG_METRICS_TOKEN>` when a token is configured,
+    otherwise a staff session.
+    """
+    if settings.BLOG_METRICS_TOKEN:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not hmac.compare_digest(supplied.encode(), settings.BLOG_METRICS_TOKEN.encode()):
+            return HttpResponse('Unauthorized', status=401, headers={'WWW-Authenticate': 'Bearer'})
+    elif not (request.user.is_active and request.user.is_staff):
+        return HttpResponse('Forbidden', status=403)
+    return HttpResponse(metrics.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 
 # --- Blog Post Management Views ---
 
+def blog_list_page(request):
+    """
+    Fetches one keyset-paginated page of the user's posts without the article bodies.
+    """
+    blog_articles = BlogPost.objects.filter(user=request.user).only('id', 'youtube_title', 'excerpt', 'created_at')
+    return keyset_page(blog_articles, request.GET.get('cursor'), settings.BLOG_LIST_PAGE_SIZE)
+
+def search_page(request):
+    """
+    Runs the `q` query against the user's posts and returns (posts, next_page).
+    Raises ValueError for a malformed page number.
+    """
+    page = int(request.GET.get('page', 1))
+    if page < 1:
+        raise ValueError("Page numbers start at 1.")
+    posts, has_next = search.search_posts(request.user, request.GET.get('q', ''), page, settings.BLOG_LIST_PAGE_SIZE)
+    return posts, page + 1 if has_next else None
+
 @login_required
 def blog_list(request):
     """
-    Displays a list of all blog posts created by the logged-in user.
+    Displays the logged-in user's blog posts, newest first, one page at a time.
+    With a `q` parameter it shows matching posts instead, best match first.
+    The user's stats are shown above the list.
+    """
+    query = request.GET.get('q', '').strip()
+    if query:
+        try:
+            blog_articles, next_page = search_page(request)
+        except ValueError:
+            return redirect('blog-list')
+        return render(request, "all-blogs.html", {
+            'blog_articles': blog_articles, 'query': query, 'next_page': next_page,
+            'stats': stats.summary(request.user),
+        })
+
+    try:
+        blog_articles, next_cursor = blog_list_page(request)
+    except ValueError:
+        return redirect('blog-list')
+    return render(request, "all-blogs.html", {
+        'blog_articles': blog_articles, 'next_cursor': next_cursor, 'stats': stats.summary(request.user),
+    })
+
+@login_required
+def blog_list_json(request):
+    """
+    JSON variant of blog_list used for infinite scrolling.
     """
-    blog_articles = BlogPost.objects.filter(user=request.user).order_by('-created_at')
-    return render(request, "all-blogs.html", {'blog_articles': blog_articles})
+    try:
+        blog_articles, next_cursor = blog_list_page(request)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid cursor.'}, status=400)
+    return JsonResponse({
+        'results': [
+            {
+                'id': article.pk,
+                'title': article.youtube_title,
+                'excerpt': article.excerpt,
+                'created_at': article.created_at.isoformat(),
+                'url': reverse('blog-details', args=[article.pk]),
+            }
+            for article in blog_articles
+        ],
+        'next_cursor': next_cursor,
+    })
+
+@login_required
+def user_stats_json(request):
+    """
+    The logged-in user's post count, words generated, latest post and per-day
+    activity over the last BLOG_STATS_RECENT_DAYS days (or ?days=, up to 366).
+    """
+    try:
+        days = int(request.GET.get('days', settings.BLOG_STATS_RECENT_DAYS))
+    except ValueError:
+        return JsonResponse({'error': 'days must be a number.'}, status=400)
+    if not 1 <= days <= 366:
+        return JsonResponse({'error': 'days must be between 1 and 366.'}, status=400)
+    summary = stats.summary(request.user, days)
+    return JsonResponse({
+        'post_count': summary['post_count'],
+        'word_count': summary['word_count'],
+        'last_post_at': summary['last_post_at'].isoformat() if summary['last_post_at'] else None,
+        'recent_activity': [
+            {'day': entry['day'].isoformat(), 'posts': entry['posts'], 'words': entry['words']}
+            for entry in summary['recent_activity']
+        ],
+    })
+
+@login_required
+def export_archive(request):
+    """
+    Streams the logged-in user's articles as a ZIP of markdown files (?format=zip,
+    the default) or as JSONL (?format=jsonl). The X-Export-Cursor header of the
+    response can be passed back as ?since= to export only newer posts next time.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Only GET requests are allowed.'}, status=405)
+    try:
+        archive = export.Export(request.user, request.GET.get('format', 'zip'), request.GET.get('since'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    response = streaming_response(request, archive.chunks(), archive.content_type)
+    response['Content-Disposition'] = f'attachment; filename="{archive.filename}"'
+    response['X-Export-Cursor'] = archive.next_since
+    return response
+
+@login_required
+def search_json(request):
+    """
+    Ranked full-text search over the logged-in user's posts, one page at a time.
+    """
+    try:
+        blog_articles, next_page = search_page(request)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid page.'}, status=400)
+    return JsonResponse({
+        'query': request.GET.get('q', ''),
+        'results': [
+            {
+                'id': article.pk,
+                'title': article.youtube_title,
+                'excerpt': article.excerpt,
+                'created_at': article.created_at.isoformat(),
+                'rank': article.rank,
+                'url': reverse('blog-details', args=[article.pk]),
+            }
+            for article in blog_articles
+        ],
+        'next_page': next_page,
+    })
 
 @login_required
 def blog_details(request, pk):
     """
     Displays the details of a specific blog post, ensuring the user owns it.
+    The article HTML is rendered at save time; repeat views are answered with 304
+    when the browser's ETag still matches.
     """
     try:
-        blog_article_detail = BlogPost.objects.get(id=pk)
-        if request.user == blog_article_detail.user:
-            return render(request, 'blog-details.html', {'blog_article_detail': blog_article_detail})
-        else:
-            # If the user doesn't own the blog, redirect them to their list.
-            return redirect('blog_list')
+        blog_article_detail = BlogPost.objects.select_related('user').defer('content_compressed', 'content_legacy').get(id=pk)
     except BlogPost.DoesNotExist:
-        return redirect('blog_list')
+        return redirect('blog-list')
+
+    if request.user != blog_article_detail.user:
+        # If the user doesn't own the blog, redirect them to their list.
+        return redirect('blog-list')
+
+    # The page also shows the username, so the validator is per user.
+    etag = f'"{DETAIL_PAGE_VERSION}-{blog_article_detail.content_hash}-{request.user.pk}"'
+    last_modified = int(blog_article_detail.created_at.timestamp())
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    response = render(request, 'blog-details.html', {'blog_article_detail': blog_article_detail})
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 
 # --- User Authentication Views ---
@@ -309,16 +877,14 @@ def user_signup(request):
             error_message = 'Passwords do not match.'
             return render(request, 'signup.html', {'error_message': error_message})
         
-        if User.objects.filter(username=username).exists():
-            error_message = 'That username is already taken. Please choose another.'
-            return render(request, 'signup.html', {'error_message': error_message})
-        
         try:
-            user = User.objects.create_user(username=username, email=email, password=password)
+            # The unique username constraint catches duplicates; no lookup beforehand.
+            with transaction.atomic():
+                user = User.objects.create_user(username=username, email=email, password=password)
             login(request, user)
             return redirect('index')
         except IntegrityError:
-            error_message = 'An account with that email already exists.'
+            error_message = 'That username is already taken. Please choose another.'
             return render(request, 'signup.html', {'error_message': error_message})
         except Exception as e:
             logger.error(f"An unexpected error occurred during signup: {e}")
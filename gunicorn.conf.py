@@ -0,0 +1,26 @@
+# Gunicorn settings. Gunicorn reads this file from the working directory, so the
+# start command in render.yaml picks it up without extra flags.
+import os
+
+# Import Django and the app once in the master process. Workers are forked from it
+# and share those modules copy-on-write instead of importing everything again on
+# boot. Set GUNICORN_PRELOAD=False to import in each worker instead.
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True') == 'True'
+
+
+def on_starting(server):
+    # The model client library (about a second of gRPC/protobuf imports) is
+    # otherwise imported by each worker on its first generation request. Importing
+    # it here shares it between workers but delays the first response after a cold
+    # start by that second, so it is opt-in: worth it on instances that stay up.
+    if server.cfg.preload_app and os.environ.get('GUNICORN_PRELOAD_MODEL_CLIENT', 'False') == 'True':
+        from blog_generator import llm
+        llm.preload()
+
+
+def post_fork(server, worker):
+    # Nothing in the master should have opened a database connection, but a
+    # socket shared across a fork would corrupt both ends.
+    if server.cfg.preload_app:
+        from django.db import connections
+        connections.close_all()
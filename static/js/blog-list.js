@@ -0,0 +1,51 @@
+// Infinite scroll: fetch the next page as JSON when "Load more" comes into view.
+// Search results page by number, the plain list by cursor.
+const loadMore = document.getElementById("loadMore");
+if (loadMore && "IntersectionObserver" in window) {
+  const blogList = document.getElementById("blogList");
+  let loading = false;
+
+  const appendArticle = (article) => {
+    const link = document.createElement("a");
+    link.href = article.url;
+    const card = document.createElement("div");
+    card.className =
+      "border border-gray-200 p-4 rounded-lg hover:shadow-lg hover:border-blue-400 transition-shadow";
+    const title = document.createElement("h3");
+    title.className = "text-lg font-semibold text-blue-700";
+    title.textContent = article.title;
+    const excerpt = document.createElement("p");
+    excerpt.className = "text-gray-600 mt-1";
+    excerpt.textContent = article.excerpt;
+    card.append(title, excerpt);
+    link.append(card);
+    blogList.append(link);
+  };
+
+  const observer = new IntersectionObserver(async (entries) => {
+    if (!entries[0].isIntersecting || loading) return;
+    loading = true;
+    const searching = "page" in loadMore.dataset;
+    const query = searching
+      ? "?q=" + encodeURIComponent(loadMore.dataset.query) + "&page=" + loadMore.dataset.page
+      : "?cursor=" + encodeURIComponent(loadMore.dataset.cursor);
+    const url = (searching ? loadMore.dataset.searchUrl : loadMore.dataset.listUrl) + query;
+    const response = await fetch(url);
+    if (response.ok) {
+      const data = await response.json();
+      data.results.forEach(appendArticle);
+      if (data.next_page) {
+        loadMore.dataset.page = data.next_page;
+        loadMore.href = "?q=" + encodeURIComponent(loadMore.dataset.query) + "&page=" + data.next_page;
+      } else if (data.next_cursor) {
+        loadMore.dataset.cursor = data.next_cursor;
+        loadMore.href = "?cursor=" + data.next_cursor;
+      } else {
+        observer.disconnect();
+        loadMore.remove();
+      }
+    }
+    loading = false;
+  });
+  observer.observe(loadMore);
+}
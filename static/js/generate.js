@@ -0,0 +1,151 @@
+// Article generation form on the home page. Endpoint URLs and the CSRF token come
+// from data attributes on the generate button.
+const generateButton = document.getElementById("generateBlogButton");
+
+// Reads the NDJSON event stream from generate-blog and calls onEvent per line.
+async function readEvents(response, onEvent) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split("\n");
+    buffer = lines.pop();
+    lines.filter((line) => line.trim()).forEach((line) => onEvent(JSON.parse(line)));
+  }
+  if (buffer.trim()) onEvent(JSON.parse(buffer));
+}
+
+// Uploads a media file, then polls the job until the worker has transcribed
+// it and written the article.
+async function generateFromMedia(file, blogTitle, youtubeLink, mode, blogContent) {
+  const progress = document.createElement("p");
+  progress.className = "text-gray-500";
+  blogContent.append(progress);
+
+  const form = new FormData();
+  form.append("media", file);
+  form.append("title", blogTitle);
+  form.append("link", youtubeLink);
+  form.append("mode", mode);
+  progress.textContent = "Uploading...";
+  const response = await fetch(generateButton.dataset.mediaUrl, {
+    method: "POST",
+    headers: { "X-CSRFToken": generateButton.dataset.csrfToken },
+    body: form,
+  });
+  let job = await response.json();
+  if (!response.ok) throw new Error(job.error);
+
+  const statusUrl = job.status_url;
+  while (job.status !== "succeeded" && job.status !== "failed") {
+    await new Promise((resolve) => setTimeout(resolve, 2000));
+    job = await (await fetch(statusUrl)).json();
+    progress.textContent = job.progress || "";
+  }
+  if (job.status === "failed") throw new Error(job.error);
+
+  const heading = document.createElement("h3");
+  heading.className = "text-lg font-semibold text-blue-700";
+  heading.textContent = job.title;
+  const body = document.createElement("p");
+  body.className = "whitespace-pre-wrap";
+  body.textContent = job.content;
+  progress.replaceWith(heading, body);
+}
+
+generateButton.addEventListener("click", async () => {
+  const youtubeTranscript =
+    document.getElementById("youtubeTranscript").value;
+  const mediaFile = document.getElementById("mediaFile")?.files[0];
+  const blogTitle = document.getElementById("blogTitle").value;
+  const youtubeLink = document.getElementById("youtubeLink").value;
+  const mode = document.getElementById("generationMode").value;
+  const blogContent = document.getElementById("blogContent");
+
+  if (!youtubeTranscript && mediaFile) {
+    document.getElementById("loading-circle").style.display = "block";
+    blogContent.innerHTML = "";
+    try {
+      await generateFromMedia(mediaFile, blogTitle, youtubeLink, mode, blogContent);
+    } catch (error) {
+      console.error("Error occurred:", error);
+      blogContent.innerHTML = "";
+      alert("Error: " + (error.message || "Something went wrong. Please try again later."));
+    }
+    document.getElementById("loading-circle").style.display = "none";
+  } else if (youtubeTranscript) {
+    document.getElementById("loading-circle").style.display = "block";
+    blogContent.innerHTML = "";
+
+    const endpointUrl = generateButton.dataset.generateUrl;
+
+    const requestArticle = (onDuplicate) =>
+      fetch(endpointUrl, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+          "X-CSRFToken": generateButton.dataset.csrfToken,
+        },
+        body: JSON.stringify({
+          transcript: youtubeTranscript,
+          title: blogTitle,
+          link: youtubeLink,
+          mode: mode,
+          stream: true,
+          on_duplicate: onDuplicate,
+        }),
+      });
+
+    try {
+      let response = await requestArticle("offer");
+
+      // A near-identical transcript was already turned into an article.
+      if (response.status === 409) {
+        const { duplicate } = await response.json();
+        const openExisting = confirm(
+          `You already have an article for a very similar transcript ("${duplicate.title}").\n\n` +
+            "Press OK to open it, or Cancel to generate a new one anyway."
+        );
+        if (openExisting) {
+          window.location.href = duplicate.url;
+          return;
+        }
+        response = await requestArticle("ignore");
+      }
+
+      if (response.ok) {
+        // Show the article as it is generated instead of waiting for all of it.
+        const heading = document.createElement("h3");
+        heading.className = "text-lg font-semibold text-blue-700";
+        const body = document.createElement("p");
+        body.className = "whitespace-pre-wrap";
+        blogContent.append(heading, body);
+
+        await readEvents(response, (event) => {
+          if (event.event === "title") {
+            heading.textContent = event.text;
+          } else if (event.event === "content") {
+            document.getElementById("loading-circle").style.display = "none";
+            body.textContent += event.text;
+          } else if (event.event === "done") {
+            heading.textContent = event.title;
+          } else if (event.event === "error") {
+            alert("Error: " + event.error);
+          }
+        });
+      } else {
+        const data = await response.json();
+        alert("Error: " + data.error);
+      }
+    } catch (error) {
+      console.error("Error occurred:", error);
+      alert("Something went wrong. Please try again later.");
+    }
+    document.getElementById("loading-circle").style.display = "none";
+  } else {
+    alert("Please paste the transcript or choose a media file before generating.");
+  }
+});